@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity circular buffer that keeps the most recent samples."""
+
+    def __init__(self, capacity, dtype=np.int16):
+        self.capacity = int(capacity)
+        self.data = np.zeros(self.capacity, dtype=dtype)
+        self.write_pos = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.write_pos = 0
+        self.size = 0
+
+    def write(self, samples):
+        n = len(samples)
+        if n == 0:
+            return
+
+        if n >= self.capacity:
+            self.data[:] = samples[-self.capacity:]
+            self.write_pos = 0
+            self.size = self.capacity
+            return
+
+        end = self.write_pos + n
+        if end <= self.capacity:
+            self.data[self.write_pos:end] = samples
+        else:
+            first = self.capacity - self.write_pos
+            self.data[self.write_pos:] = samples[:first]
+            self.data[:n - first] = samples[first:]
+
+        self.write_pos = end % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def segments(self, count=None):
+        """Return the newest `count` (default all) buffered samples oldest-first as two views (no copy)."""
+        size = self.size if count is None else max(0, min(int(count), self.size))
+        start = (self.write_pos - size) % self.capacity
+        if start + size <= self.capacity:
+            return self.data[start:start + size], self.data[:0]
+        return self.data[start:], self.data[:self.write_pos]
+
+
+class ChunkBuffer:
+    """Preallocated linear buffer for one utterance.
+
+    Samples are copied into a fixed array as they arrive, so the capture loop
+    never allocates per sample. detach() hands the filled region over as a
+    view and swaps in a fresh backing array for the next utterance.
+    """
+
+    def __init__(self, capacity, dtype=np.int16):
+        self.capacity = int(capacity)
+        self.dtype = dtype
+        self.data = np.empty(self.capacity, dtype=dtype)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def clear(self):
+        self.size = 0
+
+    def extend(self, samples):
+        n = min(len(samples), self.capacity - self.size)
+        if n <= 0:
+            return 0
+        self.data[self.size:self.size + n] = samples[:n]
+        self.size += n
+        return n
+
+    def extend_ring(self, ring, count=None):
+        for segment in ring.segments(count):
+            self.extend(segment)
+
+    def truncate(self, size):
+        """Drop samples after the first `size`."""
+        self.size = max(0, min(int(size), self.size))
+
+    def view(self):
+        return self.data[:self.size]
+
+    def detach(self):
+        """Return the filled samples without copying and start a new buffer."""
+        chunk = self.data[:self.size]
+        chunk.flags.writeable = False
+        self.data = np.empty(self.capacity, dtype=self.dtype)
+        self.size = 0
+        return chunk
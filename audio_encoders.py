@@ -0,0 +1,108 @@
+import io
+import struct
+import logging
+
+WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+# Size written into streamed WAV headers, whose length is unknown when the upload starts
+WAV_STREAMING_SIZE = 0xFFFFFFFF - 36
+
+
+def wav_header_template(rate, channels=1, sample_width=2):
+    """44-byte PCM WAV header with zero sizes, patched per chunk by wav_header()."""
+    return WAV_HEADER.pack(
+        b'RIFF', 36, b'WAVE',
+        b'fmt ', 16, 1, channels, rate,
+        rate * channels * sample_width, channels * sample_width, sample_width * 8,
+        b'data', 0
+    )
+
+
+def wav_header(template, data_size):
+    header = bytearray(template)
+    struct.pack_into('<I', header, 4, 36 + data_size)
+    struct.pack_into('<I', header, 40, data_size)
+    return bytes(header)
+
+
+class EncodedAudio:
+    def __init__(self, parts, filename, content_type):
+        self.parts = parts
+        self.filename = filename
+        self.content_type = content_type
+        self.size = sum(len(memoryview(part).cast('B')) for part in parts)
+
+
+class WavEncoder:
+    """Raw PCM behind a precomputed header, the samples are not copied."""
+
+    codec = 'wav'
+
+    def __init__(self, rate, channels=1, sample_width=2):
+        self.template = wav_header_template(rate, channels, sample_width)
+
+    def encode(self, pcm):
+        pcm = memoryview(pcm).cast('B')
+        return EncodedAudio([wav_header(self.template, len(pcm)), pcm], 'audio.wav', 'audio/wav')
+
+    def stream_header(self):
+        """Header for a WAV whose samples follow as they are recorded."""
+        return EncodedAudio([wav_header(self.template, WAV_STREAMING_SIZE)], 'audio.wav', 'audio/wav')
+
+
+class SoundFileEncoder:
+    """Compressed upload through libsndfile (soundfile package)."""
+
+    def __init__(self, rate, channels=1, sample_width=2):
+        import soundfile
+        import numpy as np
+
+        self.soundfile = soundfile
+        self.np = np
+        self.rate = rate
+        self.channels = channels
+
+    def encode(self, pcm):
+        samples = self.np.frombuffer(pcm, dtype=self.np.int16)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels)
+
+        output = io.BytesIO()
+        self.soundfile.write(output, samples, self.rate, **self.write_options)
+        return EncodedAudio([output.getbuffer()], self.filename, self.content_type)
+
+
+class FlacEncoder(SoundFileEncoder):
+    codec = 'flac'
+    filename = 'audio.flac'
+    content_type = 'audio/flac'
+    write_options = {'format': 'FLAC', 'subtype': 'PCM_16'}
+
+
+class OpusEncoder(SoundFileEncoder):
+    codec = 'opus'
+    filename = 'audio.ogg'
+    content_type = 'audio/ogg'
+
+    def __init__(self, rate, channels=1, sample_width=2, compression_level=0.9):
+        super().__init__(rate, channels, sample_width)
+        # libsndfile maps compression level onto the Opus bitrate, 0.9 is ~speech quality
+        self.write_options = {'format': 'OGG', 'subtype': 'OPUS', 'compression_level': compression_level}
+
+
+def create_encoder(codec, rate, channels=1, sample_width=2):
+    encoders = {
+        'wav': WavEncoder,
+        'flac': FlacEncoder,
+        'opus': OpusEncoder,
+    }
+
+    if codec not in encoders:
+        logging.getLogger(__name__).warning(f"⚠️ Unknown upload codec '{codec}', using wav")
+        codec = 'wav'
+
+    try:
+        return encoders[codec](rate, channels, sample_width)
+    except ImportError:
+        logging.getLogger(__name__).warning(f"⚠️ soundfile is not installed, uploading {codec} as wav")
+        return WavEncoder(rate, channels, sample_width)
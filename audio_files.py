@@ -0,0 +1,85 @@
+import os
+import struct
+import numpy as np
+
+AUDIO_EXTENSIONS = ('.wav', '.flac')
+
+
+def find_audio_files(paths):
+    """Expand files and directories into a sorted list of WAV/FLAC files."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(root, name) for name in names
+                    if name.lower().endswith(AUDIO_EXTENSIONS)
+                )
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def read_wav_info(path):
+    """Locate the PCM data of a WAV file without reading it."""
+    with open(path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError("not a RIFF/WAVE file")
+
+        info = {}
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("no data chunk")
+
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                audio_format, channels, rate = struct.unpack('<HHI', fmt[:8])
+                bits = struct.unpack('<H', fmt[14:16])[0]
+                if audio_format not in (1, 0xFFFE) or bits != 16:
+                    raise ValueError(f"only 16-bit PCM is supported (format {audio_format}, {bits} bits)")
+                info.update(channels=channels, rate=rate)
+            elif chunk_id == b'data':
+                if 'rate' not in info:
+                    raise ValueError("data chunk before fmt chunk")
+                info.update(offset=f.tell(), size=chunk_size)
+                return info
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+def downmix(block):
+    if block.ndim == 1:
+        return block
+    return block.mean(axis=1).astype(np.int16)
+
+
+def iter_wav_blocks(path, info, block_size):
+    frames = info['size'] // (2 * info['channels'])
+    samples = np.memmap(path, dtype='<i2', mode='r', offset=info['offset'], shape=(frames, info['channels']))
+    for start in range(0, frames, block_size):
+        block = samples[start:start + block_size]
+        yield np.ascontiguousarray(downmix(block) if info['channels'] > 1 else block[:, 0])
+
+
+def iter_flac_blocks(path, block_size):
+    import soundfile
+
+    for block in soundfile.blocks(path, blocksize=block_size, dtype='int16', always_2d=True):
+        yield np.ascontiguousarray(downmix(block) if block.shape[1] > 1 else block[:, 0])
+
+
+def open_audio_file(path, block_size):
+    """Return (sample rate, iterator of mono int16 blocks) for a WAV or FLAC file.
+
+    WAV data is memory-mapped and FLAC is decoded block by block, so memory
+    use does not grow with the length of the recording.
+    """
+    if path.lower().endswith('.flac'):
+        import soundfile
+        return soundfile.info(path).samplerate, iter_flac_blocks(path, block_size)
+
+    info = read_wav_info(path)
+    return info['rate'], iter_wav_blocks(path, info, block_size)
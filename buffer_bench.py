@@ -0,0 +1,68 @@
+import sys
+import time
+from collections import deque
+import numpy as np
+from audio_buffers import RingBuffer, ChunkBuffer
+
+CHUNK = 1024
+RATE = 16000
+PRE_RECORD_CHUNKS = 2
+
+def make_blocks(seconds):
+    rng = np.random.default_rng(0)
+    count = int(seconds * RATE / CHUNK)
+    return [rng.integers(-3000, 3000, CHUNK, dtype=np.int16).tobytes() for _ in range(count)]
+
+def capture_list(blocks):
+    """Old capture path: Python list of samples, rebuilt into an array at the end."""
+    pre_record_buffer = deque(maxlen=PRE_RECORD_CHUNKS)
+    audio_buffer = []
+    for i, data in enumerate(blocks):
+        audio_chunk = np.frombuffer(data, dtype=np.int16)
+        pre_record_buffer.append(audio_chunk)
+        if i == 0:
+            for pre_chunk in pre_record_buffer:
+                audio_buffer.extend(pre_chunk)
+        else:
+            audio_buffer.extend(audio_chunk)
+    return np.array(audio_buffer, dtype=np.int16).tobytes()
+
+def capture_ring(blocks, pre_record_buffer, audio_buffer):
+    """New capture path: preallocated arrays, chunk handed off as a view."""
+    for i, data in enumerate(blocks):
+        audio_chunk = np.frombuffer(data, dtype=np.int16)
+        pre_record_buffer.write(audio_chunk)
+        if i == 0:
+            audio_buffer.extend_ring(pre_record_buffer)
+        else:
+            audio_buffer.extend(audio_chunk)
+    return audio_buffer.detach()
+
+def measure(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.thread_time()
+        fn()
+        best = min(best, time.thread_time() - start)
+    return best
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    blocks = make_blocks(seconds)
+    pre_record_buffer = RingBuffer(PRE_RECORD_CHUNKS * CHUNK)
+    audio_buffer = ChunkBuffer(len(blocks) * CHUNK + PRE_RECORD_CHUNKS * CHUNK)
+
+    assert capture_list(blocks) == capture_ring(blocks, pre_record_buffer, audio_buffer).tobytes()
+
+    list_cpu = measure(lambda: capture_list(blocks), repeats)
+    ring_cpu = measure(lambda: capture_ring(blocks, pre_record_buffer, audio_buffer), repeats)
+
+    print(f"Capture-thread CPU for a {seconds:.0f}s utterance ({len(blocks)} blocks of {CHUNK} samples)")
+    print(f"   list buffer: {list_cpu * 1000:8.2f} ms")
+    print(f"   ring buffer: {ring_cpu * 1000:8.2f} ms")
+    print(f"   speedup:     {list_cpu / ring_cpu:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import time
+import logging
+import threading
+import numpy as np
+
+CAPTURE_MODES = ['callback', 'blocking']
+
+# pyaudio.paContinue and pyaudio.paInputOverflow, so the engines run without PyAudio installed
+PA_CONTINUE = 0
+PA_INPUT_OVERFLOW = 0x2
+
+
+class BlockQueue:
+    """Preallocated single-producer/single-consumer queue of fixed-size sample blocks.
+
+    The producer copies into the next free slot and never waits or
+    allocates; when every slot is full the block is dropped and counted.
+    Each index is only advanced by one side, so the slots need no lock,
+    the semaphore only wakes the consumer. The producer close()s the
+    queue after its last put().
+    """
+
+    def __init__(self, slots, block_size, dtype=np.int16):
+        self.blocks = np.zeros((slots, block_size), dtype=dtype)
+        self.lengths = np.zeros(slots, dtype=np.int64)
+        self.times = np.zeros(slots)
+        self.written = 0
+        self.read = 0
+        self.dropped = 0
+        self.closed = False
+        self.available = threading.Semaphore(0)
+
+    def __len__(self):
+        return self.written - self.read
+
+    def clear(self):
+        """Forget queued blocks and counters, only while neither side is running."""
+        self.written = 0
+        self.read = 0
+        self.dropped = 0
+        self.closed = False
+        self.available = threading.Semaphore(0)
+
+    def put(self, data, timestamp):
+        slots, block_size = self.blocks.shape
+        if self.written - self.read >= slots:
+            self.dropped += 1
+            return False
+
+        slot = self.written % slots
+        samples = np.frombuffer(data, dtype=self.blocks.dtype)[:block_size]
+        self.blocks[slot, :len(samples)] = samples
+        self.lengths[slot] = len(samples)
+        self.times[slot] = timestamp
+        self.written += 1
+        self.available.release()
+        return True
+
+    def close(self):
+        """No more blocks will come, get() returns (None, None) without waiting once the queue is empty."""
+        self.closed = True
+        self.available.release()
+
+    def get(self, timeout=None):
+        """Oldest block as a view with its capture time, valid until done(); (None, None) on timeout or once closed and empty."""
+        if not self.available.acquire(timeout=timeout):
+            return None, None
+        if self.read == self.written:
+            # The wake-up of close(), kept for the next get()
+            self.available.release()
+            return None, None
+        slot = self.read % len(self.blocks)
+        return self.blocks[slot, :self.lengths[slot]], self.times[slot]
+
+    def done(self):
+        self.read += 1
+
+
+class CaptureEngine:
+    """Reads blocks of 16-bit samples from an input device and hands them to a consumer.
+
+    on_block(samples, captured_at) runs on the engine's consumer thread and
+    returns False to stop capturing. `audio` is a pyaudio.PyAudio or
+    anything with the same open(), such as replay.FakePyAudio.
+    """
+
+    def __init__(self, audio, rate, channels, sample_format, block_size, on_block, clock=time):
+        self.logger = logging.getLogger(__name__)
+        self.audio = audio
+        self.rate = rate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.block_size = block_size
+        self.on_block = on_block
+        self.clock = clock
+
+        self.stream = None
+        self.running = False
+        self.finished = False
+        self.consumer_thread = None
+        self.blocks = 0
+        self.overflows = 0
+        self.consumer_cpu = 0
+
+    def open_stream(self, **kwargs):
+        return self.audio.open(
+            format=self.sample_format,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.block_size,
+            **kwargs
+        )
+
+    def start(self):
+        self.running = True
+        self.finished = False
+        self.stream = self.open_stream()
+        self.consumer_thread = threading.Thread(target=self.consume)
+        self.consumer_thread.daemon = True
+        self.consumer_thread.start()
+
+    def deliver(self, samples, captured_at):
+        """Hand one block to on_block, nothing more is delivered once it asked to stop or failed."""
+        if self.finished:
+            return
+        try:
+            if self.on_block(samples, captured_at) is False:
+                self.finished = True
+        except Exception as e:
+            self.logger.error(f"❌ Recording error: {e}")
+            self.finished = True
+        if self.finished:
+            self.running = False
+
+    def consume(self):
+        raise NotImplementedError
+
+    def close_stream(self):
+        try:
+            if self.stream:
+                self.stream.stop_stream()
+                self.stream.close()
+        except Exception as e:
+            self.logger.error(f"❌ Audio closing error: {e}")
+        self.stream = None
+
+    def drain(self, timeout=1.0):
+        """Wait until the blocks captured so far were handed to on_block, the device stays open."""
+
+    def stop(self):
+        """Let the consumer finish the blocks already captured, then close the device."""
+        self.running = False
+        if self.consumer_thread and self.consumer_thread is not threading.current_thread():
+            self.consumer_thread.join()
+        self.close_stream()
+
+    def stats(self):
+        return {'blocks': self.blocks, 'overflows': self.overflows, 'dropped': 0, 'consumer_cpu': self.consumer_cpu}
+
+
+class BlockingCapture(CaptureEngine):
+    """The consumer thread itself reads the stream, blocking for every block.
+
+    PortAudio only tells a blocking read about an overflow by raising and
+    discarding the block that was read, so reads never raise and
+    overflows are not counted: stats() reports them as None (unknown).
+    """
+
+    def consume(self):
+        cpu_start = time.thread_time()
+        while self.running:
+            try:
+                data = self.stream.read(self.block_size, exception_on_overflow=False)
+            except Exception as e:
+                if self.running:
+                    self.logger.error(f"❌ Recording error: {e}")
+                break
+            self.blocks += 1
+            self.deliver(np.frombuffer(data, dtype=np.int16), self.clock.time())
+        self.consumer_cpu += time.thread_time() - cpu_start
+
+    def stats(self):
+        stats = super().stats()
+        stats['overflows'] = None
+        return stats
+
+
+class CallbackCapture(CaptureEngine):
+    """PortAudio's stream callback copies each block into a BlockQueue, the consumer thread runs VAD.
+
+    The callback does no Python work beyond one copy, so a busy consumer
+    (or the GIL held elsewhere) no longer makes the device overflow;
+    the queue absorbs `slots` blocks of backlog before dropping.
+    """
+
+    def __init__(self, audio, rate, channels, sample_format, block_size, on_block, clock=time, slots=32):
+        super().__init__(audio, rate, channels, sample_format, block_size, on_block, clock)
+        self.queue = BlockQueue(slots, block_size * channels)
+        self.stop_at = 0
+
+    def open_stream(self):
+        return super().open_stream(stream_callback=self.callback)
+
+    def callback(self, in_data, frame_count, time_info, status):
+        if status & PA_INPUT_OVERFLOW:
+            self.overflows += 1
+        self.queue.put(in_data, self.clock.time())
+        return None, PA_CONTINUE
+
+    def consume(self):
+        cpu_start = time.thread_time()
+        # After stop() the blocks captured before it are still processed
+        while self.running or self.queue.read < self.stop_at:
+            samples, captured_at = self.queue.get(timeout=0.1)
+            if samples is None:
+                continue
+            self.blocks += 1
+            self.deliver(samples, captured_at)
+            self.queue.done()
+        self.consumer_cpu += time.thread_time() - cpu_start
+
+    def drain(self, timeout=1.0):
+        if self.consumer_thread is threading.current_thread():
+            return
+        target = self.queue.written
+        deadline = time.monotonic() + timeout
+        while self.running and self.queue.read < target and time.monotonic() < deadline:
+            time.sleep(0.002)
+
+    def stop(self):
+        self.stop_at = self.queue.written
+        super().stop()
+
+    def stats(self):
+        stats = super().stats()
+        stats['dropped'] = self.queue.dropped
+        return stats
+
+
+def create_capture_engine(mode, audio, rate, channels, sample_format, block_size, on_block, clock=time):
+    if mode == 'blocking':
+        return BlockingCapture(audio, rate, channels, sample_format, block_size, on_block, clock)
+    if mode == 'callback':
+        return CallbackCapture(audio, rate, channels, sample_format, block_size, on_block, clock, slots=max(4, int(2 * rate / block_size)))
+    raise ValueError(f"Unknown capture mode '{mode}', expected one of: {', '.join(CAPTURE_MODES)}")
@@ -0,0 +1,94 @@
+import sys
+import json
+import time
+import logging
+import logging.handlers
+import numpy as np
+
+# Timestamps in pipeline order, summarize() reports the time between neighbours
+STAGES = [
+    'first_speech',
+    'speech_end',
+    'silence_detected',
+    'enqueued',
+    'dequeued',
+    'encoded',
+    'request_sent',
+    'response_received',
+    'pasted',
+]
+
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUP_COUNT = 3
+
+
+class ChunkTrace:
+    """Timestamps of one chunk on its way from the microphone to the paste."""
+
+    def __init__(self, chunk_id, clock=time):
+        self.clock = clock
+        self.record = {'chunk': chunk_id}
+
+    def set(self, stage, timestamp):
+        self.record[stage] = timestamp
+
+    def mark(self, stage):
+        self.record[stage] = self.clock.time()
+
+    def get(self, stage):
+        return self.record.get(stage)
+
+
+class ChunkTracer:
+    """Appends chunk traces as JSON lines to a size-rotated file."""
+
+    def __init__(self, path, max_bytes=TRACE_MAX_BYTES, backup_count=TRACE_BACKUP_COUNT):
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+
+        self.logger = logging.getLogger(f"{__name__}.{path}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.logger.addHandler(handler)
+
+    def write(self, trace):
+        self.logger.info(json.dumps(trace.record))
+
+
+def load_traces(paths):
+    traces = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            traces.extend(json.loads(line) for line in f if line.strip())
+    return traces
+
+
+def summarize(traces):
+    """Per-stage and total durations in ms as {name: [durations]}."""
+    durations = {}
+    for trace in traces:
+        present = [stage for stage in STAGES if trace.get(stage) is not None]
+        for start, end in zip(present, present[1:]):
+            durations.setdefault(f"{start} → {end}", []).append((trace[end] - trace[start]) * 1000)
+
+        if 'speech_end' in trace and 'pasted' in trace:
+            durations.setdefault("speech_end → pasted (total)", []).append((trace['pasted'] - trace['speech_end']) * 1000)
+    return durations
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python chunk_trace.py TRACE_FILE [TRACE_FILE ...]")
+        sys.exit(1)
+
+    traces = load_traces(sys.argv[1:])
+    durations = summarize(traces)
+
+    print(f"{len(traces)} chunk traces")
+    print(f"{'stage':<40} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, values in durations.items():
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(f"{name:<40} {len(values):>6} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import numpy as np
+import requests
+from audio_encoders import WavEncoder
+from mock_server import MockServer
+from transcription_client import TranscriptionClient
+
+RATE = 16000
+
+def make_certificate(directory):
+    """Throwaway self-signed certificate for 127.0.0.1, returns (certfile, keyfile)."""
+    certfile = os.path.join(directory, 'cert.pem')
+    keyfile = os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=127.0.0.1',
+         '-addext', 'subjectAltName=IP:127.0.0.1', '-keyout', keyfile, '-out', certfile],
+        check=True, capture_output=True
+    )
+    return certfile, keyfile
+
+def run_client(server, chunks, pcm, verify=True):
+    """Warm a TranscriptionClient up and transcribe pcm chunks times, returns (connections opened by warm-up, texts)."""
+    server.stats.update(connections=0, handshakes=0, requests=0)
+    client = TranscriptionClient('test', base_url=server.url)
+    # REQUESTS_CA_BUNDLE would take precedence over the session's verify
+    client.session.trust_env = False
+    client.session.verify = verify
+    audio = WavEncoder(RATE).encode(pcm)
+
+    client.warm()
+    time.sleep(0.2)
+    warm_connections = server.stats['connections']
+
+    texts = [client.transcribe(audio, 'whisper-1').text for _ in range(chunks)]
+    client.close()
+    return warm_connections, texts
+
+def main():
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    pcm = np.zeros(RATE * 3, dtype=np.int16)
+    expected = f"transcribed {44 + pcm.nbytes} bytes"
+
+    server = MockServer().start()
+    print(f"Client test against {server.url} ({chunks} chunks)")
+
+    for _ in range(chunks):
+        requests.post(
+            f"{server.url}/audio/transcriptions",
+            files={'file': ('audio.wav', pcm.tobytes(), 'audio/wav'), 'model': (None, 'whisper-1')},
+            timeout=30
+        )
+    print(f"   requests.post:       {server.stats['connections']} connections for {server.stats['requests']} requests")
+
+    warm_connections, texts = run_client(server, chunks, pcm)
+    print(f"   TranscriptionClient: {server.stats['connections']} connections for {server.stats['requests']} requests "
+          f"({warm_connections} opened by warm-up)")
+    ok = server.stats['connections'] == 1 and warm_connections == 1 and all(text == expected for text in texts)
+    server.shutdown()
+
+    # Over TLS the warm-up also has to take the only handshake off the first request
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = make_certificate(directory)
+        server = MockServer(certfile=certfile, keyfile=keyfile).start()
+        warm_connections, texts = run_client(server, chunks, pcm, verify=certfile)
+        print(f"   TLS:                 {server.stats['handshakes']} handshakes for {server.stats['requests']} requests "
+              f"({warm_connections} opened by warm-up)")
+        ok = (ok and server.stats['handshakes'] == 1 and server.stats['connections'] == 1 and warm_connections == 1
+              and all(text == expected for text in texts))
+        server.shutdown()
+
+    print("✅ OK" if ok else f"❌ FAILED ({texts[0]!r})")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -4,22 +4,56 @@ OPEN_AI_KEY = 'sk-proj-YOUR-OPEN-AI-KEY-GOES-HERE'
 OPENAI_MODEL_WS = 'gpt-4o-realtime-preview'
 # OPENAI_MODEL_WS = 'gpt-4o-mini-realtime-preview'
 CHUNK_SIZE_MS = 100
+OPENAI_REALTIME_URL = 'wss://api.openai.com/v1/realtime'  # Realtime API endpoint, e.g. 'ws://127.0.0.1:8765/v1/realtime' for mock_server.py
+WS_SESSION_REFRESH = 1500  # Seconds after which the idle pre-connected realtime session is replaced, below the API's 30 minute session limit
 
 # HTTP REQ APP
 OPENAI_MODEL_REQ = 'gpt-4o-transcribe'
 # OPENAI_MODEL_REQ = 'gpt-4o-mini-transcribe'
 # OPENAI_MODEL_REQ = 'whisper-1'
 
+TRANSCRIPTION_BACKEND = 'openai'  # 'openai' - api.openai.com, 'openai-compatible' - self-hosted server at TRANSCRIPTION_BASE_URL, 'fake' - offline test backend
+TRANSCRIPTION_BASE_URL = ''       # API base URL including /v1, e.g. 'http://192.168.1.10:8000/v1' (empty = api.openai.com)
+REQUEST_RETRIES = 3               # Retries of a chunk after a 5xx, 429 (waiting as long as Retry-After asks) or connection error, with jittered exponential backoff; 0 = give up at once
+REQUEST_TIMEOUT = 30              # Seconds a transcription request may take before it fails (and is retried)
+REQUEST_HEDGING = False           # Send a duplicate request when a chunk takes longer than the p95 of recent ones, the first answer wins; cuts tail latency, costs extra requests
+REQUEST_POLICY = {}               # Per-backend overrides, e.g. {'openai-compatible': {'retries': 1, 'timeout': 120, 'hedge': False}}; keys: retries, timeout, hedge, backoff_min, backoff_max, retry_after_max, hedge_min_delay
+RATE_LIMIT_RPM = 0                # Requests per minute this app sends at most, extra chunks wait in a queue instead of hitting 429s (0 = no limit of its own)
+RATE_LIMIT_AUDIO_SECONDS = 0      # Seconds of audio per minute this app uploads at most (0 = no limit)
+MAX_IN_FLIGHT = 0                 # Transcription requests open at the same time at most, including speculative and hedged ones and open streamed uploads (0 = no cap)
+RATE_LIMIT_ADAPTIVE = True        # Follow the x-ratelimit-* headers of the answers: slow down to the key's real limit and what other apps on the same key left over
+
 VAD_THRESHOLD = 1000      # Voice Activity Detection threshold
+VAD_FRAME_MS = 16         # Length of the frames speech is detected in (10-20 ms), chunk edges are placed at this resolution
+VAD_DETECTOR = 'rms'      # Speech detector: 'rms' - loudness, 'zcr' - loudness, hiss-like frames need twice the level, 'band' - loudness of the 300-3400 Hz speech band only (ignores hum and rumble); compare with: python vad_test.py THRESHOLD DETECTOR
+VAD_ADAPTIVE = False      # Derive the threshold from the measured background noise instead of VAD_THRESHOLD, for rooms with fans/HVAC
+VAD_NOISE_WINDOW = 8      # Seconds of audio the noise floor is measured over (lowest level in the window), longer than your longest run of speech without a pause
+VAD_ONSET_RATIO = 3.0     # Speech starts when the level exceeds noise floor × this (3.0 ≈ 10 dB)
+VAD_OFFSET_RATIO = 2.0    # Speech continues while the level stays above noise floor × this, lower than the onset so it does not flap
+VAD_MIN_THRESHOLD = 200   # Adaptive onset threshold never goes below this, so a silent room does not trigger on the faintest sound
 PRE_RECORD_MS = 150       # Pre-record buffer duration in milliseconds to capture speech start
+CAPTURE_MODE = 'callback'  # Microphone capture: 'callback' - PortAudio hands blocks to a queue, VAD runs on its own thread (no overflows while busy), 'blocking' - a thread reads the device in a loop
+CAPTURE_NATIVE_RATE = False  # Open the microphone at its own sample rate (e.g. 48000 Hz) and resample in the app, for USB headsets that overflow or lag when CoreAudio converts; ~0.3-0.9% of one core
+WARM_STREAM = False       # Keep the microphone open while idle: recording starts instantly with the pre-roll already filled, costs about one wake-up per 64 ms block (well under 1% of one core) and the OS shows the microphone as in use
 SILENCE_DURATION = 1      # Seconds of silence to consider the end of a chunk
+SPECULATIVE_DELAY = 0     # Seconds of silence after which the chunk is already sent, its text is pasted as soon as SILENCE_DURATION confirms the pause and discarded if you keep talking (e.g. 0.25, costs extra requests); 0 = disabled
+COMPACT_SILENCE_MAX = 0   # Pauses inside a chunk longer than this (seconds) are shortened to COMPACT_SILENCE_GAP before upload, e.g. 0.6; 0 = upload chunks as recorded
+COMPACT_SILENCE_GAP = 0.3 # Length a long pause is shortened to, in seconds
+COMPACT_TAIL_MARGIN = 0.2 # Silence kept after the last word of a chunk, in seconds, the rest of SILENCE_DURATION is not uploaded (with COMPACT_SILENCE_MAX set)
 AUDIO_LENGTH_MIN = 0.5    # Minimum length of a single audio chunk in seconds
 AUDIO_LENGTH_MAX = 30     # Maximum length of a single audio chunk in seconds
+SPLIT_SEARCH_WINDOW = 2   # Seconds before AUDIO_LENGTH_MAX searched for the quietest point to split a long monologue at, the rest carries over into the next chunk; 0 = cut exactly at AUDIO_LENGTH_MAX
 AUTO_STOP_TIMEOUT = 30    # Automatically stop recording after this many seconds of total silence, set to 0 to disable
 
 ENABLE_CONTEXT = False    # Enable/disable sending context prompt to Whisper API
 CONTEXT_CHUNKS_COUNT = 3  # Number of previous transcriptions to use as context for Whisper prompt
+CONTEXT_MODE = 'dispatch' # How context interacts with parallel workers: 'dispatch' - use text pasted so far when a chunk is sent, 'serial' - send each chunk only after the previous one is pasted
+
+TRANSCRIPTION_WORKERS = 2 # Number of chunks transcribed in parallel, text is still pasted in speaking order
+UPLOAD_CODEC = 'wav'      # Upload encoding: 'wav' - raw PCM, 'flac' - lossless (~50% smaller), 'opus' - low bitrate OGG/Opus (~90% smaller); 'flac' and 'opus' need soundfile
+STREAMING_UPLOAD = False  # Upload each chunk while you are still speaking (chunked transfer encoding, 'wav' codec only), only the tail is sent after the pause; falls back to whole-chunk uploads if the server refuses; ignored with CONTEXT_MODE = 'serial'
 
 SOUND_MODE = 'start-stop' # Sound playback mode: 'none' - no sounds, 'start-stop' - start/stop only, 'all' - all sounds
 
 DEBUG_LOGS = False        # Enable/disable debug logging
+TRACE_FILE = ''           # Per-chunk latency traces as JSON lines (rotated at 5 MB), e.g. 'chunk_trace.jsonl', summarize with: python chunk_trace.py chunk_trace.jsonl*; empty = disabled
@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import soundfile
+from replay import SimulatedClock, FakePyAudio, load_transcriber
+from sound_player import FeedbackPlayer, NullBackend, PreloadedBackend
+
+RATE = 16000
+
+class TimedStream:
+    """Wraps a PyAudio stream and reports its first blocking read."""
+
+    def __init__(self, stream, on_first_block):
+        self.stream = stream
+        self.on_first_block = on_first_block
+
+    def read(self, *args, **kwargs):
+        data = self.stream.read(*args, **kwargs)
+        self.on_first_block()
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+class TimedAudio:
+    """Wraps PyAudio and remembers when capture got its first block, read or delivered to a stream callback."""
+
+    def __init__(self, audio):
+        self.audio = audio
+        self.first_read_at = None
+
+    def mark_first_block(self):
+        if self.first_read_at is None:
+            self.first_read_at = time.perf_counter()
+
+    def open(self, **kwargs):
+        callback = kwargs.get('stream_callback')
+        if callback:
+            def timed_callback(*args):
+                self.mark_first_block()
+                return callback(*args)
+            kwargs['stream_callback'] = timed_callback
+        return TimedStream(self.audio.open(**kwargs), self.mark_first_block)
+
+    def __getattr__(self, name):
+        return getattr(self.audio, name)
+
+class RecordingOutput:
+    """Stands in for the output side of pyaudio.PyAudio, keeps what each opened stream was given."""
+
+    def __init__(self):
+        self.played = []
+
+    def get_format_from_width(self, width):
+        return 8
+
+    def open(self, format=None, channels=1, rate=None, output=False):
+        self.played.append((rate, channels, bytearray()))
+        return self
+
+    def write(self, data):
+        self.played[-1][2].extend(data)
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+def check_preloaded():
+    """Cues are decoded when the backend is created and still play after their files are gone."""
+    tone = (np.sin(np.arange(4410) * 0.1) * 8000).astype(np.int16)
+    output = RecordingOutput()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'start.aiff')
+        soundfile.write(path, tone, 44100)
+        backend = PreloadedBackend({'start': path, 'stop': os.path.join(directory, 'missing.aiff')}, output)
+    for cue in ('start', 'stop', 'start'):
+        backend.play(cue)
+    ok = output.played == [(44100, 1, bytearray(tone.tobytes()))] * 2
+    print(f"   Preloaded cues: {len(output.played)} plays from memory after the files were deleted, missing cue silent: {ok}")
+    return ok
+
+def hotkey_to_capture(transcriber, sound_duration):
+    """Seconds from the hotkey until the listener is free and until the first block is captured."""
+    transcriber.feedback = FeedbackPlayer(NullBackend(sound_duration), 'all')
+    transcriber.audio = TimedAudio(transcriber.audio)
+    try:
+        pressed_at = time.perf_counter()
+        transcriber.start_recording()
+        returned_at = time.perf_counter()
+
+        deadline = time.time() + sound_duration + 2
+        while transcriber.audio.first_read_at is None and time.time() < deadline:
+            time.sleep(0.001)
+
+        transcriber.stop_recording()
+        return returned_at - pressed_at, transcriber.audio.first_read_at - pressed_at
+    finally:
+        transcriber.audio = transcriber.audio.audio
+
+def main():
+    sound_duration = float(sys.argv[1]) if len(sys.argv) > 1 else 1.5
+
+    class SilentTranscriber(load_transcriber().WhisperTranscriber):
+        def init_audio(self):
+            self.audio = FakePyAudio(np.zeros(RATE * 10, dtype=np.int16), RATE, SimulatedClock())
+
+    transcriber = SilentTranscriber()
+    try:
+        silent = hotkey_to_capture(transcriber, 0)
+        with_sound = hotkey_to_capture(transcriber, sound_duration)
+    finally:
+        transcriber.cleanup()
+
+    print("Hotkey to listener free / first captured block")
+    print(f"   no sound:   {silent[0] * 1000:7.1f} ms / {silent[1] * 1000:7.1f} ms")
+    print(f"   {sound_duration:.1f}s sound: {with_sound[0] * 1000:7.1f} ms / {with_sound[1] * 1000:7.1f} ms")
+
+    # Device open time varies a little between runs, but a blocking cue would add its full duration
+    timing_ok = all(loud - quiet < sound_duration / 2 for quiet, loud in zip(silent, with_sound))
+    if not timing_ok:
+        print("   Sound playback delays recording start")
+    ok = check_preloaded() and timing_ok
+    print("✅ OK" if ok else "❌ FAILED")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import time
+import argparse
+import threading
+import numpy as np
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from mock_server import MockServer
+from transcription_backends import create_transcription_backend, TranscriptionError
+
+RATE = 16000
+
+def run_level(backend, pcm, concurrency, requests, duration):
+    """Send chunks from `concurrency` threads, returns the latencies of the answered ones and the outcomes."""
+    latencies = []
+    outcomes = Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+    sent = iter(range(requests)) if not duration else None
+
+    def worker():
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+            elif next(sent, None) is None:
+                return
+
+            start = time.perf_counter()
+            try:
+                backend.transcribe(pcm)
+                outcome = 200
+            except TranscriptionError as e:
+                outcome = e.status_code
+            except Exception as e:
+                outcome = type(e).__name__
+            elapsed = time.perf_counter() - start
+            with lock:
+                outcomes[outcome] += 1
+                if outcome == 200:
+                    latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return latencies, outcomes, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency sweep or soak test of the transcription client against a (mock) API")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="comma-separated numbers of parallel requests")
+    parser.add_argument("--requests", type=int, default=40, help="requests per concurrency level")
+    parser.add_argument("--duration", type=float, default=0, help="run each level for this many seconds instead (soak)")
+    parser.add_argument("--chunk", type=float, default=3, help="seconds of audio per request")
+    parser.add_argument("--codec", default="wav", help="upload codec")
+    parser.add_argument("--base-url", help="API base URL with /v1, default: an in-process mock_server")
+    parser.add_argument("--model", default="whisper-1")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock latency per request")
+    parser.add_argument("--jitter", type=float, default=0.1, help="mock latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0, help="mock share of 500 answers")
+    parser.add_argument("--rpm", type=int, default=0, help="mock requests per minute before 429")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="mock requests worked on at once")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = MockServer(
+            latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+            rpm=args.rpm, max_concurrent=args.max_concurrent, seed=0
+        ).start()
+        base_url = server.url
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    pcm = (np.random.default_rng(0).normal(0, 2000, int(args.chunk * RATE))).astype(np.int16)
+    workload = f"{args.duration:g}s per level" if args.duration else f"{args.requests} requests per level"
+    print(f"Load test against {base_url} ({args.chunk:g}s chunks, {args.codec}, {workload})")
+    print(f"   {'parallel':>8} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}  outcomes")
+
+    for concurrency in levels:
+        backend = create_transcription_backend(
+            'openai-compatible', 'test', args.model, args.codec, RATE, base_url=base_url, pool_size=concurrency
+        )
+        latencies, outcomes, elapsed = run_level(backend, pcm, concurrency, args.requests, args.duration)
+        backend.close()
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000 if latencies else (0, 0, 0)
+        summary = ', '.join(f"{outcome}: {count}" for outcome, count in sorted(outcomes.items(), key=str))
+        print(f"   {concurrency:>8} {sum(outcomes.values()) / elapsed:>7.1f} {p50:>7.0f} {p95:>7.0f} {p99:>7.0f}  {summary}")
+
+    if server:
+        print(f"   Mock server: {server.stats}")
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
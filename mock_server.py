@@ -0,0 +1,636 @@
+import ssl
+import json
+import math
+import time
+import base64
+import random
+import socket
+import struct
+import hashlib
+import argparse
+import threading
+import numpy as np
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+WS_TEXT, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x8, 0x9, 0xA
+
+RESPONSE_FORMATS = ('json', 'text', 'verbose_json')
+
+# Leading bytes of the containers the API accepts (WAV, FLAC, Ogg, MP3)
+AUDIO_SIGNATURES = (b'RIFF', b'fLaC', b'OggS', b'ID3', b'\xff\xfb', b'\xff\xf3')
+
+# Realtime input is pcm16 at 24 kHz, the mock's server VAD works on 20 ms frames
+REALTIME_RATE = 24000
+REALTIME_FRAME = REALTIME_RATE // 50
+REALTIME_SPEECH_RMS = 500
+
+
+def openai_error(message, error_type, code=None, param=None):
+    return {'error': {'message': message, 'type': error_type, 'param': param, 'code': code}}
+
+
+def format_reset(seconds):
+    """Duration in the style of the x-ratelimit-reset-* headers: 20ms, 1.5s, 6m0s."""
+    if seconds < 1:
+        return f"{round(seconds * 1000)}ms"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes:
+        return f"{int(minutes)}m{seconds:.0f}s"
+    return f"{seconds:.3g}s"
+
+
+def wav_duration(audio):
+    """Seconds of audio in a WAV upload, None for other containers."""
+    if audio[:4] != b'RIFF' or len(audio) < 44:
+        return None
+    byte_rate = struct.unpack('<I', audio[28:32])[0]
+    return (len(audio) - 44) / byte_rate if byte_rate else None
+
+
+class MockRealtimeSession:
+    """State of one realtime connection: session config, the input audio buffer and server VAD.
+
+    With turn_detection of type server_vad, 20 ms frames louder than
+    REALTIME_SPEECH_RMS count as speech. The item is committed once the
+    configured silence_duration_ms follows, with the events the API sends
+    (speech_started, speech_stopped, committed, conversation.item.created)
+    and, with input_audio_transcription set, the transcript after the
+    server latency. Responses (model output) are not generated.
+    """
+
+    def __init__(self, handler, session_id, model):
+        self.handler = handler
+        self.server = handler.server
+        self.session = {
+            'id': session_id,
+            'object': 'realtime.session',
+            'model': model,
+            'modalities': ['text', 'audio'],
+            'input_audio_format': 'pcm16',
+            'input_audio_transcription': None,
+            'turn_detection': {'type': 'server_vad', 'threshold': 0.5, 'prefix_padding_ms': 300, 'silence_duration_ms': 500},
+        }
+        self.buffer = bytearray()
+        self.pending = np.zeros(0, dtype=np.int16)
+        self.audio_ms = 0
+        self.speaking = False
+        self.silence_ms = 0
+        self.item_id = None
+        self.previous_item_id = None
+        self.items = 0
+        self.timers = []
+
+    def send(self, event):
+        self.handler.send_event(event)
+
+    def error(self, message, code=None, event_id=None):
+        error = openai_error(message, 'invalid_request_error', code)['error']
+        error['event_id'] = event_id
+        self.send({'type': 'error', 'error': error})
+
+    def new_item_id(self):
+        self.items += 1
+        self.item_id = f"item_mock{self.items}"
+        return self.item_id
+
+    def handle(self, event):
+        event_type = event.get('type')
+        if event_type == 'session.update':
+            self.session.update(event.get('session', {}))
+            self.send({'type': 'session.updated', 'session': self.session})
+        elif event_type == 'input_audio_buffer.append':
+            try:
+                audio = base64.b64decode(event.get('audio', ''), validate=True)
+            except ValueError:
+                self.error("Invalid 'audio'. Expected base64-encoded audio bytes.", 'invalid_value', event.get('event_id'))
+                return
+            self.server.count('bytes', len(audio))
+            self.server.count('realtime_appends')
+            self.append(audio)
+        elif event_type == 'input_audio_buffer.commit':
+            if len(self.buffer) < REALTIME_RATE * 2 // 10:
+                self.error(
+                    f"Error committing input audio buffer: buffer too small. Expected at least 100ms of audio, "
+                    f"but buffer only has {len(self.buffer) * 1000 // (REALTIME_RATE * 2)}ms of audio.",
+                    'input_audio_buffer_commit_empty', event.get('event_id')
+                )
+                return
+            self.commit(self.item_id or self.new_item_id())
+        elif event_type == 'input_audio_buffer.clear':
+            self.buffer.clear()
+            self.speaking = False
+            self.send({'type': 'input_audio_buffer.cleared'})
+        else:
+            self.error(f"Invalid value: '{event_type}'", 'invalid_value', event.get('event_id'))
+
+    def append(self, audio):
+        self.buffer.extend(audio)
+        turn_detection = self.session.get('turn_detection') or {}
+        if turn_detection.get('type') != 'server_vad':
+            return
+
+        samples = np.concatenate([self.pending, np.frombuffer(audio[:len(audio) // 2 * 2], dtype=np.int16)])
+        count = len(samples) // REALTIME_FRAME
+        self.pending = samples[count * REALTIME_FRAME:]
+        frames = samples[:count * REALTIME_FRAME].reshape(count, REALTIME_FRAME).astype(np.float64)
+        for rms in np.sqrt(np.mean(frames ** 2, axis=1)):
+            self.audio_ms += 20
+            if rms >= REALTIME_SPEECH_RMS:
+                self.silence_ms = 0
+                if not self.speaking:
+                    self.speaking = True
+                    self.send({
+                        'type': 'input_audio_buffer.speech_started',
+                        'audio_start_ms': max(0, self.audio_ms - 20 - turn_detection.get('prefix_padding_ms', 300)),
+                        'item_id': self.new_item_id()
+                    })
+            elif self.speaking:
+                self.silence_ms += 20
+                if self.silence_ms >= turn_detection.get('silence_duration_ms', 500):
+                    self.speaking = False
+                    self.send({'type': 'input_audio_buffer.speech_stopped', 'audio_end_ms': self.audio_ms, 'item_id': self.item_id})
+                    self.commit(self.item_id)
+
+    def commit(self, item_id):
+        audio_bytes = len(self.buffer)
+        self.buffer.clear()
+        self.send({'type': 'input_audio_buffer.committed', 'previous_item_id': self.previous_item_id, 'item_id': item_id})
+        self.send({
+            'type': 'conversation.item.created',
+            'previous_item_id': self.previous_item_id,
+            'item': {'id': item_id, 'object': 'realtime.item', 'type': 'message', 'status': 'completed', 'role': 'user',
+                     'content': [{'type': 'input_audio', 'transcript': None}]}
+        })
+        self.previous_item_id = item_id
+        self.item_id = None
+        self.server.count('realtime_items')
+
+        if self.session.get('input_audio_transcription'):
+            timer = threading.Timer(self.server.response_delay(), self.transcribe, args=(item_id, audio_bytes))
+            timer.daemon = True
+            timer.start()
+            self.timers.append(timer)
+
+    def transcribe(self, item_id, audio_bytes):
+        try:
+            if self.server.fail():
+                self.send({
+                    'type': 'conversation.item.input_audio_transcription.failed',
+                    'item_id': item_id,
+                    'content_index': 0,
+                    'error': {'type': 'transcription_error', 'code': 'server_error', 'message': 'Mock transcription failure', 'param': None}
+                })
+                return
+            self.send({
+                'type': 'conversation.item.input_audio_transcription.completed',
+                'item_id': item_id,
+                'content_index': 0,
+                'transcript': f"transcribed {audio_bytes} bytes"
+            })
+        except OSError:
+            pass
+
+    def close(self):
+        for timer in self.timers:
+            timer.cancel()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes, Nagle would hold the body for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+        if self.server.tls:
+            self.server.count('handshakes')
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_text(self, status, text, content_type='text/plain', headers=None):
+        body = text.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_json(self, status, payload, headers=None):
+        self.send_text(status, json.dumps(payload), 'application/json', headers)
+
+    def do_HEAD(self):
+        self.send_text(200, '')
+
+    def do_GET(self):
+        if self.path.startswith('/v1/realtime') and self.headers.get('Upgrade', '').lower() == 'websocket':
+            self.handle_realtime()
+            return
+        self.send_text(200, '{"object": "list", "data": []}', 'application/json')
+
+    def read_frame(self):
+        """One client WebSocket frame as (opcode, unmasked payload), (None, None) once the socket closed."""
+        head = self.rfile.read(2)
+        if len(head) < 2:
+            return None, None
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', self.rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', self.rfile.read(8))[0]
+        mask = self.rfile.read(4) if head[1] & 0x80 else b''
+        payload = self.rfile.read(length)
+        if mask and length:
+            key = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, 'little') ^ int.from_bytes(key, 'little')).to_bytes(length, 'little')
+        return head[0] & 0x0F, payload
+
+    def send_frame(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+        with self.frame_lock:
+            self.wfile.write(header + payload)
+
+    def send_event(self, event):
+        self.event_count += 1
+        self.send_frame(WS_TEXT, json.dumps({'event_id': f"event_mock{self.event_count}", **event}).encode())
+
+    def expire_session(self):
+        """Close the session like the API does when it reaches its maximum duration."""
+        try:
+            self.send_event({'type': 'error', 'error': {'type': 'invalid_request_error', 'code': 'session_expired', 'message': 'Your session hit the maximum duration.'}})
+            self.send_frame(WS_CLOSE, struct.pack('!H', 1000))
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def handle_realtime(self):
+        """Realtime API session over a WebSocket, see MockRealtimeSession for the event flow."""
+        if self.server.reject_realtime():
+            self.send_text(503, 'Service Unavailable')
+            return
+
+        key = self.headers.get('Sec-WebSocket-Key', '')
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.send_response(101, 'Switching Protocols')
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', accept)
+        self.end_headers()
+        self.close_connection = True
+        self.frame_lock = threading.Lock()
+        self.event_count = 0
+        self.server.count('realtime_sessions')
+
+        expiry = None
+        if self.server.realtime_lifetime:
+            expiry = threading.Timer(self.server.realtime_lifetime, self.expire_session)
+            expiry.daemon = True
+            expiry.start()
+
+        model = self.path.partition('model=')[2].partition('&')[0] or None
+        session = MockRealtimeSession(self, f"sess_mock{self.server.stats['realtime_sessions']}", model)
+        if self.server.realtime_delay:
+            time.sleep(self.server.realtime_delay)
+        self.send_event({'type': 'session.created', 'session': session.session})
+
+        try:
+            while True:
+                opcode, payload = self.read_frame()
+                if opcode is None:
+                    break
+                if opcode == WS_CLOSE:
+                    self.send_frame(WS_CLOSE, payload[:2])
+                    break
+                if opcode == WS_PING:
+                    self.send_frame(WS_PONG, payload)
+                    continue
+                if opcode != WS_TEXT:
+                    continue
+
+                try:
+                    event = json.loads(payload)
+                except ValueError:
+                    session.error("The server could not parse the event as JSON.", 'invalid_json')
+                    continue
+                session.handle(event)
+        except OSError:
+            pass
+        finally:
+            session.close()
+            if expiry:
+                expiry.cancel()
+
+    def read_sized(self, size, parts, arrivals):
+        """Read size bytes, no faster than the server bandwidth allows."""
+        bandwidth = self.server.bandwidth
+        while size > 0:
+            piece = self.rfile.read(min(size, 16384))
+            if not piece:
+                break
+            size -= len(piece)
+            parts.append(piece)
+
+            received = (arrivals[-1][1] if arrivals else 0) + len(piece)
+            if bandwidth:
+                self.upload_budget = max(self.upload_budget, time.perf_counter()) + len(piece) / bandwidth
+                time.sleep(max(0, self.upload_budget - time.perf_counter()))
+            arrivals.append((time.perf_counter(), received))
+
+    def read_body(self):
+        """Request body and its arrival as [(perf_counter, total bytes so far)]."""
+        parts = []
+        arrivals = []
+        self.upload_budget = 0
+
+        if self.headers.get('Transfer-Encoding', '').lower() != 'chunked':
+            self.read_sized(int(self.headers.get('Content-Length', 0)), parts, arrivals)
+            return b''.join(parts), arrivals
+
+        while True:
+            size = int(self.rfile.readline().split(b';')[0], 16)
+            if size == 0:
+                self.rfile.readline()
+                break
+            self.read_sized(size, parts, arrivals)
+            self.rfile.readline()
+        return b''.join(parts), arrivals
+
+    def parse_form(self, body):
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        form = {}
+        for part in message.iter_parts():
+            form[part.get_param('name', header='content-disposition')] = part.get_payload(decode=True)
+        return form
+
+    def do_POST(self):
+        if self.path != '/v1/audio/transcriptions':
+            self.send_json(404, openai_error(f"Invalid URL (POST {self.path})", 'invalid_request_error'))
+            return
+
+        body, arrivals = self.read_body()
+        streamed = self.headers.get('Transfer-Encoding', '').lower() == 'chunked'
+        self.server.count('requests')
+        self.server.count('bytes', len(body))
+        self.server.uploads.append(arrivals)
+
+        if streamed and not self.server.accept_streaming:
+            self.send_text(411, 'Length Required')
+            return
+
+        allowed, headers = self.server.take_request()
+        if not allowed:
+            self.send_json(429, openai_error(
+                f"Rate limit reached for requests per min (RPM): Limit {self.server.rpm or 'mock'}. Please try again in {headers['retry-after']}s.",
+                'requests', 'rate_limit_exceeded'
+            ), headers)
+            return
+
+        form = self.parse_form(body)
+        audio = form.get('file', b'')
+        model = (form.get('model') or b'').decode()
+        prompt = (form.get('prompt') or b'').decode()
+        response_format = (form.get('response_format') or b'json').decode()
+
+        if not model:
+            self.send_json(400, openai_error("you must provide a model parameter", 'invalid_request_error', param='model'), headers)
+            return
+        if not audio.startswith(AUDIO_SIGNATURES) and audio[4:8] != b'ftyp':
+            self.send_json(400, openai_error("Invalid file format.", 'invalid_request_error', param='file'), headers)
+            return
+        if response_format not in RESPONSE_FORMATS:
+            self.send_json(400, openai_error(
+                f"Invalid value: '{response_format}'. Supported values are: {', '.join(RESPONSE_FORMATS)}.",
+                'invalid_request_error', 'unsupported_value', 'response_format'
+            ), headers)
+            return
+        self.server.record_prompt(prompt)
+
+        with self.server.capacity():
+            time.sleep(self.server.response_delay())
+            if self.server.fail():
+                self.send_json(500, openai_error("The server had an error while processing your request. Sorry about that!", 'server_error'), headers)
+                return
+
+        text = f"transcribed {len(audio)} bytes"
+        if response_format == 'text':
+            self.send_text(200, text, headers=headers)
+        elif response_format == 'json':
+            self.send_json(200, {'text': text}, headers)
+        else:
+            self.send_json(200, {'task': 'transcribe', 'language': 'english', 'duration': wav_duration(audio), 'text': text, 'segments': []}, headers)
+
+
+class MockServer(ThreadingHTTPServer):
+    """Local stand-in for the OpenAI API that counts connections and requests.
+
+    url is the API base URL (with the /v1 prefix) to hand to the clients.
+    uploads keeps the byte arrival times of every request body, and
+    accept_streaming=False answers chunked bodies with 411 like servers
+    that need a Content-Length. bandwidth (bytes/s, 0 = unlimited) paces
+    request bodies like a slow uplink would.
+
+    POST /v1/audio/transcriptions checks model, file and response_format
+    (json, text or verbose_json) like the API and answers with its error
+    bodies; prompts keeps the prompt of every request. Each answer takes
+    latency plus up to jitter seconds, stall_rate of them stall seconds
+    more (a latency tail), and error_rate of them fail with 500.
+    rpm limits requests per minute with a token bucket, answering 429 with
+    Retry-After and x-ratelimit-* headers, and rate_limit_rate rejects that
+    share of requests with 429 regardless. max_concurrent requests are
+    worked on at once, the others wait for a slot.
+
+    GET /v1/realtime with a WebSocket upgrade opens a Realtime API
+    session (ws_url), see MockRealtimeSession. realtime_delay holds back
+    session.created like a slow handshake, the first realtime_failures
+    upgrades are answered with 503, and realtime_lifetime (seconds,
+    0 = unlimited) expires sessions like the API's maximum session
+    duration. Transcripts take the same latency and fail at error_rate.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, certfile=None, keyfile=None, latency=0, accept_streaming=True, bandwidth=0,
+                 realtime_delay=0, realtime_failures=0, realtime_lifetime=0,
+                 jitter=0, error_rate=0, rpm=0, rate_limit_rate=0, max_concurrent=0, stall_rate=0, stall=0, seed=None):
+        super().__init__((host, port), MockHandler)
+        self.tls = certfile is not None
+        if self.tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.accept_streaming = accept_streaming
+        self.bandwidth = bandwidth
+        self.realtime_delay = realtime_delay
+        self.realtime_failures = realtime_failures
+        self.realtime_lifetime = realtime_lifetime
+        self.uploads = []
+        self.prompts = []
+        self.random = random.Random(seed)
+
+        self.rpm = rpm
+        self.rate_limit_rate = rate_limit_rate
+        self.tokens = float(rpm)
+        self.refilled = time.monotonic()
+        self.max_concurrent = max_concurrent
+        self.slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self.in_flight = 0
+
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            'connections': 0, 'handshakes': 0, 'requests': 0, 'bytes': 0,
+            'rate_limited': 0, 'errors': 0, 'peak_concurrent': 0,
+            'realtime_sessions': 0, 'realtime_rejected': 0, 'realtime_appends': 0, 'realtime_items': 0
+        }
+
+    @property
+    def url(self):
+        scheme = 'https' if self.tls else 'http'
+        host, port = self.server_address[:2]
+        return f"{scheme}://{host}:{port}/v1"
+
+    @property
+    def ws_url(self):
+        scheme = 'wss' if self.tls else 'ws'
+        host, port = self.server_address[:2]
+        return f"{scheme}://{host}:{port}/v1/realtime"
+
+    def count(self, name, amount=1):
+        with self.stats_lock:
+            self.stats[name] += amount
+
+    def record_prompt(self, prompt):
+        with self.stats_lock:
+            self.prompts.append(prompt)
+
+    def reject_realtime(self):
+        with self.stats_lock:
+            if self.stats['realtime_rejected'] >= self.realtime_failures:
+                return False
+            self.stats['realtime_rejected'] += 1
+            return True
+
+    def response_delay(self):
+        with self.stats_lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            if self.random.random() < self.stall_rate:
+                delay += self.stall
+            return delay
+
+    def fail(self):
+        with self.stats_lock:
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.stats['errors'] += 1
+            return failed
+
+    def take_request(self):
+        """Take one request from the rpm token bucket, returns (allowed, rate limit headers)."""
+        with self.stats_lock:
+            throttled = self.random.random() < self.rate_limit_rate
+            if not self.rpm:
+                allowed, headers = not throttled, {}
+                wait = 1
+            else:
+                now = time.monotonic()
+                self.tokens = min(self.rpm, self.tokens + (now - self.refilled) * self.rpm / 60)
+                self.refilled = now
+                allowed = self.tokens >= 1 and not throttled
+                if allowed:
+                    self.tokens -= 1
+                wait = max(0.0, 1 - self.tokens) * 60 / self.rpm
+                headers = {
+                    'x-ratelimit-limit-requests': str(self.rpm),
+                    'x-ratelimit-remaining-requests': str(int(self.tokens)),
+                    'x-ratelimit-reset-requests': format_reset((self.rpm - self.tokens) * 60 / self.rpm),
+                }
+
+            if not allowed:
+                self.stats['rate_limited'] += 1
+                headers['retry-after'] = str(max(1, math.ceil(wait)))
+                headers['retry-after-ms'] = str(max(1, round(wait * 1000)))
+            return allowed, headers
+
+    def capacity(self):
+        return ServerSlot(self)
+
+    def start(self):
+        server_thread = threading.Thread(target=self.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        return self
+
+
+class ServerSlot:
+    """One of the server's max_concurrent processing slots, tracks the peak concurrency."""
+
+    def __init__(self, server):
+        self.server = server
+
+    def __enter__(self):
+        if self.server.slots:
+            self.server.slots.acquire()
+        with self.server.stats_lock:
+            self.server.in_flight += 1
+            self.server.stats['peak_concurrent'] = max(self.server.stats['peak_concurrent'], self.server.in_flight)
+
+    def __exit__(self, *exc):
+        with self.server.stats_lock:
+            self.server.in_flight -= 1
+        if self.server.slots:
+            self.server.slots.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI transcription and realtime APIs")
+    parser.add_argument("port", type=int, nargs="?", default=8765)
+    parser.add_argument("latency", type=float, nargs="?", default=0, help="seconds per transcription")
+    parser.add_argument("--jitter", type=float, default=0, help="up to this many extra seconds per transcription")
+    parser.add_argument("--stall-rate", type=float, default=0, help="share of transcriptions that take --stall seconds longer")
+    parser.add_argument("--stall", type=float, default=0, help="extra seconds of a stalled transcription")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of transcriptions that fail with 500")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429, 0 = unlimited")
+    parser.add_argument("--rate-limit-rate", type=float, default=0, help="share of requests rejected with 429 regardless of --rpm")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="requests worked on at once, 0 = unlimited")
+    parser.add_argument("--bandwidth", type=float, default=0, help="upload bandwidth in KiB/s, 0 = unlimited")
+    parser.add_argument("--realtime-lifetime", type=float, default=0, help="seconds before a realtime session expires, 0 = never")
+    parser.add_argument("--seed", type=int, help="seed for jitter and injected failures")
+    args = parser.parse_args()
+
+    server = MockServer(
+        port=args.port, latency=args.latency, jitter=args.jitter, stall_rate=args.stall_rate, stall=args.stall, error_rate=args.error_rate,
+        rpm=args.rpm, rate_limit_rate=args.rate_limit_rate, max_concurrent=args.max_concurrent,
+        bandwidth=args.bandwidth * 1024, realtime_lifetime=args.realtime_lifetime, seed=args.seed
+    )
+    print(f"Mock OpenAI server on {server.url} (realtime: {server.ws_url})")
+    print("Press Ctrl+C to exit")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nStopped ({server.stats})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import sys
+import json
+import base64
+import threading
+import numpy as np
+import requests
+import websocket
+from audio_encoders import WavEncoder
+from mock_server import MockServer
+
+RATE = 16000
+
+def post(server, audio, **fields):
+    files = {'file': ('audio.wav', audio, 'audio/wav')}
+    files.update({name: (None, value) for name, value in fields.items()})
+    return requests.post(f"{server.url}/audio/transcriptions", files=files, timeout=10)
+
+def check_transcriptions():
+    server = MockServer().start()
+    audio = b''.join(bytes(part) for part in WavEncoder(RATE).encode(np.zeros(RATE, dtype=np.int16)).parts)
+    try:
+        text = post(server, audio, model='whisper-1', response_format='text')
+        default = post(server, audio, model='whisper-1', prompt='Kubernetes, gRPC')
+        verbose = post(server, audio, model='whisper-1', response_format='verbose_json')
+        no_model = post(server, audio)
+        bad_format = post(server, audio, model='whisper-1', response_format='srt')
+        not_audio = post(server, b'hello', model='whisper-1')
+
+        formats_ok = (
+            text.text == f"transcribed {len(audio)} bytes"
+            and default.json() == {'text': text.text}
+            and verbose.json()['duration'] == 1
+        )
+        errors_ok = (
+            no_model.status_code == 400 and no_model.json()['error']['param'] == 'model'
+            and bad_format.status_code == 400 and bad_format.json()['error']['param'] == 'response_format'
+            and not_audio.status_code == 400
+        )
+        prompt_ok = 'Kubernetes, gRPC' in server.prompts
+        print(f"   Transcriptions: formats {formats_ok}, 400 errors {errors_ok}, prompt recorded {prompt_ok}")
+        return formats_ok and errors_ok and prompt_ok
+    finally:
+        server.shutdown()
+
+def check_faults():
+    audio = b'RIFF' + bytes(100)
+    server = MockServer(rpm=5).start()
+    try:
+        statuses = [post(server, audio, model='whisper-1') for _ in range(7)]
+        limited = statuses[-1]
+        rpm_ok = (
+            [response.status_code for response in statuses] == [200] * 5 + [429] * 2
+            and limited.headers['retry-after'] == '12'
+            and limited.headers['x-ratelimit-remaining-requests'] == '0'
+            and limited.json()['error']['code'] == 'rate_limit_exceeded'
+        )
+    finally:
+        server.shutdown()
+
+    server = MockServer(error_rate=0.5, seed=1).start()
+    try:
+        failed = sum(post(server, audio, model='whisper-1').status_code == 500 for _ in range(40))
+    finally:
+        server.shutdown()
+    print(f"   Faults: rpm limit with Retry-After {rpm_ok}, {failed}/40 failed at error_rate 0.5")
+    return rpm_ok and 10 <= failed <= 30
+
+def check_realtime():
+    # One utterance followed by enough silence for server VAD, then a manual commit of too little audio
+    server = MockServer(latency=0.05).start()
+    events = []
+    done = threading.Event()
+
+    def on_message(ws, message):
+        event = json.loads(message)
+        events.append(event['type'])
+        if event['type'] == 'session.created':
+            ws.send(json.dumps({'type': 'session.update', 'session': {'input_audio_transcription': {'model': 'whisper-1'}}}))
+        elif event['type'] == 'session.updated':
+            tone = (np.sin(np.arange(24000) * 2 * np.pi * 300 / 24000) * 8000).astype(np.int16)
+            for samples in (tone, np.zeros(24000, dtype=np.int16)):
+                ws.send(json.dumps({'type': 'input_audio_buffer.append', 'audio': base64.b64encode(samples.tobytes()).decode()}))
+            ws.send(json.dumps({'type': 'input_audio_buffer.commit'}))
+        elif event['type'] == 'conversation.item.input_audio_transcription.completed':
+            done.set()
+
+    app = websocket.WebSocketApp(f"{server.ws_url}?model=gpt-4o-realtime-preview", on_message=on_message)
+    thread = threading.Thread(target=app.run_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        done.wait(5)
+        expected = [
+            'session.created', 'session.updated', 'input_audio_buffer.speech_started', 'input_audio_buffer.speech_stopped',
+            'input_audio_buffer.committed', 'conversation.item.created', 'error',
+            'conversation.item.input_audio_transcription.completed'
+        ]
+        print(f"   Realtime: {' → '.join(events)}")
+        return events == expected
+    finally:
+        app.close()
+        server.shutdown()
+
+def main():
+    print("Mock server test")
+    results = [check_transcriptions(), check_faults(), check_realtime()]
+    ok = all(results)
+    print("✅ OK" if ok else "❌ FAILED")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import re
+import time
+import logging
+import threading
+
+DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_duration(value):
+    """Seconds in an x-ratelimit-reset-* value such as 20ms, 1.5s or 6m0s, None if unreadable."""
+    parts = DURATION_PART.findall(value or '')
+    if not parts:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+class TokenBucket:
+    """`per_minute` units per minute, holding up to burst seconds' worth.
+
+    A take larger than the bucket waits until it is full and leaves it in
+    debt, so chunks longer than the burst still go through at the
+    average rate. per_minute 0 means unlimited.
+    """
+
+    def __init__(self, per_minute, burst=60):
+        self.burst = burst
+        self.set_rate(per_minute)
+        self.tokens = self.capacity
+        self.refilled = time.monotonic()
+
+    def set_rate(self, per_minute):
+        self.per_minute = per_minute
+        self.capacity = per_minute * self.burst / 60
+
+    def refill(self, now):
+        if self.per_minute:
+            self.tokens = min(self.capacity, self.tokens + (now - self.refilled) * self.per_minute / 60)
+        self.refilled = now
+
+    def wait_time(self, amount):
+        """Seconds until amount can be taken, 0 if it can now."""
+        if not self.per_minute:
+            return 0
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def take(self, amount):
+        if self.per_minute:
+            self.tokens -= amount
+
+
+class RateGovernor:
+    """Paces transcription requests to stay under the API's rate limits, shared by every thread.
+
+    acquire() queues the caller until the request bucket (rpm), the audio
+    bucket (audio seconds per minute) and the in-flight cap all allow one
+    more request, in arrival order; release() gives the slot back. Work is
+    delayed, never dropped.
+
+    With adaptive, the x-ratelimit-* headers of every answer tune the
+    buckets: the server's limit becomes the request rate when it is lower
+    (or none was set), the remaining count caps the local tokens (other
+    clients on the same key use them too), and a used-up token budget
+    holds everyone until its reset. A 429 holds everyone for its
+    Retry-After.
+    """
+
+    def __init__(self, rpm=0, audio_seconds=0, max_in_flight=0, adaptive=True, burst=60):
+        self.logger = logging.getLogger(__name__)
+        self.requests = TokenBucket(rpm, burst)
+        self.audio = TokenBucket(audio_seconds, burst)
+        self.configured_rpm = rpm
+        self.max_in_flight = max_in_flight
+        self.adaptive = adaptive
+
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.next_ticket = 0
+        self.serving = 0
+        self.paused_until = 0
+        self.stats = {'requests': 0, 'waited': 0, 'wait_seconds': 0.0, 'rate_limited': 0, 'peak_in_flight': 0, 'peak_queued': 0}
+
+    def blocked_for(self, now, audio_seconds):
+        """Seconds until the next request may go, 0 if it may go now, None while the in-flight cap is reached."""
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return None
+        self.requests.refill(now)
+        self.audio.refill(now)
+        return max(self.paused_until - now, self.requests.wait_time(1), self.audio.wait_time(audio_seconds))
+
+    def acquire(self, audio_seconds=0, chunk_id="chunk"):
+        """Wait for a turn to send a request for audio_seconds of audio, returns the seconds waited."""
+        start = time.monotonic()
+        logged = False
+        with self.condition:
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            self.stats['peak_queued'] = max(self.stats['peak_queued'], self.next_ticket - self.serving)
+
+            while True:
+                now = time.monotonic()
+                wait = self.blocked_for(now, audio_seconds) if ticket == self.serving else None
+                if wait == 0:
+                    break
+                if not logged and ticket == self.serving:
+                    logged = True
+                    self.logger.debug(f"🚦 {chunk_id} queued ({self.describe(now)})")
+                self.condition.wait(wait)
+
+            self.admit(audio_seconds)
+            waited = now - start
+            if waited > 0.001:
+                self.stats['waited'] += 1
+                self.stats['wait_seconds'] += waited
+
+        if logged:
+            self.logger.debug(f"🚦 {chunk_id} sent after {waited:.2f}s in the queue")
+        return waited
+
+    def try_acquire(self):
+        """Take a request slot without waiting, False if the request would have to queue.
+
+        For requests that cannot wait, like a streamed upload opened by the
+        capture thread. Their audio is only known at the end and is taken
+        from the audio bucket by release().
+        """
+        with self.condition:
+            if self.next_ticket != self.serving or self.blocked_for(time.monotonic(), 0) != 0:
+                return False
+            self.next_ticket += 1
+            self.admit(0)
+            return True
+
+    def admit(self, audio_seconds):
+        """Let the request at the head of the queue go, with the condition held."""
+        self.serving += 1
+        self.requests.take(1)
+        self.audio.take(audio_seconds)
+        self.in_flight += 1
+        self.stats['requests'] += 1
+        self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.in_flight)
+        # The next ticket may be free to go as well
+        self.condition.notify_all()
+
+    def release(self, status=None, headers=None, retry_after=None, audio_seconds=0):
+        """The request is answered (status None if it failed without one), adapt to its status and headers."""
+        with self.condition:
+            self.in_flight -= 1
+            if audio_seconds:
+                self.audio.refill(time.monotonic())
+                self.audio.take(audio_seconds)
+            self.update(status, headers, retry_after)
+            self.condition.notify_all()
+
+    def update(self, status, headers, retry_after):
+        now = time.monotonic()
+        if status == 429:
+            self.stats['rate_limited'] += 1
+            self.pause(now, retry_after if retry_after is not None else 1, "rate limited")
+        if not (self.adaptive and headers):
+            return
+
+        limit = self.header_number(headers, 'x-ratelimit-limit-requests')
+        remaining = self.header_number(headers, 'x-ratelimit-remaining-requests')
+        if limit and (not self.configured_rpm or limit < self.configured_rpm) and limit != self.requests.per_minute:
+            self.requests.refill(now)
+            self.requests.set_rate(limit)
+            self.requests.tokens = self.requests.capacity
+            self.logger.debug(f"🚦 Request rate set to the server's limit of {limit:g}/min")
+        if remaining is not None and self.requests.per_minute:
+            # Requests still in flight may not be counted in remaining yet
+            self.requests.refill(now)
+            self.requests.tokens = min(self.requests.tokens, remaining - self.in_flight)
+
+        # The request bucket already waits for the next request, a used-up token budget only comes back at its reset
+        if self.header_number(headers, 'x-ratelimit-remaining-tokens') == 0:
+            reset = parse_duration(headers.get('x-ratelimit-reset-tokens'))
+            if reset:
+                self.pause(now, reset, "token budget used up")
+
+    @staticmethod
+    def header_number(headers, name):
+        try:
+            return float(headers[name])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def pause(self, now, seconds, reason):
+        if now + seconds > self.paused_until:
+            self.paused_until = now + seconds
+            self.logger.debug(f"🚦 Holding requests for {seconds:.1f}s ({reason})")
+
+    def describe(self, now=None):
+        """One-line state for the logs."""
+        now = time.monotonic() if now is None else now
+        parts = [f"{self.in_flight} in flight", f"{self.next_ticket - self.serving} queued"]
+        if self.requests.per_minute:
+            parts.append(f"requests {self.requests.tokens:.1f}/{self.requests.capacity:g}")
+        if self.audio.per_minute:
+            parts.append(f"audio {self.audio.tokens:.1f}/{self.audio.capacity:g}s")
+        if self.paused_until > now:
+            parts.append(f"held {self.paused_until - now:.1f}s")
+        return ", ".join(parts)
+
+    def summary(self):
+        stats = self.stats
+        average = stats['wait_seconds'] / stats['waited'] if stats['waited'] else 0
+        return (f"{stats['requests']} requests, {stats['waited']} queued ({average:.2f}s on average), "
+                f"{stats['rate_limited']} rate limited, peak {stats['peak_in_flight']} in flight")
@@ -0,0 +1,103 @@
+import sys
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from mock_server import MockServer
+from rate_governor import RateGovernor, parse_duration
+from transcription_backends import create_transcription_backend, TranscriptionError
+
+RATE = 16000
+
+def send_all(server, governor, count, pcm, threads=4):
+    """Transcribe pcm count times from several threads, returns the statuses and the seconds it took."""
+    backend = create_transcription_backend('openai-compatible', 'test', 'whisper-1', base_url=server.url, pool_size=threads, governor=governor)
+
+    def send(index):
+        try:
+            backend.transcribe(pcm, chunk_id=f"chunk_{index:03d}")
+            return 200
+        except TranscriptionError as e:
+            return e.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        statuses = list(pool.map(send, range(count)))
+    elapsed = time.perf_counter() - start
+    backend.close()
+    return statuses, elapsed
+
+def check_adaptive(pcm):
+    # 120 requests per minute on the server: a burst of 130 runs into 429s, the refill during the burst decides how many
+    server = MockServer(rpm=120).start()
+    try:
+        statuses, _ = send_all(server, None, 130, pcm)
+        rejected_without = statuses.count(429)
+    finally:
+        server.shutdown()
+
+    server = MockServer(rpm=120).start()
+    governor = RateGovernor()
+    try:
+        statuses, elapsed = send_all(server, governor, 130, pcm)
+        print(f"   Adaptive: {rejected_without}/130 rejected without the governor, {statuses.count(429)}/130 with "
+              f"({elapsed:.1f}s, {governor.summary()})")
+        return rejected_without > 0 and statuses.count(429) == 0 and governor.requests.per_minute == 120
+    finally:
+        server.shutdown()
+
+def check_in_flight(pcm):
+    server = MockServer(latency=0.1).start()
+    governor = RateGovernor(max_in_flight=2)
+    try:
+        statuses, _ = send_all(server, governor, 16, pcm, threads=8)
+        print(f"   In flight: 8 threads, at most {server.stats['peak_concurrent']} requests on the server, "
+              f"peak queue {governor.stats['peak_queued']}")
+        return statuses == [200] * 16 and server.stats['peak_concurrent'] == 2
+    finally:
+        server.shutdown()
+
+def check_audio_budget(pcm):
+    # 120 audio seconds per minute with a 1s burst: two 1s chunks at once, then one every 0.5s
+    server = MockServer().start()
+    governor = RateGovernor(audio_seconds=120, burst=1)
+    try:
+        statuses, elapsed = send_all(server, governor, 8, pcm)
+        print(f"   Audio budget: 8 chunks of 1s in {elapsed:.1f}s, {governor.stats['waited']} queued")
+        return statuses == [200] * 8 and 2.5 <= elapsed < 4.5
+    finally:
+        server.shutdown()
+
+def check_streaming(pcm):
+    # With the only slot taken a streamed upload is refused, once it is free the upload holds it until its answer
+    server = MockServer().start()
+    governor = RateGovernor(audio_seconds=60, max_in_flight=1)
+    backend = create_transcription_backend('openai-compatible', 'test', 'whisper-1', base_url=server.url, governor=governor)
+    try:
+        governor.acquire()
+        refused = backend.open_stream() is None
+        governor.release()
+        upload = backend.open_stream()
+        held = governor.in_flight == 1
+        upload.write(pcm)
+        upload.finish()
+        backend.finish_stream(upload)
+        audio_taken = governor.audio.capacity - governor.audio.tokens
+        print(f"   Streaming: refused with the slot taken: {refused}, held while open: {held}, "
+              f"{audio_taken:.1f}s of audio counted ({governor.summary()})")
+        return refused and held and governor.in_flight == 0 and 0.9 < audio_taken < 1.1
+    finally:
+        backend.close()
+        server.shutdown()
+
+def main():
+    print("Rate governor test")
+    durations_ok = parse_duration('6m0s') == 360 and parse_duration('20ms') == 0.02 and parse_duration('1.5s') == 1.5
+    results = [durations_ok, check_adaptive(np.zeros(RATE // 4, dtype=np.int16)),
+               check_in_flight(np.zeros(RATE // 4, dtype=np.int16)), check_audio_budget(np.zeros(RATE, dtype=np.int16)),
+               check_streaming(np.zeros(RATE, dtype=np.int16))]
+    ok = all(results)
+    print("✅ OK" if ok else "❌ FAILED")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
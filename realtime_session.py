@@ -0,0 +1,260 @@
+import json
+import time
+import binascii
+import random
+import logging
+import threading
+import websocket
+
+
+class RealtimeSession:
+    """One Realtime API WebSocket, connected and configured before anyone needs it.
+
+    The socket runs on its own thread. Until attach() hands it over, it
+    only waits for session.updated, the answer to its session.update,
+    and is ready from then on. Afterwards every event goes to the
+    handlers given to attach(), with the WebSocketApp callback signatures.
+    """
+
+    def __init__(self, url, headers, session_config, clock=time, ping_interval=20):
+        self.session_config = session_config
+        self.clock = clock
+        self.ping_interval = ping_interval
+
+        self.ready = threading.Event()
+        self.closed = threading.Event()
+        self.error = None
+        self.ready_at = None
+        self.on_message = None
+        self.on_error = None
+        self.on_close = None
+        self.on_change = None
+
+        self.app = websocket.WebSocketApp(
+            url,
+            header=headers,
+            on_open=self.handle_open,
+            on_message=self.handle_message,
+            on_error=self.handle_error,
+            on_close=self.handle_close
+        )
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        try:
+            self.app.run_forever(ping_interval=self.ping_interval, ping_timeout=self.ping_interval / 2)
+        finally:
+            # run_forever returns without on_close when the handshake itself failed
+            self.closed.set()
+            self.notify()
+
+    def notify(self):
+        if self.on_change:
+            self.on_change()
+
+    @property
+    def connected(self):
+        return self.ready.is_set() and not self.closed.is_set()
+
+    def age(self):
+        return self.clock.time() - self.ready_at if self.ready_at is not None else 0
+
+    def attach(self, on_message, on_error=None, on_close=None):
+        """Hand the session over, its events go to these handlers from now on."""
+        self.on_error = on_error
+        self.on_close = on_close
+        self.on_message = on_message
+
+    def send(self, text):
+        self.app.send(text)
+
+    def close(self):
+        self.app.close()
+
+    def handle_open(self, ws):
+        ws.send(json.dumps(self.session_config))
+
+    def handle_message(self, ws, message):
+        if self.on_message:
+            self.on_message(ws, message)
+            return
+
+        try:
+            event = json.loads(message)
+        except json.JSONDecodeError:
+            return
+        if event.get("type") == "session.updated":
+            self.ready_at = self.clock.time()
+            self.ready.set()
+            self.notify()
+        elif event.get("type") == "error":
+            self.error = event.get("error", {}).get("message", "Unknown error")
+            ws.close()
+
+    def handle_error(self, ws, error):
+        self.error = error
+        if self.on_error:
+            self.on_error(ws, error)
+
+    def handle_close(self, ws, close_status_code, close_msg):
+        self.closed.set()
+        self.notify()
+        if self.on_close:
+            self.on_close(ws, close_status_code, close_msg)
+
+
+class AppendEventEncoder:
+    """input_audio_buffer.append events as ready-to-send JSON bytes.
+
+    The JSON around the audio never changes, so it lives in a reused
+    buffer and only the base64 of each chunk is copied in: one encode and
+    one copy per chunk instead of base64, str decode, a dict, json.dumps
+    and the encode back to bytes. The returned buffer is overwritten by
+    the next encode().
+    """
+
+    PREFIX = b'{"type":"input_audio_buffer.append","audio":"'
+    SUFFIX = b'"}'
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def encode(self, pcm):
+        encoded = binascii.b2a_base64(pcm, newline=False)
+        size = len(self.PREFIX) + len(encoded) + len(self.SUFFIX)
+        if len(self.buffer) != size:
+            # Only the short last chunk of a recording or a burst changes the size
+            self.buffer = bytearray(size)
+            self.buffer[:len(self.PREFIX)] = self.PREFIX
+            self.buffer[size - len(self.SUFFIX):] = self.SUFFIX
+        self.buffer[len(self.PREFIX):size - len(self.SUFFIX)] = encoded
+        return self.buffer
+
+
+class RealtimeSessionPool:
+    """Keeps one configured Realtime API session ready for the next recording.
+
+    A background thread connects and configures the spare session, so
+    acquire() returns in microseconds instead of after a TLS handshake
+    and session.update round trip. The spare is replaced before it is
+    max_age seconds old, the new one is ready before the old one closes,
+    and dropped sessions are replaced at once. Failed connects retry with
+    exponential backoff and jitter, from backoff_min up to backoff_max.
+    """
+
+    def __init__(self, url, headers, session_config, max_age=1500, connect_timeout=10,
+                 backoff_min=0.5, backoff_max=30, clock=time):
+        self.logger = logging.getLogger(__name__)
+        self.url = url
+        self.headers = headers
+        self.session_config = session_config
+        self.max_age = max_age
+        self.connect_timeout = connect_timeout
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.clock = clock
+
+        self.spare = None
+        self.running = False
+        self.thread = None
+        self.condition = threading.Condition()
+        self.stats = {'connects': 0, 'failures': 0, 'refreshes': 0, 'acquired': 0}
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.maintain)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            spare, self.spare = self.spare, None
+            self.condition.notify_all()
+        if spare:
+            spare.close()
+
+    def wake(self):
+        with self.condition:
+            self.condition.notify_all()
+
+    def acquire(self, timeout=0):
+        """Take the ready session, waiting up to timeout seconds for one; None if there is none."""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while not (self.spare and self.spare.connected):
+                remaining = deadline - time.monotonic()
+                if not self.running or remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+            session, self.spare = self.spare, None
+            session.on_change = None
+            self.stats['acquired'] += 1
+            # The maintainer starts on the next spare right away
+            self.condition.notify_all()
+            return session
+
+    def connect(self):
+        """Open and configure a new session, None if it failed or timed out."""
+        session = RealtimeSession(self.url, self.headers, self.session_config, self.clock)
+        session.on_change = self.wake
+        session.start()
+        self.stats['connects'] += 1
+
+        deadline = time.monotonic() + self.connect_timeout
+        with self.condition:
+            while self.running and not session.ready.is_set() and not session.closed.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+        if session.connected:
+            return session
+
+        self.stats['failures'] += 1
+        if self.running:
+            self.logger.warning(f"⚠️ Realtime session failed: {session.error or 'timed out'}")
+        session.close()
+        return None
+
+    def maintain(self):
+        backoff = self.backoff_min
+        while self.running:
+            with self.condition:
+                spare = self.spare
+                if spare and spare.connected and spare.age() < self.max_age:
+                    # Sleep until the spare is due for replacement, a close or acquire() wakes us earlier
+                    self.condition.wait(self.max_age - spare.age())
+                    continue
+
+            refreshing = spare is not None and spare.connected
+            session = self.connect()
+            if session is None:
+                delay = random.uniform(backoff / 2, backoff)
+                self.logger.debug(f"🔁 Reconnecting realtime session in {delay:.1f}s")
+                with self.condition:
+                    self.condition.wait(delay)
+                backoff = min(backoff * 2, self.backoff_max)
+                continue
+
+            backoff = self.backoff_min
+            with self.condition:
+                old, self.spare = self.spare, session
+                self.condition.notify_all()
+                if not self.running:
+                    old, self.spare = session, None
+            if old:
+                old.close()
+            if refreshing:
+                self.stats['refreshes'] += 1
+                self.logger.debug("🔁 Realtime session refreshed before expiry")
+            else:
+                self.logger.debug("🔌 Realtime session ready")
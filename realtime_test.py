@@ -0,0 +1,102 @@
+import sys
+import json
+import time
+import base64
+import threading
+from mock_server import MockServer
+from realtime_session import RealtimeSessionPool
+
+SESSION_CONFIG = {"type": "session.update", "session": {"input_audio_format": "pcm16", "input_audio_transcription": {"model": "whisper-1"}}}
+
+def make_pool(server, **kwargs):
+    return RealtimeSessionPool(server.ws_url, ["Authorization: Bearer test"], SESSION_CONFIG, **kwargs).start()
+
+def transcribe(session, audio):
+    """Send audio on an acquired session and wait for its transcript."""
+    done = threading.Event()
+    transcripts = []
+
+    def on_message(ws, message):
+        event = json.loads(message)
+        if event["type"] == "conversation.item.input_audio_transcription.completed":
+            transcripts.append(event["transcript"])
+            done.set()
+
+    session.attach(on_message)
+    session.send(json.dumps({"type": "input_audio_buffer.append", "audio": base64.b64encode(audio).decode()}))
+    session.send(json.dumps({"type": "input_audio_buffer.commit"}))
+    done.wait(5)
+    session.close()
+    return transcripts[0] if transcripts else None
+
+def check_handover():
+    # A slow handshake is paid by the pool in the background, not by the recording
+    server = MockServer(realtime_delay=0.3).start()
+    pool = make_pool(server)
+    try:
+        first = pool.acquire(timeout=5)
+        # The replacement is being connected while the first session is in use
+        time.sleep(0.6)
+        start = time.perf_counter()
+        second = pool.acquire(timeout=0)
+        handover = time.perf_counter() - start
+        transcript = first and transcribe(first, b"\0" * 4800)
+        print(f"   Handover: {handover * 1000:.3f} ms, transcript: {transcript!r}")
+        return second is not None and handover < 0.005 and transcript == "transcribed 4800 bytes"
+    finally:
+        pool.stop()
+        server.shutdown()
+
+def check_refresh():
+    # Sessions are replaced before max_age and a ready one is there the whole time
+    server = MockServer(realtime_delay=0.05).start()
+    pool = make_pool(server, max_age=0.3)
+    try:
+        time.sleep(0.2)
+        gaps = 0
+        for _ in range(50):
+            with pool.condition:
+                gaps += not (pool.spare and pool.spare.connected)
+            time.sleep(0.02)
+        print(f"   Refresh: {pool.stats['refreshes']} refreshes in 1s, {gaps}/50 samples without a ready session")
+        return pool.stats['refreshes'] >= 2 and gaps == 0
+    finally:
+        pool.stop()
+        server.shutdown()
+
+def check_backoff():
+    server = MockServer(realtime_failures=3).start()
+    pool = make_pool(server, backoff_min=0.1)
+    try:
+        start = time.perf_counter()
+        session = pool.acquire(timeout=5)
+        waited = time.perf_counter() - start
+        # Jittered waits of 0.05-0.1, 0.1-0.2 and 0.2-0.4 s before the fourth attempt
+        print(f"   Backoff: ready after {pool.stats['failures']} failed connects and {waited:.2f}s")
+        return session is not None and pool.stats['failures'] == 3 and waited >= 0.35
+    finally:
+        pool.stop()
+        server.shutdown()
+
+def check_expiry():
+    # The server ends idle sessions, the pool replaces them without being asked
+    server = MockServer(realtime_lifetime=0.3).start()
+    pool = make_pool(server)
+    try:
+        pool.acquire(timeout=5) and time.sleep(1)
+        session = pool.acquire(timeout=1)
+        print(f"   Expiry: {server.stats['realtime_sessions']} sessions opened, acquired one after expiries: {session is not None}")
+        return session is not None and server.stats['realtime_sessions'] >= 3
+    finally:
+        pool.stop()
+        server.shutdown()
+
+def main():
+    print("Realtime session pool test")
+    results = [check_handover(), check_refresh(), check_backoff(), check_expiry()]
+    ok = all(results)
+    print("✅ OK" if ok else "❌ FAILED")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import sys
+import time
+import types
+import threading
+import importlib
+import importlib.util
+import numpy as np
+from audio_files import find_audio_files, open_audio_file
+
+
+class SimulatedClock:
+    """Clock that runs `speed` times faster than the wall clock.
+
+    Everything that is timed against it (stream pacing, server latency,
+    VAD timeouts) is scaled the same way, so a replay at 20x behaves like
+    the real-time pipeline, just compressed.
+    """
+
+    def __init__(self, speed=1.0, start=0.0):
+        self.speed = speed
+        self.start = start
+        self.real_start = time.perf_counter()
+
+    def time(self):
+        return self.start + (time.perf_counter() - self.real_start) * self.speed
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+
+class FakeStream:
+    """PyAudio input stream that replays samples at the pace of the clock.
+
+    With a stream_callback it behaves like a callback-mode PortAudio
+    stream: a device thread calls it once per block, flagging an input
+    overflow when the callback made it fall more than a block behind.
+    """
+
+    def __init__(self, samples, rate, clock, frames_per_buffer=1024, stream_callback=None):
+        self.samples = samples
+        self.rate = rate
+        self.clock = clock
+        self.position = 0
+        self.opened_at = clock.time()
+        self.finished = threading.Event()
+        self.active = True
+
+        if stream_callback:
+            device_thread = threading.Thread(target=self.run_callback, args=(stream_callback, frames_per_buffer))
+            device_thread.daemon = True
+            device_thread.start()
+
+    def next_block(self, num_frames):
+        block = self.samples[self.position:self.position + num_frames]
+        self.position += num_frames
+        if len(block) < num_frames:
+            self.finished.set()
+            block = np.concatenate([block, np.zeros(num_frames - len(block), dtype=np.int16)])
+        return block.tobytes()
+
+    def read(self, num_frames, exception_on_overflow=True):
+        # A real device returns a block only once it has been captured
+        self.clock.sleep(self.opened_at + (self.position + num_frames) / self.rate - self.clock.time())
+        return self.next_block(num_frames)
+
+    def run_callback(self, callback, num_frames):
+        while self.active:
+            lag = self.clock.time() - (self.opened_at + (self.position + num_frames) / self.rate)
+            self.clock.sleep(-lag)
+            status = 0x2 if lag > num_frames / self.rate else 0
+            if callback(self.next_block(num_frames), num_frames, {}, status)[1] != 0:
+                break
+
+    def is_active(self):
+        return self.active
+
+    def stop_stream(self):
+        self.active = False
+
+    def close(self):
+        self.active = False
+
+
+class FakePyAudio:
+    """Stands in for pyaudio.PyAudio and hands out FakeStreams over the fixture."""
+
+    def __init__(self, samples, rate, clock):
+        self.samples = samples
+        self.rate = rate
+        self.clock = clock
+        self.stream = None
+
+    def open(self, rate=None, frames_per_buffer=1024, stream_callback=None, **kwargs):
+        if rate != self.rate:
+            raise ValueError(f"fixture is {self.rate} Hz, stream opened at {rate} Hz")
+        self.stream = FakeStream(self.samples, self.rate, self.clock, frames_per_buffer, stream_callback)
+        return self.stream
+
+    def get_default_input_device_info(self):
+        return {'name': 'replay', 'defaultSampleRate': float(self.rate)}
+
+    def get_sample_size(self, format):
+        return 2
+
+    def terminate(self):
+        pass
+
+
+def load_fixtures(paths, rate, gap=2.0):
+    """Concatenate WAV/FLAC fixtures into one mono int16 signal, `gap` seconds of silence apart."""
+    silence = np.zeros(int(gap * rate), dtype=np.int16)
+    parts = []
+    for path in find_audio_files(paths):
+        file_rate, blocks = open_audio_file(path, 65536)
+        if file_rate != rate:
+            raise ValueError(f"{path}: fixture is {file_rate} Hz, expected {rate} Hz")
+        parts.extend(blocks)
+        parts.append(silence)
+
+    if not parts:
+        raise ValueError("no WAV/FLAC fixtures found")
+    return np.concatenate(parts)
+
+
+def placeholder_module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def install_platform_placeholders():
+    """Make the macOS transcriber importable on machines without its platform modules.
+
+    Replays never touch the keyboard, clipboard or a real device, so Quartz,
+    pynput and PyAudio only need to exist when they are not installed (or,
+    like pynput on a headless box, fail to import).
+    """
+    try:
+        importlib.import_module('Quartz.CoreGraphics')
+    except Exception:
+        names = ['CGEventCreateKeyboardEvent', 'CGEventPost', 'CGEventSetFlags', 'kCGHIDEventTap', 'kCGEventFlagMaskCommand']
+        core_graphics = placeholder_module('Quartz.CoreGraphics', **{name: None for name in names})
+        sys.modules['Quartz'] = placeholder_module('Quartz', CoreGraphics=core_graphics)
+        sys.modules['Quartz.CoreGraphics'] = core_graphics
+
+    try:
+        importlib.import_module('pynput.keyboard')
+    except Exception:
+        key = types.SimpleNamespace(cmd='cmd', alt='alt', ctrl='ctrl', space='space')
+        keyboard = placeholder_module('pynput.keyboard', Key=key, Listener=None)
+        sys.modules['pynput'] = placeholder_module('pynput', keyboard=keyboard)
+        sys.modules['pynput.keyboard'] = keyboard
+
+    try:
+        importlib.import_module('pyaudio')
+    except Exception:
+        sys.modules['pyaudio'] = placeholder_module('pyaudio', paInt16=8, paContinue=0, PyAudio=None)
+
+
+def load_transcriber(path="transcriber-req.py"):
+    """Import a transcriber script, whose file name is not a valid module name."""
+    install_platform_placeholders()
+    spec = importlib.util.spec_from_file_location("transcriber_req", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,138 @@
+import time
+import logging
+import argparse
+import numpy as np
+from mock_server import MockServer
+from replay import SimulatedClock, FakePyAudio, load_fixtures, load_transcriber
+from resampler import Resampler
+from sound_player import FeedbackPlayer, NullBackend
+from transcription_backends import create_transcription_backend
+
+def make_replay_transcriber(module):
+    class ReplayTranscriber(module.WhisperTranscriber):
+        """WhisperTranscriber fed by a FakePyAudio, recording paste latency instead of pasting."""
+
+        def __init__(self, audio, clock, **kwargs):
+            self.replay_audio = audio
+            self.paste_latencies = []
+            self.silence_removed = 0
+            super().__init__(clock=clock, **kwargs)
+            self.feedback = FeedbackPlayer(NullBackend(), 'none')
+            self.AUTO_STOP_TIMEOUT = 0
+
+        def init_audio(self):
+            self.audio = self.replay_audio
+
+        def output_transcription(self, chunk_data, text):
+            self.paste_latencies.append(self.clock.time() - chunk_data["trace"].get('speech_end'))
+            self.silence_removed += chunk_data["trace"].get('silence_removed') or 0
+
+    return ReplayTranscriber
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay WAV/FLAC fixtures through the transcriber pipeline faster than real time")
+    parser.add_argument("fixtures", nargs="+", help="16 kHz WAV/FLAC files or directories")
+    parser.add_argument("--speed", type=float, default=10, help="simulation speed-up over real time")
+    parser.add_argument("--latency", type=float, default=0.5, help="mock API latency per request, in simulated seconds")
+    parser.add_argument("--bandwidth", type=float, default=0, help="mock upload bandwidth in KiB/s of simulated time, 0 = unlimited")
+    parser.add_argument("--workers", type=int, default=2, help="transcription workers")
+    parser.add_argument("--codec", default="wav", help="upload codec")
+    parser.add_argument("--capture", default="callback", help="capture engine: callback or blocking")
+    parser.add_argument("--device-rate", type=int, help="simulate a microphone at this rate (fixtures are resampled to it), captured with CAPTURE_NATIVE_RATE")
+    parser.add_argument("--warm-idle", type=float, default=0, help="keep the stream warm for this many simulated seconds before recording starts")
+    parser.add_argument("--streaming", action="store_true", help="upload chunks while they are being spoken")
+    parser.add_argument("--vad-threshold", type=float, help="override VAD_THRESHOLD")
+    parser.add_argument("--vad-adaptive", action="store_true", help="track the noise floor instead of a fixed threshold")
+    parser.add_argument("--silence", type=float, help="override SILENCE_DURATION")
+    parser.add_argument("--speculative-delay", type=float, help="override SPECULATIVE_DELAY")
+    parser.add_argument("--compact", type=float, help="override COMPACT_SILENCE_MAX")
+    parser.add_argument("--max-length", type=float, help="override AUDIO_LENGTH_MAX")
+    parser.add_argument("--debug", action="store_true", help="show transcriber debug logs")
+    args = parser.parse_args()
+
+    module = load_transcriber()
+    ReplayTranscriber = make_replay_transcriber(module)
+
+    samples = load_fixtures(args.fixtures, 16000)
+    audio_seconds = len(samples) / 16000
+    device_rate = args.device_rate or 16000
+    if device_rate != 16000:
+        samples = Resampler(16000, device_rate).process(samples)
+    clock = SimulatedClock(args.speed)
+    audio = FakePyAudio(samples, device_rate, clock)
+
+    server = MockServer(latency=args.latency / args.speed, bandwidth=args.bandwidth * 1024 * args.speed).start()
+    backend = create_transcription_backend(
+        'openai-compatible', 'replay', 'replay',
+        codec=args.codec, base_url=server.url, pool_size=args.workers + 1
+    )
+
+    transcriber = ReplayTranscriber(audio, clock, transcription_workers=args.workers, backend=backend)
+    transcriber.STREAMING_UPLOAD = args.streaming
+    transcriber.CAPTURE_MODE = args.capture
+    transcriber.CAPTURE_NATIVE_RATE = args.device_rate is not None
+    logging.getLogger().setLevel(logging.DEBUG if args.debug else logging.WARNING)
+
+    if args.vad_threshold is not None:
+        transcriber.VAD_THRESHOLD = args.vad_threshold
+    if args.vad_adaptive:
+        transcriber.noise_floor = module.NoiseFloorTracker(
+            module.VAD_NOISE_WINDOW * transcriber.RATE / transcriber.VAD_FRAME,
+            module.VAD_ONSET_RATIO,
+            module.VAD_OFFSET_RATIO,
+            module.VAD_MIN_THRESHOLD
+        )
+    if args.silence is not None:
+        transcriber.SILENCE_DURATION = args.silence
+    if args.speculative_delay is not None:
+        transcriber.SPECULATIVE_DELAY = args.speculative_delay
+    if args.compact is not None:
+        transcriber.COMPACT_SILENCE_MAX = args.compact
+    if args.max_length is not None:
+        transcriber.AUDIO_LENGTH_MAX = args.max_length
+        transcriber.max_chunk_samples = int(args.max_length * transcriber.RATE) + transcriber.pre_record_samples + transcriber.CHUNK
+        transcriber.audio_buffer = module.ChunkBuffer(transcriber.max_chunk_samples)
+
+    wall_start = time.perf_counter()
+    idle_cpu = 0
+    try:
+        if args.warm_idle:
+            transcriber.WARM_STREAM = True
+            transcriber.open_warm_stream()
+            cpu_start = time.process_time()
+            clock.sleep(args.warm_idle)
+            idle_cpu = time.process_time() - cpu_start
+
+        transcriber.start_recording()
+        capture = transcriber.capture
+
+        audio.stream.finished.wait()
+        transcriber.stop_recording()
+        transcriber.chunk_queue.join()
+    finally:
+        wall = time.perf_counter() - wall_start
+        transcriber.cleanup()
+        server.shutdown()
+
+    latencies = np.array(transcriber.paste_latencies) * 1000
+
+    print(f"Replayed {audio_seconds:.1f}s of audio in {wall:.1f}s ({audio_seconds / wall:.1f}x real time)")
+    print(f"   VAD threshold: {transcriber.vad_threshold_description()} | Silence: {transcriber.SILENCE_DURATION}s | Max: {transcriber.AUDIO_LENGTH_MAX}s")
+    print(f"   API latency: {args.latency * 1000:.0f} ms | Bandwidth: {args.bandwidth or '∞'} KiB/s | Workers: {args.workers} | Codec: {args.codec} | Streaming: {args.streaming}")
+    print(f"   Chunks: {transcriber.chunk_counter} | Pasted: {len(latencies)} | Uploaded: {server.stats['bytes'] / 1024:.0f} KiB")
+    capture = capture.stats()
+    print(f"   Capture-thread CPU: {capture['consumer_cpu'] * 1000:.0f} ms ({capture['consumer_cpu'] / audio_seconds * 100:.2f}% of audio time) | "
+          f"Engine: {args.capture} | Overflows: {'unknown' if capture['overflows'] is None else capture['overflows']} | Dropped: {capture['dropped']} | Device: {device_rate} Hz")
+    if args.warm_idle:
+        # CPU per simulated second is what the idle stream costs in real time
+        print(f"   Warm stream while idle: {idle_cpu / args.warm_idle * 100:.2f}% of one core (device and consumer threads)")
+    if transcriber.silence_removed:
+        print(f"   Silence removed before upload: {transcriber.silence_removed:.1f}s ({transcriber.silence_removed / audio_seconds * 100:.0f}% of audio time)")
+    if transcriber.speculation_stats.sent:
+        print(f"   Speculative requests: {transcriber.speculation_stats.summary()}")
+    if len(latencies):
+        p50, p90, p95, p99 = np.percentile(latencies, [50, 90, 95, 99])
+        print(f"   End of speech → paste: p50 {p50:.0f} ms | p90 {p90:.0f} ms | p95 {p95:.0f} ms | p99 {p99:.0f} ms | max {latencies.max():.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import time
+import random
+import logging
+import threading
+from collections import deque
+import numpy as np
+import requests
+from transcription_backends import TranscriptionBackend, TranscriptionError
+
+# Answers worth another attempt besides 5xx: request timeout, conflict and rate limit
+RETRY_STATUSES = {408, 409, 429}
+
+
+def is_retryable(error):
+    """Whether the failed request may succeed when sent again."""
+    if isinstance(error, TranscriptionError):
+        return error.status_code in RETRY_STATUSES or error.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class RequestPolicy:
+    """How the requests of one backend are timed out, retried and hedged.
+
+    A retryable failure (see is_retryable) is sent again up to `retries`
+    times. 429 answers wait as long as their Retry-After asks, giving up
+    when that is more than retry_after_max seconds; everything else waits
+    a jittered exponential backoff from backoff_min up to backoff_max.
+
+    With hedge, a request that is still open after the hedge_quantile of
+    the last `window` latencies (at least hedge_min_delay seconds) gets a
+    duplicate, and the first good answer wins.
+    """
+
+    def __init__(self, retries=3, backoff_min=0.5, backoff_max=8, retry_after_max=30, timeout=30,
+                 hedge=False, hedge_quantile=95, hedge_min_delay=0.5, window=50):
+        self.retries = retries
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.window = window
+
+
+class RequestStats:
+    """Counts of requests, retries and hedges."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failed = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def count(self, name, amount=1):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def summary(self):
+        return (f"{self.requests} requests, {self.retries} retries, {self.failed} failed, "
+                f"{self.hedged} hedged ({self.hedge_wins} won by the hedge)")
+
+
+class PolicyBackend(TranscriptionBackend):
+    """Applies a RequestPolicy to the transcribe() calls of another backend.
+
+    Streamed uploads pass straight through, a failed one is sent again
+    whole through transcribe(). `clock` times the backoff and the hedge
+    delay, so simulated clocks scale them like everything else.
+    """
+
+    def __init__(self, backend, policy, clock=time):
+        self.logger = logging.getLogger(__name__)
+        self.backend = backend
+        self.policy = policy
+        self.clock = clock
+        self.name = backend.name
+        self.governor = backend.governor
+        self.stats = RequestStats()
+        self.latencies = deque(maxlen=policy.window)
+        self.latency_lock = threading.Lock()
+
+    def transcribe(self, pcm, prompt="", chunk_id="chunk", trace=None):
+        self.stats.count('requests')
+        attempt = 0
+        while True:
+            try:
+                return self.attempt(pcm, prompt, chunk_id, trace)
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    self.stats.count('failed')
+                    raise
+                attempt += 1
+                self.stats.count('retries')
+                reason = e.status_code if isinstance(e, TranscriptionError) else type(e).__name__
+                self.logger.warning(f"⚠️ {chunk_id} failed ({reason}), retry {attempt}/{self.policy.retries} in {delay:.1f}s")
+                self.clock.sleep(delay)
+
+    def retry_delay(self, error, attempt):
+        """Seconds to wait before sending again, None to give up."""
+        if attempt >= self.policy.retries or not is_retryable(error):
+            return None
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.policy.retry_after_max else None
+        backoff = min(self.policy.backoff_max, self.policy.backoff_min * 2 ** attempt)
+        return random.uniform(backoff / 2, backoff)
+
+    def hedge_delay(self):
+        """Seconds after which a request gets a duplicate, None until enough latencies were seen."""
+        if not self.policy.hedge:
+            return None
+        with self.latency_lock:
+            if len(self.latencies) < min(10, self.policy.window):
+                return None
+            quantile = np.percentile(self.latencies, self.policy.hedge_quantile)
+        return max(self.policy.hedge_min_delay, quantile)
+
+    def attempt(self, pcm, prompt, chunk_id, trace):
+        delay = self.hedge_delay()
+        start = self.clock.time()
+        if delay is None:
+            text = self.backend.transcribe(pcm, prompt, chunk_id, trace)
+        else:
+            text = self.race(pcm, prompt, chunk_id, trace, delay)
+        with self.latency_lock:
+            self.latencies.append(self.clock.time() - start)
+        return text
+
+    def race(self, pcm, prompt, chunk_id, trace, delay):
+        """Send the request, and a duplicate if it is still open after delay; first good answer wins."""
+        condition = threading.Condition()
+        results = []
+        launched = [1]
+
+        def run(request_trace, hedge):
+            try:
+                outcome = (self.backend.transcribe(pcm, prompt, chunk_id, request_trace), None, hedge)
+            except Exception as e:
+                outcome = (None, e, hedge)
+            with condition:
+                results.append(outcome)
+                condition.notify_all()
+
+        def hedge():
+            self.clock.sleep(delay)
+            with condition:
+                if results:
+                    return
+                launched[0] += 1
+            self.stats.count('hedged')
+            self.logger.debug(f"⏱️ {chunk_id} open for {delay:.1f}s (p{self.policy.hedge_quantile}), sending a hedged request")
+            run(None, True)
+
+        for target, args in ((run, (trace, False)), (hedge, ())):
+            thread = threading.Thread(target=target, args=args)
+            thread.daemon = True
+            thread.start()
+
+        with condition:
+            while True:
+                for text, error, hedged in results:
+                    if error is None:
+                        if hedged:
+                            self.stats.count('hedge_wins')
+                            if trace:
+                                trace.mark('response_received')
+                        return text
+                if len(results) == launched[0]:
+                    raise results[0][1]
+                condition.wait()
+
+    def open_stream(self, prompt=""):
+        return self.backend.open_stream(prompt)
+
+    def finish_stream(self, upload, trace=None):
+        return self.backend.finish_stream(upload, trace)
+
+    def warm(self):
+        self.backend.warm()
+
+    def close(self):
+        self.backend.close()
+
+
+def create_request_policy(backend_name, retries=3, timeout=30, hedge=False, overrides=None):
+    """Policy for a backend: the global settings, then its entry in overrides (REQUEST_POLICY)."""
+    settings = {'retries': retries, 'timeout': timeout, 'hedge': hedge}
+    settings.update((overrides or {}).get(backend_name, {}))
+    return RequestPolicy(**settings)
@@ -0,0 +1,74 @@
+import sys
+import time
+import numpy as np
+from mock_server import MockServer
+from request_policy import PolicyBackend, RequestPolicy
+from transcription_backends import create_transcription_backend, TranscriptionError
+
+RATE = 16000
+
+def make_backend(server, policy):
+    backend = create_transcription_backend('openai-compatible', 'test', 'whisper-1', base_url=server.url, pool_size=4, timeout=policy.timeout)
+    return PolicyBackend(backend, policy)
+
+def transcribe_all(backend, count, pcm):
+    """Transcribe pcm count times, returns the number of lost chunks and the latencies."""
+    lost = 0
+    latencies = []
+    for index in range(count):
+        start = time.perf_counter()
+        try:
+            backend.transcribe(pcm, chunk_id=f"chunk_{index:03d}")
+        except TranscriptionError:
+            lost += 1
+        latencies.append(time.perf_counter() - start)
+    return lost, latencies
+
+def check_retries(pcm):
+    # A third of the answers are 500s, without retries that many chunks are lost
+    server = MockServer(error_rate=0.3, seed=3).start()
+    try:
+        lost_without, _ = transcribe_all(make_backend(server, RequestPolicy(retries=0)), 30, pcm)
+        backend = make_backend(server, RequestPolicy(retries=3, backoff_min=0.01, backoff_max=0.1))
+        lost, _ = transcribe_all(backend, 30, pcm)
+        print(f"   Retries: {lost_without}/30 chunks lost without, {lost}/30 with ({backend.stats.summary()})")
+        return lost_without > 0 and lost == 0 and backend.stats.retries > 0
+    finally:
+        server.shutdown()
+
+def check_retry_after(pcm):
+    # Once the bucket of 60 requests is used up the next one waits for Retry-After instead of backing off
+    server = MockServer(rpm=60).start()
+    try:
+        backend = make_backend(server, RequestPolicy(retries=2, backoff_min=0.01, backoff_max=0.01))
+        transcribe_all(backend, 60, pcm)
+        lost, latencies = transcribe_all(backend, 1, pcm)
+        print(f"   Retry-After: {server.stats['rate_limited']} rate limited, the next chunk took {latencies[0]:.2f}s, lost: {lost}")
+        return lost == 0 and server.stats['rate_limited'] == 1 and latencies[0] >= 0.5
+    finally:
+        server.shutdown()
+
+def check_hedging(pcm):
+    # Every fifth answer stalls for 2s, a hedge after the p75 (still a fast one) gets the text much sooner
+    server = MockServer(latency=0.05, stall_rate=0.2, stall=2, seed=5).start()
+    try:
+        _, plain = transcribe_all(make_backend(server, RequestPolicy(retries=0)), 30, pcm)
+        backend = make_backend(server, RequestPolicy(retries=0, hedge=True, hedge_quantile=75, hedge_min_delay=0.1))
+        # The first latencies only fill the window, hedging starts after 10 of them
+        _, hedged = transcribe_all(backend, 40, pcm)
+        hedged = hedged[10:]
+        print(f"   Hedging: max {max(plain):.2f}s without, {max(hedged):.2f}s with ({backend.stats.hedged} hedged, {backend.stats.hedge_wins} won)")
+        return max(plain) > 2 and np.percentile(hedged, 90) < 1 and backend.stats.hedge_wins > 0
+    finally:
+        server.shutdown()
+
+def main():
+    pcm = np.zeros(RATE // 2, dtype=np.int16)
+    print("Request policy test")
+    results = [check_retries(pcm), check_retry_after(pcm), check_hedging(pcm)]
+    ok = all(results)
+    print("✅ OK" if ok else "❌ FAILED")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
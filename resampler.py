@@ -0,0 +1,98 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class Resampler:
+    """Streaming polyphase resampler for 16-bit mono PCM.
+
+    The rate change is reduced to up / down (48000 -> 16000 is 1 / 3,
+    44100 -> 16000 is 160 / 441) and one Kaiser-windowed sinc low-pass is
+    split into `up` phases of `taps` coefficients each. Every output
+    sample is one dot product of its phase with the last `taps` input
+    samples. With few phases (48 kHz to 16 or 24 kHz) each phase is one
+    matrix product over a strided view of the block, otherwise the windows
+    of the whole block are gathered and multiplied in one einsum.
+
+    process() takes blocks of any size. The last taps - 1 input samples and
+    the position of the next output carry over to the next block, so the
+    output of a stream is the same as resampling it in one piece.
+
+    transition is the width of the filter's transition band as a fraction
+    of the lower Nyquist frequency, attenuation its stop-band rejection
+    in dB. delay is the filter's latency in seconds.
+    """
+
+    # Up to this many phases a strided matrix product per phase beats one gather
+    STRIDED_PHASES = 4
+
+    def __init__(self, input_rate, output_rate, transition=0.15, attenuation=60):
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        divisor = math.gcd(self.input_rate, self.output_rate)
+        self.up = self.output_rate // divisor
+        self.down = self.input_rate // divisor
+
+        # Kaiser's estimate of the length for this transition band and rejection, at the input rate
+        nyquist = min(self.input_rate, self.output_rate) / 2
+        width = 2 * math.pi * transition * nyquist / self.input_rate
+        self.taps = max(2, math.ceil((attenuation - 7.95) / (2.285 * width)))
+        beta = 0.1102 * (attenuation - 8.7) if attenuation > 50 else 0.5842 * (attenuation - 21) ** 0.4 + 0.07886 * (attenuation - 21)
+
+        # Prototype at up × the input rate, cut off in the middle of the transition band
+        length = self.taps * self.up
+        cutoff = (1 - transition / 2) * nyquist / (self.input_rate * self.up)
+        n = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta) * self.up
+
+        # phases[p, i] weighs the input sample i steps back from the output's position
+        self.phases = prototype.reshape(self.taps, self.up).T.astype(np.float32)
+        # Oldest sample first, the order of sliding_window_view windows
+        self.reversed_phases = np.ascontiguousarray(self.phases[:, ::-1])
+        self.delay = (length - 1) / 2 / (self.input_rate * self.up)
+        self.offsets = np.arange(self.taps)
+
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        # Position of the next output in the upsampled signal, relative to the current block
+        self.position = 0
+
+    @property
+    def passthrough(self):
+        return self.up == self.down
+
+    def reset(self):
+        self.history[:] = 0
+        self.position = 0
+
+    def output_length(self, input_length):
+        """Samples the next process() call returns for a block of input_length samples."""
+        end = input_length * self.up
+        return max(0, -(-(end - self.position) // self.down))
+
+    def process(self, samples):
+        if self.passthrough:
+            return samples
+
+        samples = np.asarray(samples, dtype=np.int16)
+        buffer = np.concatenate([self.history, samples.astype(np.float32)])
+        count = self.output_length(len(samples))
+
+        upsampled = self.position + np.arange(count) * self.down
+        phase = upsampled % self.up
+        # Index of the first input sample each output uses, in buffer coordinates
+        oldest = upsampled // self.up
+
+        if self.up <= self.STRIDED_PHASES:
+            # Every up-th output has the same phase and starts down samples later
+            windows = sliding_window_view(buffer, self.taps)
+            output = np.empty(count, dtype=np.float32)
+            for first in range(min(self.up, count)):
+                rows = windows[oldest[first]::self.down][:len(range(first, count, self.up))]
+                output[first::self.up] = rows @ self.reversed_phases[phase[first]]
+        else:
+            window = buffer[(oldest + self.taps - 1)[:, None] - self.offsets]
+            output = np.einsum('ij,ij->i', self.phases[phase], window)
+
+        self.position += count * self.down - len(samples) * self.up
+        self.history = buffer[len(buffer) - (self.taps - 1):]
+        return np.clip(np.rint(output), -32768, 32767).astype(np.int16)
@@ -0,0 +1,39 @@
+import sys
+import time
+import numpy as np
+from resampler import Resampler
+
+PAIRS = [(48000, 16000), (44100, 16000), (48000, 24000), (44100, 24000)]
+BLOCK_MS = 64
+
+def measure(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"Streaming resampler on {seconds:.0f}s of audio in {BLOCK_MS} ms device blocks")
+    print(f"   {'rates':<16} {'taps':>5} {'ms CPU per audio second':>24} {'% of one core':>14} {'µs per block':>13}")
+    rng = np.random.default_rng(0)
+    for input_rate, output_rate in PAIRS:
+        block_size = input_rate * BLOCK_MS // 1000
+        samples = rng.integers(-3000, 3000, int(seconds * input_rate) // block_size * block_size, dtype=np.int16)
+        blocks = samples.reshape(-1, block_size)
+
+        def run():
+            resampler = Resampler(input_rate, output_rate)
+            for block in blocks:
+                resampler.process(block)
+
+        best = measure(run, repeats)
+        taps = Resampler(input_rate, output_rate).taps
+        print(f"   {input_rate:>5} → {output_rate:<6} {taps:>5} {best / seconds * 1000:>24.2f} {best / seconds * 100:>14.3f} {best / len(blocks) * 1e6:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import numpy as np
+from resampler import Resampler
+
+PAIRS = [(48000, 16000), (44100, 16000), (48000, 24000), (44100, 24000), (16000, 24000)]
+
+def tones(frequencies, rate, seconds, delay=0):
+    t = np.arange(int(seconds * rate)) / rate - delay
+    return sum(4000 * np.sin(2 * np.pi * f * t) for f in frequencies)
+
+def stream(resampler, samples, rng):
+    """Resample in blocks of random size, like a device delivering uneven buffers."""
+    parts = []
+    position = 0
+    while position < len(samples):
+        size = int(rng.integers(1, 4096))
+        parts.append(resampler.process(samples[position:position + size]))
+        position += size
+    return np.concatenate(parts)
+
+def check(input_rate, output_rate, rng):
+    seconds = 2
+    speech = [200, 1000, 3000]
+    # Well above the output's Nyquist frequency, must not fold back into the speech band
+    alias = 1.25 * output_rate / 2 if input_rate > output_rate else None
+
+    resampler = Resampler(input_rate, output_rate)
+    signal = tones(speech, input_rate, seconds).astype(np.int16)
+    output = stream(resampler, signal, rng)
+    one_shot = Resampler(input_rate, output_rate).process(signal)
+
+    reference = tones(speech, output_rate, seconds, resampler.delay)
+    edge = int(0.1 * output_rate)
+    error = output[edge:-edge] - reference[edge:-edge]
+    snr = 10 * np.log10(np.mean(reference[edge:-edge] ** 2) / np.mean(error ** 2))
+
+    rejection = np.inf
+    if alias:
+        leaked = Resampler(input_rate, output_rate).process(tones([alias], input_rate, seconds).astype(np.int16))
+        rejection = 10 * np.log10(np.mean(tones([alias], input_rate, seconds) ** 2) / max(np.mean(leaked[edge:-edge].astype(np.float64) ** 2), 1e-12))
+
+    seamless = np.array_equal(output, one_shot)
+    length_ok = len(output) == len(signal) * output_rate // input_rate
+    ok = seamless and length_ok and snr > 60 and rejection > 55
+    print(f"   {input_rate:>5} → {output_rate:>5} Hz: {resampler.up}/{resampler.down}, {resampler.taps} taps, "
+          f"SNR {snr:.1f} dB, alias rejection {rejection:.1f} dB, seamless: {seamless}, length: {length_ok} {'✓' if ok else '✗'}")
+    return ok
+
+def main():
+    rng = np.random.default_rng(0)
+    print("Resampler quality test (tones at 200, 1000 and 3000 Hz against the exact signal at the output rate)")
+    ok = all([check(input_rate, output_rate, rng) for input_rate, output_rate in PAIRS])
+    print("✅ OK" if ok else "❌ FAILED")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def compact_silence(samples, detector, threshold, frame_length, max_gap, keep_gap, tail_margin):
+    """Shorten the pauses of an utterance before it is uploaded.
+
+    Silent runs inside the speech longer than max_gap samples shrink to
+    keep_gap (half after the speech, half before the next), trailing
+    silence shrinks to tail_margin. The pre-roll before the first voiced
+    frame is left alone.
+
+    Returns the compacted samples and a segment map, an (n, 3) array of
+    [compacted start, original start, length] rows in samples, see
+    to_original(). Without anything to cut the input comes back as is.
+    """
+    total = len(samples)
+    identity = np.array([[0, 0, total]])
+
+    voiced = detector.score_samples(samples, frame_length) > threshold
+    if not voiced.any():
+        return samples, identity
+
+    # Silent runs as [start, end) frames, found from the edges of the voiced mask
+    padded = np.concatenate([[True], voiced, [True]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    run_start = edges[0::2] * frame_length
+    run_end = np.minimum(edges[1::2] * frame_length, total)
+    run_length = run_end - run_start
+
+    trailing = run_end == total
+    cut = (run_start > 0) & np.where(trailing, run_length > tail_margin, run_length > max_gap)
+    cut_start = np.where(trailing, run_start + tail_margin, run_start + keep_gap // 2)[cut]
+    cut_end = np.where(trailing, run_end, run_end - (keep_gap - keep_gap // 2))[cut]
+    if not len(cut_start):
+        return samples, identity
+
+    keep_start = np.concatenate([[0], cut_end])
+    keep_end = np.concatenate([cut_start, [total]])
+    kept = keep_end > keep_start
+    keep_start, keep_end = keep_start[kept], keep_end[kept]
+
+    lengths = keep_end - keep_start
+    compacted_start = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    compacted = np.concatenate([samples[start:end] for start, end in zip(keep_start, keep_end)])
+    return compacted, np.column_stack([compacted_start, keep_start, lengths])
+
+
+def to_original(segments, position):
+    """Map a sample position in compacted audio back to the original audio."""
+    row = max(0, np.searchsorted(segments[:, 0], position, side='right') - 1)
+    return segments[row, 1] + position - segments[row, 0]
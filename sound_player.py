@@ -0,0 +1,179 @@
+import os
+import queue
+import threading
+import time
+import subprocess
+import logging
+
+CUES = ['start', 'stop', 'transcribe']
+
+SOUND_MODE_CUES = {
+    'none': [],
+    'start-stop': ['start', 'stop'],
+    'all': ['start', 'stop', 'transcribe'],
+}
+
+
+MACOS_SOUNDS = {
+    'start': "/System/Library/Sounds/Glass.aiff",
+    'stop': "/System/Library/Sounds/Submarine.aiff",
+    'transcribe': "/System/Library/Sounds/Ping.aiff",
+}
+MACOS_VOICE = {
+    'start': "Recording",
+    'stop': "Stopped",
+}
+
+
+class PreloadedBackend:
+    """Cues decoded to 16-bit PCM once and played from memory through PyAudio.
+
+    Playing a cue opens an output stream and writes its samples, so no
+    process is spawned and no file is read per cue. `audio` is a
+    pyaudio.PyAudio or anything with the same open() and
+    get_format_from_width(); cues whose file cannot be read stay silent.
+    """
+
+    def __init__(self, sounds, audio=None):
+        import soundfile
+        if audio is None:
+            import pyaudio
+            audio = pyaudio.PyAudio()
+        self.audio = audio
+        self.sample_format = audio.get_format_from_width(2)
+        self.cues = {}
+        for cue, path in sounds.items():
+            try:
+                samples, rate = soundfile.read(path, dtype='int16', always_2d=True)
+            except Exception as e:
+                logging.getLogger(__name__).debug(f"⚠️ Sound for '{cue}' not loaded: {e}")
+                continue
+            self.cues[cue] = (samples.tobytes(), rate, samples.shape[1])
+
+    def play(self, cue):
+        if cue not in self.cues:
+            return
+        data, rate, channels = self.cues[cue]
+        stream = self.audio.open(format=self.sample_format, channels=channels, rate=rate, output=True)
+        try:
+            stream.write(data)
+        finally:
+            stream.stop_stream()
+            stream.close()
+
+
+class MacSoundBackend(PreloadedBackend):
+    """macOS system sounds, preloaded; a cue whose sound is missing is spoken with `say`."""
+
+    def __init__(self, audio=None):
+        super().__init__(MACOS_SOUNDS, audio)
+
+    def play(self, cue):
+        if cue in self.cues:
+            super().play(cue)
+        elif cue in MACOS_VOICE:
+            subprocess.Popen(["say", "-v", "Alex", MACOS_VOICE[cue]], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class AfplayBackend:
+    """macOS system sounds through one afplay process per cue, for when they cannot be preloaded."""
+
+    def __init__(self):
+        # Resolve every cue once so playing it is a single process spawn
+        self.commands = {}
+        for cue in CUES:
+            path = MACOS_SOUNDS.get(cue)
+            if path and os.path.exists(path):
+                self.commands[cue] = ["afplay", path]
+            elif cue in MACOS_VOICE:
+                self.commands[cue] = ["say", "-v", "Alex", MACOS_VOICE[cue]]
+
+    def play(self, cue):
+        command = self.commands.get(cue)
+        if command:
+            subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class WinsoundBackend:
+    """Windows system sounds through winsound, with beeps as a fallback."""
+
+    aliases = {
+        'start': "SystemStart",
+        'stop': "SystemExit",
+        'transcribe': "SystemNotification",
+    }
+    beeps = {
+        'start': (800, 200),
+        'stop': (400, 300),
+        'transcribe': (1000, 100),
+    }
+
+    def __init__(self):
+        import winsound
+        self.winsound = winsound
+        self.flags = winsound.SND_ALIAS | winsound.SND_ASYNC
+
+    def play(self, cue):
+        try:
+            self.winsound.PlaySound(self.aliases[cue], self.flags)
+        except Exception:
+            self.winsound.Beep(*self.beeps[cue])
+
+
+class NullBackend:
+    """Silent backend for tests, optionally pretending each cue takes `duration` seconds."""
+
+    def __init__(self, duration=0):
+        self.duration = duration
+        self.played = []
+
+    def play(self, cue):
+        time.sleep(self.duration)
+        self.played.append(cue)
+
+
+def create_backend(*names):
+    """The first of the named backends that can be created, NullBackend (no sounds) when none can."""
+    backends = {
+        'macos': MacSoundBackend,
+        'afplay': AfplayBackend,
+        'winsound': WinsoundBackend,
+        'null': NullBackend,
+    }
+    for name in names:
+        try:
+            return backends[name]()
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"⚠️ Sound backend '{name}' unavailable ({e})")
+    logging.getLogger(__name__).warning("⚠️ Sounds disabled")
+    return NullBackend()
+
+
+class FeedbackPlayer:
+    """Fire-and-forget audio cues played from a dedicated thread.
+
+    play() only puts the cue on a queue, so the hotkey listener, capture and
+    upload threads never wait for a sound to finish.
+    """
+
+    def __init__(self, backend, mode='all'):
+        self.logger = logging.getLogger(__name__)
+        self.backend = backend
+        self.enabled_cues = set(SOUND_MODE_CUES.get(mode, SOUND_MODE_CUES['all']))
+        self.cue_queue = queue.Queue()
+
+        player_thread = threading.Thread(target=self.player_loop)
+        player_thread.daemon = True
+        player_thread.start()
+
+    def play(self, cue):
+        if cue in self.enabled_cues:
+            self.cue_queue.put(cue)
+
+    def player_loop(self):
+        while True:
+            cue = self.cue_queue.get()
+            try:
+                self.backend.play(cue)
+            except Exception as e:
+                self.logger.debug(f"⚠️ Sound error ({cue}): {e}")
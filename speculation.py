@@ -0,0 +1,81 @@
+import time
+import threading
+
+
+class SpeculativeRequest:
+    """Transcription of an utterance sent before its pause is confirmed.
+
+    The request runs on its own thread, prepare(samples) turns the samples
+    into (upload, segments) there first, the same way the chunk itself
+    would be uploaded. If speech resumes the caller cancel()s it: a request
+    not sent yet is skipped, otherwise the text is thrown away when it
+    arrives. If not, result() waits for it and the chunk skips its own
+    request.
+    """
+
+    def __init__(self, backend, samples, prompt="", chunk_id="chunk", clock=time, prepare=None):
+        self.backend = backend
+        self.samples = samples
+        self.prepare = prepare
+        self.upload = samples
+        self.segments = None
+        self.prompt = prompt
+        self.chunk_id = chunk_id
+        self.clock = clock
+        self.sent_at = clock.time()
+        self.done_at = None
+        self.text = None
+        self.error = None
+        self.cancelled = False
+        self.done = threading.Event()
+
+        request_thread = threading.Thread(target=self.run)
+        request_thread.daemon = True
+        request_thread.start()
+
+    def run(self):
+        try:
+            if self.prepare:
+                self.upload, self.segments = self.prepare(self.samples)
+            if self.cancelled:
+                return
+            self.text = self.backend.transcribe(self.upload, self.prompt, self.chunk_id)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done_at = self.clock.time()
+            self.done.set()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def result(self):
+        self.done.wait()
+        if self.error:
+            raise self.error
+        return self.text
+
+    def saved(self, confirmed_at):
+        """Seconds gained over sending the chunk when the pause was confirmed."""
+        without = confirmed_at + (self.done_at - self.sent_at)
+        return without - max(self.done_at, confirmed_at)
+
+
+class SpeculationStats:
+    """Counts of speculative requests and the latency they saved."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.used = 0
+        self.wasted = 0
+        self.saved = 0.0
+
+    def count(self, name, amount=1):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def summary(self):
+        average = self.saved / self.used * 1000 if self.used else 0
+        return (f"{self.sent} sent, {self.used} used, {self.wasted} wasted, "
+                f"{average:.0f} ms saved per used chunk")
@@ -1,43 +1,86 @@
 import os
-import io
+import sys
+import json
+import argparse
 import threading
 import time
 import subprocess
-import wave
 import queue
 import logging
-import winsound
-from collections import deque
 from datetime import datetime
 from pynput import keyboard
 import pyaudio
 import numpy as np
-import requests
 import pyperclip
 import pyautogui
+from audio_buffers import RingBuffer, ChunkBuffer
+from audio_files import find_audio_files, open_audio_file
+from transcription_backends import create_transcription_backend, TranscriptionError, StreamRejected, StreamingNotSupported, BACKENDS
+from sound_player import FeedbackPlayer, create_backend
+from chunk_trace import ChunkTrace, ChunkTracer
+from capture import create_capture_engine
+from speculation import SpeculativeRequest, SpeculationStats
+from request_policy import PolicyBackend, create_request_policy, is_retryable
+from rate_governor import RateGovernor
+from vad import NoiseFloorTracker, create_detector, find_split_point
+from silence_compaction import compact_silence
+from resampler import Resampler
 from env import (
     OPEN_AI_KEY,
     OPENAI_MODEL_REQ,
     VAD_THRESHOLD,
+    VAD_FRAME_MS,
+    VAD_DETECTOR,
+    VAD_ADAPTIVE,
+    VAD_NOISE_WINDOW,
+    VAD_ONSET_RATIO,
+    VAD_OFFSET_RATIO,
+    VAD_MIN_THRESHOLD,
     SILENCE_DURATION,
+    SPECULATIVE_DELAY,
+    COMPACT_SILENCE_MAX,
+    COMPACT_SILENCE_GAP,
+    COMPACT_TAIL_MARGIN,
     AUDIO_LENGTH_MIN,
     AUDIO_LENGTH_MAX,
+    SPLIT_SEARCH_WINDOW,
     AUTO_STOP_TIMEOUT,
     CONTEXT_CHUNKS_COUNT,
     ENABLE_CONTEXT,
+    CONTEXT_MODE,
+    TRANSCRIPTION_WORKERS,
+    UPLOAD_CODEC,
+    TRANSCRIPTION_BACKEND,
+    TRANSCRIPTION_BASE_URL,
+    STREAMING_UPLOAD,
+    REQUEST_RETRIES,
+    REQUEST_TIMEOUT,
+    REQUEST_HEDGING,
+    REQUEST_POLICY,
+    RATE_LIMIT_RPM,
+    RATE_LIMIT_AUDIO_SECONDS,
+    MAX_IN_FLIGHT,
+    RATE_LIMIT_ADAPTIVE,
     SOUND_MODE,
     PRE_RECORD_MS,
+    CAPTURE_MODE,
+    CAPTURE_NATIVE_RATE,
+    WARM_STREAM,
+    TRACE_FILE,
     DEBUG_LOGS
 )
 
 class WhisperTranscriber:
-    def __init__(self):
+    def __init__(self, transcription_workers=TRANSCRIPTION_WORKERS, chunk_queue_size=0, backend=None, clock=time):
         level = logging.DEBUG if DEBUG_LOGS else logging.INFO
         logging.basicConfig(level=level, format='%(message)s')
         self.logger = logging.getLogger(__name__)
 
         self.OPENAI_API_KEY = OPEN_AI_KEY
 
+        # Anything with time(), the time module by default, replay benchmarks pass a simulated clock
+        self.clock = clock
+
         self.CHUNK = 1024
         self.FORMAT = pyaudio.paInt16
         self.CHANNELS = 1
@@ -47,39 +90,122 @@ class WhisperTranscriber:
         self.SILENCE_DURATION = SILENCE_DURATION
         self.AUDIO_LENGTH_MIN = AUDIO_LENGTH_MIN
         self.AUDIO_LENGTH_MAX = AUDIO_LENGTH_MAX
+        self.SPLIT_SEARCH_WINDOW = SPLIT_SEARCH_WINDOW
         self.AUTO_STOP_TIMEOUT = AUTO_STOP_TIMEOUT
         self.CONTEXT_CHUNKS_COUNT = CONTEXT_CHUNKS_COUNT
         self.ENABLE_CONTEXT = ENABLE_CONTEXT
+        self.CONTEXT_MODE = CONTEXT_MODE if CONTEXT_MODE in ['dispatch', 'serial'] else 'dispatch'
+        self.TRANSCRIPTION_WORKERS = max(1, int(transcription_workers))
         self.SOUND_MODE = SOUND_MODE if SOUND_MODE in ['none', 'start-stop', 'all'] else 'all'
         self.PRE_RECORD_MS = PRE_RECORD_MS
 
-        # Calculate pre-recording buffer size (number of chunks)
-        chunk_duration_ms = (self.CHUNK / self.RATE) * 1000  # ~64ms per chunk
-        self.pre_record_chunks = max(1, int(self.PRE_RECORD_MS / chunk_duration_ms))
+        self.feedback = FeedbackPlayer(create_backend('winsound'), self.SOUND_MODE)
+
+        # VAD decides per frame, so speech edges are placed within the ~64ms blocks
+        self.VAD_FRAME = max(1, int(VAD_FRAME_MS * self.RATE / 1000))
+
+        # Pre-roll before the first voiced frame, in samples
+        self.pre_record_samples = int(self.PRE_RECORD_MS * self.RATE / 1000)
+
+        # Longest utterance the capture loop can accumulate before it is cut
+        self.max_chunk_samples = int(self.AUDIO_LENGTH_MAX * self.RATE) + self.pre_record_samples + self.CHUNK
+
+        # Thresholds follow the measured background noise instead of the fixed VAD_THRESHOLD
+        self.VAD_ADAPTIVE = VAD_ADAPTIVE
+        self.noise_floor = NoiseFloorTracker(
+            VAD_NOISE_WINDOW * self.RATE / self.VAD_FRAME,
+            VAD_ONSET_RATIO,
+            VAD_OFFSET_RATIO,
+            VAD_MIN_THRESHOLD
+        ) if self.VAD_ADAPTIVE else None
+
+        self.VAD_DETECTOR = VAD_DETECTOR
+        self.vad_detector = create_detector(self.VAD_DETECTOR, self.RATE)
+        self.last_level = 0
+
+        # Long pauses and the trailing silence are shortened before upload
+        self.COMPACT_SILENCE_MAX = COMPACT_SILENCE_MAX
+        self.COMPACT_SILENCE_GAP = COMPACT_SILENCE_GAP
+        self.COMPACT_TAIL_MARGIN = COMPACT_TAIL_MARGIN
 
         self.is_recording = False
         self.audio = None
-        self.stream = None
+        self.CAPTURE_MODE = CAPTURE_MODE
+        self.capture = None
+
+        # Open the microphone at its own rate and resample here, instead of inside the Windows audio stack
+        self.CAPTURE_NATIVE_RATE = CAPTURE_NATIVE_RATE
+        self.resampler = None
+
+        # Microphone kept open between recordings, the hotkey only opens the gate to the VAD
+        self.WARM_STREAM = WARM_STREAM
+        self.gate_open = False
+        self.gate_lock = threading.RLock()
+        self.capture_stats_start = None
         self.current_modifiers = set()
         self.recording_start_time = None
 
-        # Pre-recording circular buffer
-        self.pre_record_buffer = deque(maxlen=self.pre_record_chunks)
+        # Pre-recording circular buffer, holds the pre-roll plus the block the speech starts in
+        self.pre_record_buffer = RingBuffer(self.pre_record_samples + self.CHUNK)
 
-        self.audio_buffer = []
-        self.silence_counter = 0
+        self.audio_buffer = ChunkBuffer(self.max_chunk_samples)
+        self.silence_samples = 0
         self.is_speech_detected = False
+        self.samples_captured = 0
+        self.chunk_start_sample = 0
+        self.first_speech_time = 0
+        self.current_source = None
+
+        self.TRACE_FILE = TRACE_FILE
+        self.tracer = ChunkTracer(self.TRACE_FILE) if self.TRACE_FILE else None
         self.last_speech_time = 0
 
         self.OPENAI_MODEL_REQ = OPENAI_MODEL_REQ
 
-        self.chunk_queue = queue.Queue()
+        self.chunk_queue = queue.Queue(maxsize=chunk_queue_size)
         self.chunk_counter = 0
         self.completed_transcriptions = []
         self.worker_running = False
-
-        if not self.OPENAI_API_KEY:
-            raise ValueError("OPEN_AI_KEY not found in env.py file")
+        self.worker_threads = []
+
+        # Reorder stage: results wait here until every earlier chunk is pasted
+        self.pending_transcriptions = {}
+        self.next_paste_index = 0
+        self.paste_condition = threading.Condition()
+
+        self.UPLOAD_CODEC = UPLOAD_CODEC
+
+        # Streamed upload of the utterance being recorded, opened at speech onset
+        self.STREAMING_UPLOAD = STREAMING_UPLOAD
+        self.upload_stream = None
+
+        # Request sent after a short pause, used if the pause turns out to be the end of the chunk
+        self.SPECULATIVE_DELAY = SPECULATIVE_DELAY
+        self.speculation = None
+        self.speculation_stats = SpeculationStats()
+
+        # Timeouts, retries and hedged requests, configured per backend
+        self.request_policy = create_request_policy(
+            backend.name if backend else TRANSCRIPTION_BACKEND,
+            REQUEST_RETRIES,
+            REQUEST_TIMEOUT,
+            REQUEST_HEDGING,
+            REQUEST_POLICY
+        )
+        self.backend = PolicyBackend(backend or create_transcription_backend(
+            TRANSCRIPTION_BACKEND,
+            self.OPENAI_API_KEY,
+            self.OPENAI_MODEL_REQ,
+            codec=self.UPLOAD_CODEC,
+            rate=self.RATE,
+            channels=self.CHANNELS,
+            base_url=TRANSCRIPTION_BASE_URL,
+            # One more for the streamed or speculative request of the utterance being recorded, one for a hedge
+            pool_size=self.TRANSCRIPTION_WORKERS + 2,
+            timeout=self.request_policy.timeout,
+            # Queues requests under the API's rate limits, shared by the workers, streamed and speculative requests
+            governor=RateGovernor(RATE_LIMIT_RPM, RATE_LIMIT_AUDIO_SECONDS, MAX_IN_FLIGHT, RATE_LIMIT_ADAPTIVE)
+        ), self.request_policy, self.clock)
 
         self.init_audio()
         self.start_transcription_worker()
@@ -125,37 +251,13 @@ class WhisperTranscriber:
             self.press_ctrl_v_sendkeys()
 
     def play_start_sound(self):
-        if self.SOUND_MODE == 'none':
-            return
-        try:
-            winsound.PlaySound("SystemStart", winsound.SND_ALIAS | winsound.SND_ASYNC)
-        except:
-            try:
-                winsound.Beep(800, 200)
-            except:
-                pass
+        self.feedback.play('start')
 
     def play_stop_sound(self):
-        if self.SOUND_MODE == 'none':
-            return
-        try:
-            winsound.PlaySound("SystemExit", winsound.SND_ALIAS | winsound.SND_ASYNC)
-        except:
-            try:
-                winsound.Beep(400, 300)
-            except:
-                pass
+        self.feedback.play('stop')
 
     def play_transcribe_sound(self):
-        if self.SOUND_MODE in ['none', 'start-stop']:
-            return
-        try:
-            winsound.PlaySound("SystemNotification", winsound.SND_ALIAS | winsound.SND_ASYNC)
-        except:
-            try:
-                winsound.Beep(1000, 100)
-            except:
-                pass
+        self.feedback.play('transcribe')
 
     def init_audio(self):
         try:
@@ -171,9 +273,47 @@ class WhisperTranscriber:
 
     def start_transcription_worker(self):
         self.worker_running = True
-        worker_thread = threading.Thread(target=self.transcription_worker)
-        worker_thread.daemon = True
-        worker_thread.start()
+        for _ in range(self.TRANSCRIPTION_WORKERS):
+            worker_thread = threading.Thread(target=self.transcription_worker)
+            worker_thread.daemon = True
+            worker_thread.start()
+            self.worker_threads.append(worker_thread)
+
+    def wait_for_paste_turn(self, chunk_index):
+        # Serial context mode: a chunk is only sent once every earlier chunk is pasted,
+        # so its prompt always contains the full preceding text
+        with self.paste_condition:
+            self.paste_condition.wait_for(
+                lambda: self.next_paste_index >= chunk_index or not self.worker_running
+            )
+
+    def output_transcription(self, chunk_data, text):
+        self.logger.info(f"{text}")
+        self.insert_transcription(text + " ")
+
+    def deliver_transcription(self, chunk_data, text):
+        with self.paste_condition:
+            self.pending_transcriptions[chunk_data["index"]] = (chunk_data, text)
+
+            if chunk_data["index"] != self.next_paste_index:
+                self.logger.debug(f"⏳ {chunk_data['id']} waiting for earlier chunks")
+
+            while self.next_paste_index in self.pending_transcriptions:
+                chunk_data, text = self.pending_transcriptions.pop(self.next_paste_index)
+                self.next_paste_index += 1
+
+                if text and text.strip():
+                    try:
+                        self.output_transcription(chunk_data, text)
+                        chunk_data["trace"].mark('pasted')
+                    except Exception as e:
+                        self.logger.error(f"❌ Output error for {chunk_data['id']}: {e}")
+                    self.on_transcription_complete(chunk_data["id"], text)
+
+                if self.tracer:
+                    self.tracer.write(chunk_data["trace"])
+
+            self.paste_condition.notify_all()
 
     def transcription_worker(self):
         while self.worker_running:
@@ -183,24 +323,33 @@ class WhisperTranscriber:
                     break
 
                 chunk_id = chunk_data["id"]
+                chunk_index = chunk_data["index"]
                 audio_data = chunk_data["audio_data"]
+                chunk_data["trace"].mark('dequeued')
 
-                context_prompt = " ".join(self.completed_transcriptions[-self.CONTEXT_CHUNKS_COUNT:]) if self.ENABLE_CONTEXT else ""
-
-                if context_prompt:
-                    self.logger.debug(f"📝 {chunk_id} sending context to API:")
-                    self.logger.debug(f"   \"{context_prompt}\"")
-                else:
-                    self.logger.debug(f"📝 {chunk_id} no context available")
-
-                text = self.transcribe_audio(audio_data, chunk_id, context_prompt)
+                text = ""
+                try:
+                    if self.ENABLE_CONTEXT and self.CONTEXT_MODE == 'serial':
+                        self.wait_for_paste_turn(chunk_index)
 
-                if text and text.strip():
-                    self.logger.info(f"{text}")
-                    self.insert_transcription(text + " ")
-                    self.on_transcription_complete(chunk_id, text)
+                    # Dispatch mode uses whatever context has been pasted by the time this chunk is sent
+                    context_prompt = " ".join(self.completed_transcriptions[-self.CONTEXT_CHUNKS_COUNT:]) if self.ENABLE_CONTEXT else ""
 
-                self.chunk_queue.task_done()
+                    if context_prompt:
+                        self.logger.debug(f"📝 {chunk_id} sending context to API:")
+                        self.logger.debug(f"   \"{context_prompt}\"")
+                    else:
+                        self.logger.debug(f"📝 {chunk_id} no context available")
+
+                    text = self.finish_speculation(chunk_data) if chunk_data["speculation"] else None
+                    if text is None:
+                        if not chunk_data["upload"]:
+                            audio_data = self.compact_chunk(chunk_data)
+                        text = self.transcribe_audio(audio_data, chunk_id, context_prompt, chunk_data["trace"], chunk_data["upload"])
+                finally:
+                    # Always fill the slot, otherwise later chunks would never be pasted
+                    self.deliver_transcription(chunk_data, text)
+                    self.chunk_queue.task_done()
 
             except queue.Empty:
                 continue
@@ -208,193 +357,427 @@ class WhisperTranscriber:
                 self.logger.error(f"❌ Transcription worker error: {e}")
                 time.sleep(0.1)
 
-    def detect_voice_activity(self, audio_data):
+    def detect_voice_frames(self, audio_chunk):
+        """Voice decision for every VAD frame of the block."""
         try:
-            audio_np = np.frombuffer(audio_data, dtype=np.int16)
-
-            # Check if we have valid audio data
-            if len(audio_np) == 0:
-                return False
-
-            # Calculate RMS with safety checks
-            squared = audio_np.astype(np.float64) ** 2
-            mean_squared = np.mean(squared)
-
-            # Ensure we don't get negative values or NaN
-            if np.isnan(mean_squared) or mean_squared < 0:
-                return False
+            levels = self.vad_detector.score_samples(audio_chunk, self.VAD_FRAME)
+            if len(levels) == 0:
+                return np.zeros(0, dtype=bool)
+            self.last_level = levels.max()
 
-            rms = np.sqrt(mean_squared)
+            if not self.noise_floor:
+                return levels > self.VAD_THRESHOLD
 
-            return rms > self.VAD_THRESHOLD
+            if self.noise_floor.update(levels):
+                self.logger.debug(f"🎚️ Noise floor {self.noise_floor.floor:.0f} → onset {self.noise_floor.onset:.0f}, offset {self.noise_floor.offset:.0f}")
+            return levels > self.noise_floor.threshold(self.is_speech_detected)
 
         except Exception as e:
             self.logger.warning(f"⚠️ VAD error: {e}")
-            return False
+            return np.zeros(0, dtype=bool)
+
+    def vad_threshold_description(self):
+        if not self.noise_floor:
+            return f"{self.VAD_THRESHOLD}"
+        return f"adaptive, onset {self.noise_floor.onset:.0f} / offset {self.noise_floor.offset:.0f}"
+
+    def compact_audio(self, audio_data):
+        """Samples with long pauses and trailing silence shortened and their segment map, no map when compaction is off."""
+        if self.COMPACT_SILENCE_MAX <= 0:
+            return audio_data, None
+
+        threshold = self.noise_floor.offset if self.noise_floor else self.VAD_THRESHOLD
+        return compact_silence(
+            audio_data,
+            self.vad_detector,
+            threshold,
+            self.VAD_FRAME,
+            int(self.COMPACT_SILENCE_MAX * self.RATE),
+            int(self.COMPACT_SILENCE_GAP * self.RATE),
+            int(self.COMPACT_TAIL_MARGIN * self.RATE)
+        )
+
+    def compact_chunk(self, chunk_data):
+        """Shorten long pauses and the trailing silence of a chunk, the segment map goes into chunk_data."""
+        audio_data = chunk_data["audio_data"]
+        compacted, segments = self.compact_audio(audio_data)
+        self.record_compaction(chunk_data, audio_data, compacted, segments)
+        return compacted
+
+    def record_compaction(self, chunk_data, audio_data, compacted, segments):
+        if segments is None:
+            return
+        chunk_data["segments"] = segments
 
-    def transcribe_audio(self, audio_data, chunk_id, context_prompt):
+        removed = (len(audio_data) - len(compacted)) / self.RATE
+        chunk_data["trace"].set('silence_removed', removed)
+        if removed:
+            self.logger.debug(f"✂️ {chunk_data['id']} removed {removed:.2f}s of silence ({len(audio_data) / self.RATE:.1f}s → {len(compacted) / self.RATE:.1f}s)")
+        return compacted
+
+    def transcribe_audio(self, audio_data, chunk_id, context_prompt, trace=None, upload=None):
         try:
-            audio_io = io.BytesIO()
+            self.play_transcribe_sound()
 
-            with wave.open(audio_io, 'wb') as wav_file:
-                wav_file.setnchannels(self.CHANNELS)
-                wav_file.setsampwidth(self.audio.get_sample_size(self.FORMAT))
-                wav_file.setframerate(self.RATE)
-                wav_file.writeframes(audio_data)
+            transcript = None
+            if upload:
+                transcript = self.finish_upload_stream(upload, chunk_id, trace)
+            if transcript is None:
+                self.logger.debug(f"🌐 Sending {chunk_id} to {self.backend.name}")
+                transcript = self.backend.transcribe(audio_data, context_prompt, chunk_id, trace)
 
-            audio_io.seek(0)
+            if transcript:
+                self.logger.debug(f"✅ Completed {chunk_id}: \"{transcript[:50]}{'...' if len(transcript) > 50 else ''}\"")
+                return transcript
+            else:
+                self.logger.debug(f"⚠️ Empty transcription for {chunk_id}")
+                return ""
 
-            self.logger.debug(f"🌐 Sending {chunk_id} to API")
-            self.play_transcribe_sound()
+        except TranscriptionError as e:
+            self.logger.error(f"❌ API error for {chunk_id}: {e}")
+            return ""
+        except Exception as e:
+            self.logger.error(f"❌ Transcription error for {chunk_id}: {e}")
+            return ""
 
-            files = {
-                'file': ('audio.wav', audio_io, 'audio/wav'),
-                'model': (None, self.OPENAI_MODEL_REQ),
-                'response_format': (None, 'text'),
-            }
+    def open_upload_stream(self):
+        """Start uploading the current utterance while it is still being spoken."""
+        # Serial context is only known once the previous chunk is pasted, so it has to wait
+        if not self.STREAMING_UPLOAD or (self.ENABLE_CONTEXT and self.CONTEXT_MODE == 'serial'):
+            return
 
-            if context_prompt:
-                files['prompt'] = (None, context_prompt)
+        context_prompt = " ".join(self.completed_transcriptions[-self.CONTEXT_CHUNKS_COUNT:]) if self.ENABLE_CONTEXT else ""
+        try:
+            self.upload_stream = self.backend.open_stream(context_prompt)
+        except Exception as e:
+            self.logger.debug(f"⚠️ Could not open streamed upload: {e}")
+            self.upload_stream = None
+            return
 
-            headers = {
-                'Authorization': f'Bearer {self.OPENAI_API_KEY}'
-            }
+        if self.upload_stream:
+            self.upload_stream.opened_at = self.clock.time()
+            self.upload_stream.write(self.audio_buffer.view())
+            self.logger.debug(f"📡 Streaming upload to {self.backend.name}")
 
-            response = requests.post(
-                'https://api.openai.com/v1/audio/transcriptions',
-                files=files,
-                headers=headers,
-                timeout=30
-            )
+    def finish_upload_stream(self, upload, chunk_id, trace=None):
+        """Transcript of a streamed upload, None when the chunk has to be sent whole instead."""
+        try:
+            transcript = self.backend.finish_stream(upload, trace)
+            self.logger.debug(f"📡 {chunk_id} streamed ({upload.bytes_written} bytes)")
+            return transcript
+        except StreamingNotSupported as e:
+            self.logger.warning(f"⚠️ {self.backend.name} does not accept streamed uploads ({e.status_code}), sending whole chunks")
+        except StreamRejected as e:
+            self.logger.debug(f"⚠️ Streamed upload of {chunk_id} refused ({e.status_code}), sending it whole")
+        except TranscriptionError as e:
+            # Worth sending again whole, with the request policy's retries
+            if not (is_retryable(e) and self.request_policy.retries):
+                raise
+            self.logger.debug(f"⚠️ Streamed upload of {chunk_id} failed ({e.status_code}), sending it whole")
+        except Exception as e:
+            self.logger.debug(f"⚠️ Streamed upload of {chunk_id} failed ({e}), sending it whole")
+        return None
 
-            if response.status_code == 200:
-                transcript = response.text.strip()
-                if transcript:
-                    self.logger.debug(f"✅ Completed {chunk_id}: \"{transcript[:50]}{'...' if len(transcript) > 50 else ''}\"")
-                    return transcript
-                else:
-                    self.logger.debug(f"⚠️ Empty transcription for {chunk_id}")
-                    return ""
-            else:
-                self.logger.error(f"❌ API error for {chunk_id}: {response.status_code} - {response.text}")
-                return ""
+    def start_speculation(self):
+        """Send the utterance now, in case the pause turns out to be the end of it."""
+        # A streamed upload is already on its way, serial context is not known yet
+        if self.upload_stream or (self.ENABLE_CONTEXT and self.CONTEXT_MODE == 'serial'):
+            return
+        if len(self.audio_buffer) / self.RATE < self.AUDIO_LENGTH_MIN:
+            return
 
+        context_prompt = " ".join(self.completed_transcriptions[-self.CONTEXT_CHUNKS_COUNT:]) if self.ENABLE_CONTEXT else ""
+        chunk_id = f"chunk_{self.chunk_counter:03d}"
+
+        # The view stays valid, later blocks are only appended behind it; it is compacted like the chunk would be
+        self.speculation = SpeculativeRequest(
+            self.backend, self.audio_buffer.view(), context_prompt, chunk_id, self.clock, prepare=self.compact_audio
+        )
+        self.speculation_stats.count('sent')
+        self.logger.debug(f"🔮 Speculatively sending {chunk_id} ({len(self.audio_buffer) / self.RATE:.1f}s)")
+
+    def cancel_speculation(self):
+        # The request cannot be recalled, its text is dropped when it arrives
+        self.speculation.cancel()
+        self.speculation_stats.count('wasted')
+        self.logger.debug(f"🔮 Speech resumed, discarding speculative {self.speculation.chunk_id}")
+        self.speculation = None
+
+    def finish_speculation(self, chunk_data):
+        """Text of the chunk's speculative request, None when the chunk has to be sent again."""
+        speculation = chunk_data["speculation"]
+        try:
+            text = speculation.result()
         except Exception as e:
-            self.logger.error(f"❌ Transcription error for {chunk_id}: {e}")
-            return ""
+            self.speculation_stats.count('wasted')
+            self.logger.debug(f"⚠️ Speculative request for {chunk_data['id']} failed ({e}), sending it again")
+            return None
+
+        self.record_compaction(chunk_data, speculation.samples, speculation.upload, speculation.segments)
+        saved = speculation.saved(chunk_data["trace"].get('silence_detected'))
+        self.speculation_stats.count('used')
+        self.speculation_stats.count('saved', saved)
+        chunk_data["trace"].set('speculative_done', speculation.done_at)
+        self.logger.debug(f"🔮 {chunk_data['id']} used its speculative result ({saved * 1000:.0f} ms saved)")
+        self.play_transcribe_sound()
+        return text
+
+    def capture_rate(self):
+        """Rate the microphone is opened at, its default rate with CAPTURE_NATIVE_RATE."""
+        if not self.CAPTURE_NATIVE_RATE:
+            return self.RATE
+        try:
+            return int(self.audio.get_default_input_device_info()['defaultSampleRate'])
+        except Exception as e:
+            self.logger.warning(f"⚠️ Input device rate unknown, capturing at {self.RATE} Hz: {e}")
+            return self.RATE
+
+    def create_capture(self):
+        rate = self.capture_rate()
+        self.resampler = Resampler(rate, self.RATE) if rate != self.RATE else None
+        if self.resampler:
+            self.logger.debug(f"🎚️ Capturing at {rate} Hz, resampled to {self.RATE} Hz ({self.resampler.taps} taps)")
+
+        return create_capture_engine(
+            self.CAPTURE_MODE,
+            self.audio,
+            rate,
+            self.CHANNELS,
+            self.FORMAT,
+            # Blocks of the same duration, so they still resample to about CHUNK samples
+            round(self.CHUNK * rate / self.RATE),
+            self.on_audio_block,
+            self.clock
+        )
+
+    def open_warm_stream(self):
+        """Open the microphone for the lifetime of the process, only the pre-roll is kept until recording starts."""
+        try:
+            self.capture = self.create_capture()
+            self.capture.start()
+            self.logger.info(f"🎙️ Microphone kept open, recording starts instantly ({self.PRE_RECORD_MS}ms pre-roll)")
+        except Exception as e:
+            self.logger.error(f"❌ Warm stream error, the microphone opens on each recording: {e}")
+            self.capture = None
 
     def start_recording(self):
         if self.is_recording:
             return
 
-        try:
-            self.stream = self.audio.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.RATE,
-                input=True,
-                frames_per_buffer=self.CHUNK
-            )
+        # Open the API connection while the microphone starts, the first chunk skips the handshake
+        self.backend.warm()
 
-            self.is_recording = True
-            self.audio_buffer = []
-            self.silence_counter = 0
-            self.is_speech_detected = False
-            self.last_speech_time = time.time()
-            self.recording_start_time = time.time()
-            self.total_silence_start = time.time()
-
-            self.logger.info(f"🔴 Recording started (VAD threshold: {self.VAD_THRESHOLD})")
+        try:
+            warm = self.WARM_STREAM and self.capture is not None and self.capture.running
+            if not warm:
+                if self.WARM_STREAM and self.capture:
+                    # The warm stream failed, it is replaced by a new one
+                    self.capture.stop()
+                self.capture = self.create_capture()
+
+            with self.gate_lock:
+                self.is_recording = True
+                self.audio_buffer.clear()
+                self.silence_samples = 0
+                self.is_speech_detected = False
+                self.samples_captured = 0
+                self.last_speech_time = self.clock.time()
+                self.recording_start_time = self.clock.time()
+                self.total_silence_start = self.clock.time()
+                self.capture_stats_start = self.capture.stats()
+                self.gate_open = True
+
+            if not warm:
+                # VAD and chunking run on the capture engine's consumer thread
+                self.capture.start()
+
+            self.logger.info(f"🔴 Recording started (VAD threshold: {self.vad_threshold_description()})")
             self.play_start_sound()
 
-            recording_thread = threading.Thread(target=self.record_audio)
-            recording_thread.daemon = True
-            recording_thread.start()
-
         except Exception as e:
             self.logger.error(f"❌ Recording start error: {e}")
             self.is_recording = False
+            self.gate_open = False
 
-    def record_audio(self):
-        while self.is_recording:
-            try:
-                data = self.stream.read(self.CHUNK, exception_on_overflow=False)
-                current_time = time.time()
-                audio_chunk = np.frombuffer(data, dtype=np.int16)
+    def on_audio_block(self, audio_chunk, captured_at):
+        """Consumer side of the capture engine, returns False to stop capturing."""
+        if self.resampler:
+            audio_chunk = self.resampler.process(audio_chunk)
 
-                # Always add to pre-recording buffer
-                self.pre_record_buffer.append(audio_chunk)
+        with self.gate_lock:
+            if not self.gate_open:
+                # Warm stream between recordings: keep the pre-roll current, no VAD
+                self.pre_record_buffer.write(audio_chunk)
+                return True
 
-                has_voice = self.detect_voice_activity(data)
+            if not self.process_audio_block(audio_chunk, captured_at):
+                self.stop_recording()
+                # A warm stream stays open for the next recording
+                return self.WARM_STREAM
+        return True
+
+    def process_audio_block(self, audio_chunk, current_time):
+        """Run VAD and chunking on one block, returns False when recording should auto-stop.
+
+        current_time is when the last sample of the block was captured. Speech
+        edges are placed at VAD frame resolution within the block.
+        """
+        block_length = len(audio_chunk)
+        self.samples_captured += block_length
+
+        # Always add to pre-recording buffer
+        self.pre_record_buffer.write(audio_chunk)
+
+        voiced_frames = np.flatnonzero(self.detect_voice_frames(audio_chunk))
+
+        if len(voiced_frames):
+            speech_start = voiced_frames[0] * self.VAD_FRAME
+            speech_end = min((voiced_frames[-1] + 1) * self.VAD_FRAME, block_length)
+
+            if not self.is_speech_detected:
+                self.logger.debug(f"🗣️ Voice detected ({self.VAD_DETECTOR} level {self.last_level:.0f})")
+                self.is_speech_detected = True
+                self.first_speech_time = current_time - (block_length - speech_start) / self.RATE
+
+                # Add the pre-roll before the first voiced frame and the rest of the block to main buffer
+                count = min(self.pre_record_samples + block_length - speech_start, len(self.pre_record_buffer))
+                self.chunk_start_sample = self.samples_captured - count
+                self.audio_buffer.extend_ring(self.pre_record_buffer, count)
+                self.open_upload_stream()
+            else:
+                # Already recording, just add current chunk
+                self.audio_buffer.extend(audio_chunk)
+                if self.upload_stream:
+                    self.upload_stream.write(audio_chunk)
+                if self.speculation:
+                    self.cancel_speculation()
+
+            self.last_speech_time = current_time - (block_length - speech_end) / self.RATE
+            self.silence_samples = block_length - speech_end
+            self.total_silence_start = current_time
+
+        elif self.is_speech_detected:
+            self.silence_samples += block_length
+            self.audio_buffer.extend(audio_chunk)
+            if self.upload_stream:
+                self.upload_stream.write(audio_chunk)
+
+        if self.is_speech_detected:
+            silence_duration = self.silence_samples / self.RATE
+
+            if silence_duration >= self.SILENCE_DURATION:
+                # End the chunk SILENCE_DURATION after the last voiced frame, not at the block edge
+                excess = self.silence_samples - int(self.SILENCE_DURATION * self.RATE)
+                self.audio_buffer.truncate(len(self.audio_buffer) - excess)
+                self.process_audio_buffer('silence')
+            elif self.SPECULATIVE_DELAY > 0 and not self.speculation and silence_duration >= self.SPECULATIVE_DELAY:
+                self.start_speculation()
+
+        # Check for auto-stop timeout (total silence since recording started)
+        if not self.is_speech_detected and self.AUTO_STOP_TIMEOUT > 0:
+            total_silence_duration = current_time - self.total_silence_start
+            if total_silence_duration >= self.AUTO_STOP_TIMEOUT:
+                self.logger.debug(f"⏰ Auto-stopping after {self.AUTO_STOP_TIMEOUT}s of silence")
+                return False
 
-                if has_voice:
-                    if not self.is_speech_detected:
-                        self.logger.debug("🗣️ Voice detected")
-                        self.is_speech_detected = True
+        if self.is_speech_detected:
+            buffer_duration = len(self.audio_buffer) / self.RATE
+            if buffer_duration >= self.AUDIO_LENGTH_MAX:
+                self.logger.debug(f"⏰ Maximum length reached ({self.AUDIO_LENGTH_MAX}s)")
+                self.split_audio_buffer(current_time)
 
-                        # Add pre-recorded chunks to main buffer
-                        for pre_chunk in self.pre_record_buffer:
-                            self.audio_buffer.extend(pre_chunk)
-                    else:
-                        # Already recording, just add current chunk
-                        self.audio_buffer.extend(audio_chunk)
+        return True
 
-                    self.last_speech_time = current_time
-                    self.silence_counter = 0
-                    self.total_silence_start = current_time
+    def split_audio_buffer(self, current_time):
+        """Cut a chunk that reached AUDIO_LENGTH_MAX at its quietest recent point, the rest starts the next chunk."""
+        buffered = self.audio_buffer.view()
+        window = int(self.SPLIT_SEARCH_WINDOW * self.RATE)
 
-                elif self.is_speech_detected:
-                    self.silence_counter += 1
-                    self.audio_buffer.extend(audio_chunk)
+        # A streamed upload already carries every sample, it can only end at the buffer end
+        if window <= 0 or self.upload_stream:
+            self.process_audio_buffer('max_length')
+            return
 
-                    silence_duration = self.silence_counter * self.CHUNK / self.RATE
+        split = find_split_point(buffered, window, self.VAD_FRAME)
+        remainder = buffered[split:].copy()
+        split_time = current_time - len(remainder) / self.RATE
+        self.logger.debug(f"✂️ Splitting {len(remainder) / self.RATE:.2f}s before the end, carried into the next chunk")
 
-                    if silence_duration >= self.SILENCE_DURATION:
-                        self.process_audio_buffer()
+        # A speculative request that already holds part of the remainder would paste it twice
+        if self.speculation and len(self.speculation.samples) > split:
+            self.cancel_speculation()
 
-                # Check for auto-stop timeout (total silence since recording started)
-                if not self.is_speech_detected and self.AUTO_STOP_TIMEOUT > 0:
-                    total_silence_duration = current_time - self.total_silence_start
-                    if total_silence_duration >= self.AUTO_STOP_TIMEOUT:
-                        self.logger.debug(f"⏰ Auto-stopping after {self.AUTO_STOP_TIMEOUT}s of silence")
-                        self.stop_recording()
-                        break
+        silence_samples = self.silence_samples
+        last_speech_time = self.last_speech_time
+        chunk_start_sample = self.chunk_start_sample
 
-                if self.is_speech_detected:
-                    buffer_duration = len(self.audio_buffer) / self.RATE
-                    if buffer_duration >= self.AUDIO_LENGTH_MAX:
-                        self.logger.debug(f"⏰ Maximum length reached ({self.AUDIO_LENGTH_MAX}s)")
-                        self.process_audio_buffer()
+        self.last_speech_time = min(last_speech_time, split_time)
+        self.audio_buffer.truncate(split)
+        self.process_audio_buffer('max_length')
 
-            except Exception as e:
-                self.logger.error(f"❌ Recording error: {e}")
-                break
+        # The utterance goes on, starting from the split point
+        self.audio_buffer.extend(remainder)
+        self.is_speech_detected = True
+        self.silence_samples = min(silence_samples, len(remainder))
+        self.last_speech_time = last_speech_time
+        self.first_speech_time = split_time
+        self.chunk_start_sample = chunk_start_sample + split
 
-    def process_audio_buffer(self):
+    def process_audio_buffer(self, reason='stop'):
         if not self.audio_buffer:
             return
 
         buffer_duration = len(self.audio_buffer) / self.RATE
+        upload, self.upload_stream = self.upload_stream, None
+        speculation, self.speculation = self.speculation, None
 
         if buffer_duration >= self.AUDIO_LENGTH_MIN:
-            chunk_id = f"chunk_{self.chunk_counter:03d}"
+            chunk_index = self.chunk_counter
+            chunk_id = f"chunk_{chunk_index:03d}"
             self.chunk_counter += 1
 
             self.logger.debug(f"🎯 Created {chunk_id} ({buffer_duration:.1f}s)")
 
-            audio_data = np.array(self.audio_buffer, dtype=np.int16).tobytes()
+            trace = ChunkTrace(chunk_id, self.clock)
+            trace.set('reason', reason)
+            trace.set('duration', buffer_duration)
+            trace.set('first_speech', self.first_speech_time)
+            trace.set('speech_end', self.last_speech_time)
+            trace.mark('silence_detected')
+
+            if upload:
+                # Most of the audio is already on the wire, only the tail is left to send
+                upload.finish()
+                trace.set('upload_opened', upload.opened_at)
+            if speculation:
+                # No speech since it was sent, its text covers the whole chunk
+                trace.set('speculative_sent', speculation.sent_at)
+
+            # Hand the filled samples over as a view, the buffer moves on to a fresh array
+            audio_data = self.audio_buffer.detach()
 
             chunk_data = {
                 "id": chunk_id,
-                "audio_data": audio_data
+                "index": chunk_index,
+                "audio_data": audio_data,
+                "source": self.current_source,
+                "offset": self.chunk_start_sample / self.RATE,
+                "duration": buffer_duration,
+                "trace": trace,
+                "upload": upload,
+                "speculation": speculation,
+                "segments": None
             }
 
+            trace.mark('enqueued')
             self.chunk_queue.put(chunk_data)
         else:
             self.logger.debug(f"⚠️ Audio too short ({buffer_duration:.1f}s)")
+            self.audio_buffer.clear()
+            if upload:
+                upload.abort()
 
-        self.audio_buffer = []
-        self.silence_counter = 0
+        self.silence_samples = 0
         self.is_speech_detected = False
 
     def stop_recording(self):
@@ -405,23 +788,41 @@ class WhisperTranscriber:
 
         recording_duration = 0
         if self.recording_start_time:
-            recording_duration = time.time() - self.recording_start_time
+            recording_duration = self.clock.time() - self.recording_start_time
 
         self.logger.info(f"🚫 Recording stopped ({recording_duration:.1f}s)")
 
-        if self.audio_buffer:
-            self.process_audio_buffer()
+        # Blocks captured before the stop are still processed, then the device closes unless it is kept warm
+        if self.capture:
+            if self.WARM_STREAM:
+                self.capture.drain()
+            else:
+                self.capture.stop()
+            stats = self.capture.stats()
+            if self.capture_stats_start:
+                # Blocking capture reports its overflows as None (unknown)
+                stats = {name: value if value is None else value - self.capture_stats_start[name] for name, value in stats.items()}
+            self.logger.debug(f"🎙️ Capture: {stats['blocks']} blocks, consumer CPU {stats['consumer_cpu'] * 1000:.0f}ms")
+            if stats['overflows'] or stats['dropped']:
+                self.logger.warning(f"⚠️ Audio lost: {stats['overflows']} input overflows, {stats['dropped']} blocks dropped")
+
+        # The consumer thread may still be inside a block, the gate closes between blocks
+        with self.gate_lock:
+            self.gate_open = False
+            if self.audio_buffer:
+                self.process_audio_buffer()
+
+        if self.speculation_stats.sent:
+            self.logger.info(f"🔮 Speculative requests: {self.speculation_stats.summary()}")
+        request_stats = self.backend.stats
+        if request_stats.retries or request_stats.hedged:
+            self.logger.info(f"🔁 Requests: {request_stats.summary()}")
+        governor = self.backend.governor
+        if governor and (governor.stats['waited'] or governor.stats['rate_limited']):
+            self.logger.info(f"🚦 Rate limits: {governor.summary()}")
 
         self.play_stop_sound()
 
-        try:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
-        except Exception as e:
-            self.logger.error(f"❌ Audio closing error: {e}")
-
     def on_press(self, key):
         if key in {keyboard.Key.ctrl, keyboard.Key.alt}:
             self.current_modifiers.add(key)
@@ -439,15 +840,18 @@ class WhisperTranscriber:
             self.current_modifiers.remove(key)
 
     def start_listening(self):
-        self.logger.info(f"🎹 Audio Transcriber ready (model: {self.OPENAI_MODEL_REQ})")
+        self.logger.info(f"🎹 Audio Transcriber ready (model: {self.OPENAI_MODEL_REQ}, backend: {self.backend.name})")
         auto_stop_status = f"{self.AUTO_STOP_TIMEOUT}s" if self.AUTO_STOP_TIMEOUT > 0 else "disabled"
         context_status = f"{self.CONTEXT_CHUNKS_COUNT} chunks" if self.CONTEXT_CHUNKS_COUNT > 0 and self.ENABLE_CONTEXT else "disabled"
-        self.logger.info(f"   VAD threshold: {self.VAD_THRESHOLD} | Silence: {self.SILENCE_DURATION}s | Auto-stop: {auto_stop_status}")
-        self.logger.info(f"   Context prompts: {context_status} | Sound mode: {self.SOUND_MODE}")
+        self.logger.info(f"   VAD threshold: {self.vad_threshold_description()} | Silence: {self.SILENCE_DURATION}s | Auto-stop: {auto_stop_status}")
+        self.logger.info(f"   Context prompts: {context_status} | Workers: {self.TRANSCRIPTION_WORKERS} | Sound mode: {self.SOUND_MODE}")
         self.logger.info("   Ctrl + Alt + Space - start/stop recording")
         self.logger.info("   Ctrl+C - exit")
         self.logger.info("")
 
+        if self.WARM_STREAM:
+            self.open_warm_stream()
+
         with keyboard.Listener(
             on_press=self.on_press,
             on_release=self.on_release
@@ -471,12 +875,11 @@ class WhisperTranscriber:
             self.logger.error(f"❌ Recording stop error: {e}")
 
         try:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
+            if self.capture:
+                self.capture.stop()
+                self.capture = None
         except Exception as e:
-            self.logger.error(f"❌ Stream closing error: {e}")
+            self.logger.error(f"❌ Audio closing error: {e}")
 
         try:
             if self.audio:
@@ -486,9 +889,133 @@ class WhisperTranscriber:
             self.logger.error(f"❌ PyAudio termination error: {e}")
 
         self.logger.info("⏳ Waiting for pending transcriptions...")
-        self.chunk_queue.put(None)
+        with self.paste_condition:
+            self.paste_condition.notify_all()
+        for _ in self.worker_threads:
+            self.chunk_queue.put(None)
         time.sleep(1)
 
+class BatchTranscriber(WhisperTranscriber):
+    """Offline transcription of audio files through the live VAD chunking and worker pool."""
+
+    def __init__(self, output, jsonl=False, transcription_workers=TRANSCRIPTION_WORKERS, backend=None):
+        self.output = output
+        self.jsonl = jsonl
+
+        # A small bounded queue makes file reading wait for the workers, so memory stays flat
+        super().__init__(
+            transcription_workers=transcription_workers,
+            chunk_queue_size=2 * max(1, int(transcription_workers)),
+            backend=backend
+        )
+        self.AUTO_STOP_TIMEOUT = 0
+
+        # Chunk timestamps are file positions here, not wall-clock time, so traces would be meaningless
+        self.tracer = None
+
+        # Files are read faster than real time, there is no speech to overlap the upload with
+        self.STREAMING_UPLOAD = False
+        self.SPECULATIVE_DELAY = 0
+
+    def init_audio(self):
+        self.audio = None
+
+    def output_transcription(self, chunk_data, text):
+        if self.jsonl:
+            record = {
+                "file": chunk_data["source"],
+                "chunk": chunk_data["id"],
+                "start": round(chunk_data["offset"], 3),
+                "end": round(chunk_data["offset"] + chunk_data["duration"], 3),
+                "text": text,
+            }
+            segments = chunk_data["segments"]
+            if segments is not None and len(segments) > 1:
+                # [uploaded start, file start, length] in seconds, to place times in the compacted upload back in the file
+                record["segments"] = [
+                    [round(uploaded / self.RATE, 3), round(chunk_data["offset"] + original / self.RATE, 3), round(length / self.RATE, 3)]
+                    for uploaded, original, length in segments.tolist()
+                ]
+            self.output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            self.output.write(text + "\n")
+        self.output.flush()
+
+    def transcribe_file(self, path):
+        rate, blocks = open_audio_file(path, self.CHUNK)
+        resampler = None
+        if rate != self.RATE:
+            # Read blocks of the same duration, they resample to about CHUNK samples
+            rate, blocks = open_audio_file(path, round(self.CHUNK * rate / self.RATE))
+            resampler = Resampler(rate, self.RATE)
+            self.logger.debug(f"🎚️ {path}: resampling {rate} Hz to {self.RATE} Hz")
+
+        self.current_source = path
+        self.pre_record_buffer.clear()
+        self.audio_buffer.clear()
+        self.silence_samples = 0
+        self.is_speech_detected = False
+        self.samples_captured = 0
+
+        self.logger.debug(f"📂 {path}")
+        for block in blocks:
+            if resampler:
+                block = resampler.process(block)
+            self.process_audio_block(block, (self.samples_captured + len(block)) / self.RATE)
+        self.process_audio_buffer()
+
+        return self.samples_captured / self.RATE
+
+    def run(self, paths):
+        files = find_audio_files(paths)
+        start = time.perf_counter()
+        audio_seconds = 0
+
+        for path in files:
+            try:
+                audio_seconds += self.transcribe_file(path)
+            except Exception as e:
+                self.logger.error(f"❌ {path}: {e}")
+
+        self.chunk_queue.join()
+
+        elapsed = time.perf_counter() - start
+        speed = audio_seconds / elapsed if elapsed > 0 else 0
+        self.logger.info(f"✅ {len(files)} files, {audio_seconds:.1f}s of audio, {self.chunk_counter} chunks in {elapsed:.1f}s ({speed:.1f}x realtime)")
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(description="Transcribe WAV/FLAC files or directories without the hotkey and microphone")
+    parser.add_argument("paths", nargs="+", help="audio files or directories")
+    parser.add_argument("--jsonl", action="store_true", help="write one JSON object per chunk instead of plain text")
+    parser.add_argument("--output", "-o", help="output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=TRANSCRIPTION_WORKERS, help="chunks transcribed in parallel")
+    parser.add_argument("--backend", choices=BACKENDS, default=TRANSCRIPTION_BACKEND, help="transcription backend")
+    parser.add_argument("--base-url", default=TRANSCRIPTION_BASE_URL, help="API base URL with /v1, e.g. a local mock server")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    transcriber = None
+    try:
+        backend = create_transcription_backend(
+            args.backend,
+            OPEN_AI_KEY,
+            OPENAI_MODEL_REQ,
+            codec=UPLOAD_CODEC,
+            base_url=args.base_url,
+            pool_size=args.workers + 1,
+            timeout=create_request_policy(args.backend, REQUEST_RETRIES, REQUEST_TIMEOUT, REQUEST_HEDGING, REQUEST_POLICY).timeout,
+            governor=RateGovernor(RATE_LIMIT_RPM, RATE_LIMIT_AUDIO_SECONDS, MAX_IN_FLIGHT, RATE_LIMIT_ADAPTIVE)
+        )
+        transcriber = BatchTranscriber(output, args.jsonl, args.workers, backend)
+        transcriber.run(args.paths)
+    except ValueError as e:
+        print(f"❌ Configuration error: {e}", file=sys.stderr)
+    finally:
+        if transcriber:
+            transcriber.cleanup()
+        if output is not sys.stdout:
+            output.close()
+
 def main():
     print("🎤 Whisper Transcriber (Windows)")
     print("=" * 40)
@@ -510,4 +1037,7 @@ def main():
                 print(f"❌ Final cleanup error: {e}")
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        batch_main(sys.argv[1:])
+    else:
+        main()
@@ -1,6 +1,5 @@
 import os
 import json
-import base64
 import threading
 import time
 import subprocess
@@ -8,8 +7,12 @@ from datetime import datetime
 from pynput import keyboard
 import pyaudio
 import numpy as np
-import websocket
-from env import OPEN_AI_KEY, OPENAI_MODEL_WS, CHUNK_SIZE_MS
+from sound_player import FeedbackPlayer, create_backend
+from realtime_session import RealtimeSessionPool, AppendEventEncoder
+from capture import BlockQueue
+from resampler import Resampler
+from transcription_backends import create_transcription_backend
+from env import OPEN_AI_KEY, OPENAI_MODEL_WS, OPENAI_MODEL_REQ, OPENAI_REALTIME_URL, CHUNK_SIZE_MS, WS_SESSION_REFRESH, CAPTURE_NATIVE_RATE, TRANSCRIPTION_BASE_URL
 from Quartz.CoreGraphics import (
     CGEventCreateKeyboardEvent,
     CGEventPost,
@@ -18,6 +21,24 @@ from Quartz.CoreGraphics import (
     kCGEventFlagMaskCommand
 )
 
+class Recording:
+    """Where the audio of one recording goes: its realtime session once attached, memory until then.
+
+    Each recording has its own, so one that is still being finished in
+    the background never mixes with the next.
+    """
+
+    def __init__(self, ws=None):
+        self.ws = ws
+        # Audio recorded while no session is attached yet, sent in one burst once it is ready
+        self.pending_audio = []
+        self.lock = threading.Lock()
+        self.connect_thread = None
+        self.finished = False
+        self.tail_ms = 0
+        self.dropped = 0
+
+
 class AudioTranscriber:
     def __init__(self):
         self.OPENAI_API_KEY = OPEN_AI_KEY
@@ -29,19 +50,52 @@ class AudioTranscriber:
         self.CHANNELS = 1
         self.RATE = 24000
 
+        # Open the microphone at its own rate and resample here, instead of inside CoreAudio
+        self.CAPTURE_NATIVE_RATE = CAPTURE_NATIVE_RATE
+        self.resampler = None
+
         self.is_recording = False
         self.audio = None
         self.stream = None
         self.current_modifiers = set()
-        self.ws = None
+        self.recording = None
         self.recording_start_time = None
 
         self.chunk_samples = int(self.RATE * self.CHUNK_SIZE_MS / 1000)
-        self.audio_buffer = []
+
+        # The capture thread fills one chunk at a time, full chunks go to the sender thread
+        # through a bounded queue, so a stalled network never blocks the microphone
+        self.SEND_QUEUE_SECONDS = 10
+        self.chunk = np.zeros(self.chunk_samples, dtype=np.int16)
+        self.chunk_fill = 0
+        self.send_queue = BlockQueue(max(4, int(self.SEND_QUEUE_SECONDS * 1000 / self.CHUNK_SIZE_MS)), self.chunk_samples)
+        self.append_encoder = AppendEventEncoder()
+        self.sender_thread = None
+        self.recording_thread = None
+        # Waits for the session and commits a stopped recording, off the hotkey listener
+        self.finisher_thread = None
+
+        self.feedback = FeedbackPlayer(create_backend('macos', 'afplay'), 'start-stop')
 
         if not self.OPENAI_API_KEY:
             raise ValueError("OPEN_AI_KEY not found in env.py file")
 
+        # Connected and configured in the background, a recording starts on a ready session
+        self.sessions = RealtimeSessionPool(
+            f"{OPENAI_REALTIME_URL}?model={self.OPENAI_MODEL_WS}",
+            [
+                f"Authorization: Bearer {self.OPENAI_API_KEY}",
+                "OpenAI-Beta: realtime=v1"
+            ],
+            self.session_config(),
+            max_age=WS_SESSION_REFRESH
+        )
+
+        # Transcribes the recording when no realtime session could be opened for it
+        self.fallback = create_transcription_backend(
+            'openai', self.OPENAI_API_KEY, OPENAI_MODEL_REQ, rate=self.RATE, base_url=TRANSCRIPTION_BASE_URL, pool_size=1
+        )
+
         self.init_audio()
 
     def copy_to_clipboard(self, text):
@@ -71,22 +125,10 @@ class AudioTranscriber:
             self.press_cmd_v_applescript()
 
     def play_start_sound(self):
-        try:
-            subprocess.run(["afplay", "/System/Library/Sounds/Glass.aiff"], check=False)
-        except:
-            try:
-                subprocess.run(["say", "-v", "Alex", "Recording"], check=False)
-            except:
-                pass
+        self.feedback.play('start')
 
     def play_stop_sound(self):
-        try:
-            subprocess.run(["afplay", "/System/Library/Sounds/Submarine.aiff"], check=False)
-        except:
-            try:
-                subprocess.run(["say", "-v", "Alex", "Stopped"], check=False)
-            except:
-                pass
+        self.feedback.play('stop')
 
     def init_audio(self):
         try:
@@ -94,24 +136,8 @@ class AudioTranscriber:
         except Exception as e:
             raise Exception(f"Audio initialization error: {e}")
 
-    def init_websocket(self):
-        url = f"wss://api.openai.com/v1/realtime?model={self.OPENAI_MODEL_WS}"
-        headers = [
-            f"Authorization: Bearer {self.OPENAI_API_KEY}",
-            "OpenAI-Beta: realtime=v1"
-        ]
-
-        self.ws = websocket.WebSocketApp(
-            url,
-            header=headers,
-            on_open=self.on_ws_open,
-            on_message=self.on_ws_message,
-            on_error=self.on_ws_error,
-            on_close=self.on_ws_close
-        )
-
-    def on_ws_open(self, ws):
-        session_config = {
+    def session_config(self):
+        return {
             "type": "session.update",
             "session": {
                 "modalities": ["text", "audio"],
@@ -131,8 +157,6 @@ class AudioTranscriber:
             }
         }
 
-        ws.send(json.dumps(session_config))
-
     def on_ws_message(self, ws, message):
         try:
             data = json.loads(message)
@@ -165,80 +189,166 @@ class AudioTranscriber:
     def on_ws_close(self, ws, close_status_code, close_msg):
         pass
 
-    def send_audio_chunk(self, audio_data):
-        if not self.ws or self.ws.sock is None:
+    def send_audio_chunk(self, ws, audio_data):
+        if not ws or not ws.connected:
             return
 
         try:
-            duration_ms = len(audio_data) / (self.RATE * 2) * 1000
+            pcm = np.frombuffer(audio_data, dtype=np.int16)
+            duration_ms = len(pcm) / self.RATE * 1000
 
             if duration_ms < 50:
                 return
 
-            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
+            ws.send(self.append_encoder.encode(pcm))
 
-            event = {
-                "type": "input_audio_buffer.append",
-                "audio": audio_base64
-            }
+        except Exception as e:
+            print(f"\n❌ Audio sending error: {e}")
 
-            self.ws.send(json.dumps(event))
+    def deliver_audio_chunk(self, recording, samples):
+        """Send a chunk, or keep a copy until a session is attached."""
+        with recording.lock:
+            ws = recording.ws
+            if not ws or not ws.connected:
+                recording.pending_audio.append(samples.tobytes())
+                return
+            burst = b"".join(recording.pending_audio)
+            recording.pending_audio = []
+
+        # Audio recorded while the session connected goes out first, in one event
+        if burst:
+            self.send_audio_chunk(ws, burst)
+        self.send_audio_chunk(ws, samples)
+
+    def send_audio(self, recording):
+        """Sender thread: frames and sends queued chunks until the capture thread closed the queue and it is empty."""
+        while True:
+            samples, _ = self.send_queue.get()
+            if samples is None:
+                break
+            self.deliver_audio_chunk(recording, samples)
+            self.send_queue.done()
+        recording.dropped = self.send_queue.dropped
+
+    def connect_session(self, recording):
+        """Wait for a session while the microphone already records, the sender flushes what was captured."""
+        session = self.sessions.acquire(timeout=self.sessions.connect_timeout)
+        if session is None:
+            print(f"\n⚠️ Realtime session not available, the recording will be sent to the HTTP API")
+            return
 
+        session.attach(self.on_ws_message, self.on_ws_error, self.on_ws_close)
+        with recording.lock:
+            if recording.finished:
+                # Too late, the recording already went to the HTTP API
+                session.close()
+                return
+            recording.ws = session
+
+    def transcribe_fallback(self, audio_data):
+        try:
+            transcript = self.fallback.transcribe(np.frombuffer(audio_data, dtype=np.int16))
+            if transcript.strip():
+                print(f"📝 {transcript}")
+                self.insert_transcription(transcript)
         except Exception as e:
-            print(f"\n❌ Audio sending error: {e}")
+            print(f"\n❌ Transcription error: {e}")
 
     def start_recording(self):
         if self.is_recording:
             return
 
-        try:
-            self.init_websocket()
-
-            ws_thread = threading.Thread(target=self.ws.run_forever)
-            ws_thread.daemon = True
-            ws_thread.start()
+        # The previous recording may still be finishing with its own session, only the send queue is shared
+        if self.sender_thread and self.sender_thread.is_alive():
+            self.sender_thread.join(1)
+            if self.sender_thread.is_alive():
+                print(f"\n⚠️ The previous recording is still being sent, try again in a moment")
+                return
 
-            time.sleep(1)
+        try:
+            # The microphone opens right away, audio waits in memory if no session is ready yet
+            recording = Recording(self.sessions.acquire())
+            if recording.ws:
+                recording.ws.attach(self.on_ws_message, self.on_ws_error, self.on_ws_close)
+            else:
+                recording.connect_thread = threading.Thread(target=self.connect_session, args=(recording,))
+                recording.connect_thread.daemon = True
+                recording.connect_thread.start()
+            self.recording = recording
 
+            rate = self.capture_rate()
+            self.resampler = Resampler(rate, self.RATE) if rate != self.RATE else None
             self.stream = self.audio.open(
                 format=self.FORMAT,
                 channels=self.CHANNELS,
-                rate=self.RATE,
+                rate=rate,
                 input=True,
-                frames_per_buffer=self.CHUNK
+                frames_per_buffer=round(self.CHUNK * rate / self.RATE)
             )
 
             self.is_recording = True
-            self.audio_buffer = []
+            self.chunk_fill = 0
+            self.send_queue.clear()
             self.recording_start_time = time.time()
             print(f"🔴 Recording started")
             self.play_start_sound()
 
-            recording_thread = threading.Thread(target=self.record_audio)
-            recording_thread.daemon = True
-            recording_thread.start()
+            self.sender_thread = threading.Thread(target=self.send_audio, args=(recording,))
+            self.sender_thread.daemon = True
+            self.sender_thread.start()
+
+            self.recording_thread = threading.Thread(target=self.record_audio, args=(recording,))
+            self.recording_thread.daemon = True
+            self.recording_thread.start()
 
         except Exception as e:
             print(f"\n❌ Recording start error: {e}")
             self.is_recording = False
 
-    def record_audio(self):
+    def capture_rate(self):
+        """Rate the microphone is opened at, its default rate with CAPTURE_NATIVE_RATE."""
+        if not self.CAPTURE_NATIVE_RATE:
+            return self.RATE
+        try:
+            return int(self.audio.get_default_input_device_info()['defaultSampleRate'])
+        except Exception as e:
+            print(f"⚠️ Input device rate unknown, capturing at {self.RATE} Hz: {e}")
+            return self.RATE
+
+    def record_audio(self, recording):
+        block_size = round(self.CHUNK * self.resampler.input_rate / self.RATE) if self.resampler else self.CHUNK
+        try:
+            self.capture_blocks(block_size)
+        finally:
+            # Only this thread puts: the unfinished last chunk goes after the full ones, then the sender may stop
+            recording.tail_ms = self.chunk_fill / self.RATE * 1000
+            if self.chunk_fill:
+                self.send_queue.put(self.chunk[:self.chunk_fill], time.time())
+                self.chunk_fill = 0
+            self.send_queue.close()
+
+    def capture_blocks(self, block_size):
         while self.is_recording:
             try:
-                data = self.stream.read(self.CHUNK, exception_on_overflow=False)
+                data = self.stream.read(block_size, exception_on_overflow=False)
                 audio_data = np.frombuffer(data, dtype=np.int16)
+                if self.resampler:
+                    audio_data = self.resampler.process(audio_data)
 
-                self.audio_buffer.extend(audio_data)
+                while len(audio_data):
+                    count = min(len(audio_data), self.chunk_samples - self.chunk_fill)
+                    self.chunk[self.chunk_fill:self.chunk_fill + count] = audio_data[:count]
+                    self.chunk_fill += count
+                    audio_data = audio_data[count:]
 
-                if len(self.audio_buffer) >= self.chunk_samples:
-                    chunk = np.array(self.audio_buffer[:self.chunk_samples], dtype=np.int16)
-                    self.audio_buffer = self.audio_buffer[self.chunk_samples:]
-
-                    chunk_bytes = chunk.tobytes()
-                    self.send_audio_chunk(chunk_bytes)
+                    if self.chunk_fill == self.chunk_samples:
+                        # Never waits for the sender, a full queue drops the chunk and counts it
+                        self.send_queue.put(self.chunk, time.time())
+                        self.chunk_fill = 0
 
             except Exception as e:
-                print(f"\n❌ Recording error: {e}")
+                if self.is_recording:
+                    print(f"\n❌ Recording error: {e}")
                 break
 
     def stop_recording(self):
@@ -262,24 +372,48 @@ class AudioTranscriber:
         except Exception as e:
             print(f"❌ Audio closing error: {e}")
 
-        try:
-            if self.ws and self.ws.sock:
-                if len(self.audio_buffer) > 0:
-                    remaining_duration_ms = len(self.audio_buffer) / self.RATE * 1000
+        # Waiting for the sender and a session that is still connecting must not hold up the hotkeys
+        self.finisher_thread = threading.Thread(target=self.finish_recording, args=(self.recording, self.sender_thread))
+        self.finisher_thread.daemon = True
+        self.finisher_thread.start()
+
+    def finish_recording(self, recording, sender_thread):
+        """Finisher thread: sends what is left of a stopped recording and commits it, or transcribes it over HTTP."""
+        # The capture thread queues the last chunk and closes the queue, the sender drains it and stops
+        sender_thread.join(self.sessions.connect_timeout)
+        if recording.dropped:
+            print(f"⚠️ {recording.dropped} audio chunks ({recording.dropped * self.CHUNK_SIZE_MS} ms) dropped, the connection could not keep up")
+
+        # Speech recorded during the connect is only sent once the session is ready
+        if recording.connect_thread and recording.connect_thread.is_alive():
+            recording.connect_thread.join(self.sessions.connect_timeout)
+
+        with recording.lock:
+            recording.finished = True
+            ws = recording.ws
+            ws_ready = ws is not None and ws.connected
+            pending = b"".join(recording.pending_audio)
+            recording.pending_audio = []
+
+        if not ws_ready:
+            if pending:
+                self.transcribe_fallback(pending)
+            return
 
-                    if remaining_duration_ms >= 100:
-                        chunk = np.array(self.audio_buffer, dtype=np.int16)
-                        chunk_bytes = chunk.tobytes()
-                        self.send_audio_chunk(chunk_bytes)
+        try:
+            # The session came up after the sender had finished
+            if pending:
+                self.send_audio_chunk(ws, pending)
 
-                        time.sleep(0.1)
+            if recording.tail_ms >= 100:
+                time.sleep(0.1)
 
-                        commit_event = {"type": "input_audio_buffer.commit"}
-                        self.ws.send(json.dumps(commit_event))
+                commit_event = {"type": "input_audio_buffer.commit"}
+                ws.send(json.dumps(commit_event))
 
-                time.sleep(0.5)
-                self.ws.close()
-                self.ws = None
+            time.sleep(0.5)
+            ws.close()
+            recording.ws = None
         except Exception as e:
             print(f"❌ Completion error: {e}")
 
@@ -305,6 +439,8 @@ class AudioTranscriber:
         print("   Ctrl+C - выход")
         print()
 
+        self.sessions.start()
+
         with keyboard.Listener(
             on_press=self.on_press,
             on_release=self.on_release
@@ -322,6 +458,9 @@ class AudioTranscriber:
         try:
             if self.is_recording:
                 self.stop_recording()
+            # The last recording is still sent before exiting
+            if self.finisher_thread:
+                self.finisher_thread.join()
         except Exception as e:
             print(f"❌ Ошибка остановки записи: {e}")
 
@@ -334,9 +473,10 @@ class AudioTranscriber:
             print(f"❌ Ошибка закрытия потока: {e}")
 
         try:
-            if self.ws:
-                self.ws.close()
-                self.ws = None
+            if self.recording and self.recording.ws:
+                self.recording.ws.close()
+                self.recording.ws = None
+            self.sessions.stop()
         except Exception as e:
             print(f"❌ Ошибка закрытия WebSocket: {e}")
 
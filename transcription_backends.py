@@ -0,0 +1,236 @@
+import time
+import zlib
+import logging
+from email.utils import parsedate_to_datetime
+import numpy as np
+from audio_encoders import create_encoder
+from transcription_client import TranscriptionClient, OPENAI_BASE_URL
+
+BACKENDS = ['openai', 'openai-compatible', 'fake']
+
+
+class TranscriptionError(Exception):
+    """The backend answered, but not with a transcript."""
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(f"{status_code} - {message}")
+        self.status_code = status_code
+        self.message = message
+        # Seconds the server asked to wait before the next attempt, None if it did not say
+        self.retry_after = retry_after
+
+
+def parse_retry_after(headers):
+    """Seconds to wait from retry-after-ms or Retry-After (seconds or an HTTP date), None without them."""
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        value = headers.get('retry-after')
+        if not value:
+            return None
+        if value.strip().isdigit():
+            return float(value)
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def response_error(response):
+    return TranscriptionError(response.status_code, response.text, parse_retry_after(response.headers))
+
+
+class StreamRejected(TranscriptionError):
+    """The server refused one streamed upload, the chunk can still be sent whole."""
+
+
+class StreamingNotSupported(StreamRejected):
+    """The server refused a body sent with chunked transfer encoding."""
+
+
+class TranscriptionBackend:
+    """Turns one chunk of 16-bit mono PCM into text.
+
+    transcribe() returns the transcript (possibly empty) and raises
+    TranscriptionError or a connection error when the request failed.
+    A ChunkTrace, when given, gets the encode/request/response timestamps.
+
+    Backends that can upload while the speaker is still talking return an
+    upload from open_stream(); the caller write()s samples into it,
+    finish()es it and passes it to finish_stream() for the text.
+    """
+
+    name = 'base'
+    # RateGovernor pacing the requests, for backends that send them
+    governor = None
+
+    def transcribe(self, pcm, prompt="", chunk_id="chunk", trace=None):
+        raise NotImplementedError
+
+    def open_stream(self, prompt=""):
+        return None
+
+    def finish_stream(self, upload, trace=None):
+        raise NotImplementedError
+
+    def warm(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class OpenAIBackend(TranscriptionBackend):
+    """The /v1/audio/transcriptions endpoint of api.openai.com."""
+
+    name = 'openai'
+
+    # Answers that mean the server cannot take a chunked body at all
+    STREAMING_REJECTED = {411, 413, 415, 501}
+
+    def __init__(self, api_key, model, codec='wav', rate=16000, channels=1, base_url=OPENAI_BASE_URL, pool_size=4, timeout=30, governor=None):
+        if not api_key and self.name == 'openai':
+            raise ValueError("OPEN_AI_KEY not found in env.py file")
+
+        self.logger = logging.getLogger(__name__)
+        self.model = model
+        self.encoder = create_encoder(codec, rate, channels)
+        self.client = TranscriptionClient(api_key, base_url=base_url, pool_size=pool_size, timeout=timeout)
+        self.streaming = hasattr(self.encoder, 'stream_header')
+        self.governor = governor
+        self.bytes_per_second = rate * channels * 2
+
+    def encode(self, pcm, chunk_id):
+        encode_start = time.perf_counter()
+        encoded = self.encoder.encode(pcm)
+        encode_ms = (time.perf_counter() - encode_start) * 1000
+
+        raw_size = len(memoryview(pcm).cast('B'))
+        saved = 100 * (1 - encoded.size / raw_size) if raw_size else 0
+        self.logger.debug(f"🗜️ {chunk_id} {self.encoder.codec}: {raw_size} → {encoded.size} bytes ({saved:.0f}% saved, {encode_ms:.1f}ms)")
+        return encoded
+
+    def transcribe(self, pcm, prompt="", chunk_id="chunk", trace=None):
+        encoded = self.encode(pcm, chunk_id)
+        if trace:
+            trace.set('upload_bytes', encoded.size)
+            trace.mark('encoded')
+        if self.governor:
+            waited = self.governor.acquire(len(memoryview(pcm).cast('B')) / self.bytes_per_second, chunk_id)
+            if trace:
+                trace.set('rate_wait', waited)
+        if trace:
+            trace.mark('request_sent')
+
+        response = None
+        try:
+            response = self.client.transcribe(encoded, self.model, prompt)
+        finally:
+            if self.governor:
+                self.governor.release(*self.rate_limit_info(response))
+        if trace:
+            trace.mark('response_received')
+
+        if response.status_code != 200:
+            raise response_error(response)
+        return response.text.strip()
+
+    def open_stream(self, prompt=""):
+        if not self.streaming:
+            return None
+        # The capture thread cannot wait for the governor, without a free slot the chunk is queued and sent whole
+        if self.governor and not self.governor.try_acquire():
+            self.logger.debug(f"🚦 No free request slot, not streaming ({self.governor.describe()})")
+            return None
+        try:
+            return self.client.open_stream(
+                self.encoder.stream_header(), self.model, prompt,
+                on_done=self.release_stream if self.governor else None
+            )
+        except Exception:
+            if self.governor:
+                self.governor.release()
+            raise
+
+    def release_stream(self, upload):
+        """Give the governor slot of a streamed upload back once its request ended, finished or aborted."""
+        self.governor.release(*self.rate_limit_info(upload.response), audio_seconds=upload.bytes_written / self.bytes_per_second)
+
+    def finish_stream(self, upload, trace=None):
+        response = upload.result()
+        if trace:
+            trace.set('upload_bytes', upload.bytes_written)
+            trace.mark('response_received')
+        if response.status_code in self.STREAMING_REJECTED:
+            # Whole-chunk uploads from now on
+            self.streaming = False
+            raise StreamingNotSupported(response.status_code, response.text)
+        if response.status_code == 400:
+            # May be this body or a parameter, not streaming as such: only this chunk goes whole
+            raise StreamRejected(response.status_code, response.text)
+        if response.status_code != 200:
+            raise response_error(response)
+        return response.text.strip()
+
+    @staticmethod
+    def rate_limit_info(response):
+        """Status, headers and Retry-After of an answer for the governor, all None without one."""
+        if response is None:
+            return None, None, None
+        return response.status_code, response.headers, parse_retry_after(response.headers)
+
+    def warm(self):
+        self.client.warm()
+
+    def close(self):
+        self.client.close()
+
+
+class OpenAICompatibleBackend(OpenAIBackend):
+    """Any server speaking the OpenAI transcription API, e.g. a self-hosted whisper box.
+
+    base_url includes the version prefix, e.g. http://192.168.1.10:8000/v1.
+    The API key is optional.
+    """
+
+    name = 'openai-compatible'
+
+
+class FakeBackend(TranscriptionBackend):
+    """Deterministic in-process backend for tests and benchmarks, no network.
+
+    The transcript is derived from the samples, so the same audio always
+    gives the same text. latency adds a fixed delay per request.
+    """
+
+    name = 'fake'
+
+    def __init__(self, rate=16000, latency=0):
+        self.rate = rate
+        self.latency = latency
+
+    def transcribe(self, pcm, prompt="", chunk_id="chunk", trace=None):
+        if trace:
+            trace.mark('encoded')
+            trace.mark('request_sent')
+        if self.latency:
+            time.sleep(self.latency)
+
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        checksum = zlib.crc32(memoryview(samples).cast('B'))
+        if trace:
+            trace.mark('response_received')
+        return f"[{len(samples) / self.rate:.2f}s {checksum:08x}]"
+
+
+def create_transcription_backend(name, api_key, model, codec='wav', rate=16000, channels=1, base_url=None, pool_size=4, timeout=30, governor=None):
+    if name == 'fake':
+        return FakeBackend(rate)
+
+    if name == 'openai-compatible':
+        if not base_url:
+            raise ValueError("TRANSCRIPTION_BASE_URL is required for the openai-compatible backend")
+        return OpenAICompatibleBackend(api_key, model, codec, rate, channels, base_url, pool_size, timeout, governor)
+
+    if name != 'openai':
+        raise ValueError(f"Unknown transcription backend '{name}', expected one of: {', '.join(BACKENDS)}")
+    return OpenAIBackend(api_key, model, codec, rate, channels, base_url or OPENAI_BASE_URL, pool_size, timeout, governor)
@@ -0,0 +1,234 @@
+import queue
+import threading
+import uuid
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+
+OPENAI_BASE_URL = 'https://api.openai.com/v1'
+
+
+class MultipartBody:
+    """Read-only file-like view over the parts of a multipart/form-data body.
+
+    The parts are kept as they are (PCM stays a memoryview over the chunk
+    array) and read() hands out slices of them, so the request is streamed
+    to the socket without assembling the body in memory.
+    """
+
+    def __init__(self, parts):
+        self.parts = [memoryview(part).cast('B') for part in parts]
+        self.length = sum(len(part) for part in self.parts)
+        self.seek(0)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        while True:
+            block = self.read(65536)
+            if not block:
+                return
+            yield block
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=0):
+        if offset != 0 or whence != 0:
+            raise ValueError("MultipartBody can only be rewound to the start")
+        self.part_index = 0
+        self.part_offset = 0
+        self.position = 0
+        return 0
+
+    def read(self, size=-1):
+        while self.part_index < len(self.parts):
+            part = self.parts[self.part_index]
+            remaining = len(part) - self.part_offset
+            if remaining <= 0:
+                self.part_index += 1
+                self.part_offset = 0
+                continue
+
+            n = remaining if size is None or size < 0 else min(size, remaining)
+            block = part[self.part_offset:self.part_offset + n]
+            self.part_offset += n
+            self.position += n
+            return block
+
+        return b''
+
+
+class UploadAborted(Exception):
+    pass
+
+
+class StreamingUpload:
+    """Multipart upload whose audio is written while it is still being recorded.
+
+    The request starts immediately and is sent with chunked transfer
+    encoding from its own thread. write() only queues a copy of the
+    samples, so the capture thread never waits for the network.
+    """
+
+    ABORT = object()
+
+    def __init__(self, session, url, head, tail, headers, timeout, on_done=None):
+        self.head = head
+        self.tail = tail
+        self.blocks = queue.Queue()
+        self.response = None
+        self.error = None
+        self.done = threading.Event()
+        self.on_done = on_done
+        self.bytes_written = 0
+
+        upload_thread = threading.Thread(target=self.send, args=(session, url, headers, timeout))
+        upload_thread.daemon = True
+        upload_thread.start()
+
+    def body(self):
+        yield from self.head
+        while True:
+            block = self.blocks.get()
+            if block is None:
+                break
+            if block is self.ABORT:
+                raise UploadAborted()
+            yield block
+        yield self.tail
+
+    def send(self, session, url, headers, timeout):
+        try:
+            self.response = session.post(url, data=self.body(), headers=headers, timeout=timeout)
+        except Exception as e:
+            self.error = e
+        finally:
+            if self.on_done:
+                self.on_done(self)
+            self.done.set()
+
+    def write(self, samples):
+        block = bytes(memoryview(samples).cast('B'))
+        self.bytes_written += len(block)
+        self.blocks.put(block)
+
+    def finish(self):
+        self.blocks.put(None)
+
+    def abort(self):
+        self.blocks.put(self.ABORT)
+
+    def result(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise TimeoutError("streamed upload did not complete")
+        if self.error:
+            raise self.error
+        return self.response
+
+
+class TranscriptionClient:
+    """Keep-alive HTTP client for the audio transcription endpoint under base_url.
+
+    Connections are pooled per client, warm() opens one ahead of time, and
+    multipart bodies are streamed straight from the encoded audio parts.
+    """
+
+    def __init__(self, api_key, base_url=OPENAI_BASE_URL, pool_size=4, timeout=30):
+        self.logger = logging.getLogger(__name__)
+        self.base_url = base_url.rstrip('/')
+        self.url = f"{self.base_url}/audio/transcriptions"
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if api_key:
+            self.session.headers['Authorization'] = f'Bearer {api_key}'
+
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self.epilogue = f'\r\n--{self.boundary}--\r\n'.encode()
+
+        self.warm_lock = threading.Lock()
+        self.warming = False
+
+    def part_header(self, name, filename=None, content_type=None):
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"'
+        header = f'--{self.boundary}\r\nContent-Disposition: {disposition}\r\n'
+        if content_type:
+            header += f'Content-Type: {content_type}\r\n'
+        return (header + '\r\n').encode()
+
+    def field(self, name, value):
+        return self.part_header(name) + str(value).encode() + b'\r\n'
+
+    def build_body(self, audio, fields):
+        parts = [self.field(name, value) for name, value in fields.items() if value]
+        parts.append(self.part_header('file', audio.filename, audio.content_type))
+        parts.extend(audio.parts)
+        parts.append(self.epilogue)
+        return MultipartBody(parts)
+
+    def warm(self):
+        """Open a pooled connection in the background so the next request skips the handshake."""
+        with self.warm_lock:
+            if self.warming:
+                return
+            self.warming = True
+
+        warm_thread = threading.Thread(target=self.open_connection)
+        warm_thread.daemon = True
+        warm_thread.start()
+
+    def open_connection(self):
+        try:
+            self.session.head(f"{self.base_url}/models", timeout=5)
+            self.logger.debug("🔌 Transcription connection ready")
+        except Exception as e:
+            self.logger.debug(f"⚠️ Connection warm-up failed: {e}")
+        finally:
+            with self.warm_lock:
+                self.warming = False
+
+    def transcribe(self, audio, model, prompt="", response_format='text'):
+        body = self.build_body(audio, {
+            'model': model,
+            'response_format': response_format,
+            'prompt': prompt,
+        })
+
+        return self.session.post(
+            self.url,
+            data=body,
+            headers={'Content-Type': self.content_type},
+            timeout=self.timeout
+        )
+
+    def open_stream(self, audio_head, model, prompt="", response_format='text', on_done=None):
+        """Start a chunked upload, the caller writes the samples and finishes it; on_done(upload) runs when its request ended."""
+        fields = {
+            'model': model,
+            'response_format': response_format,
+            'prompt': prompt,
+        }
+        head = [self.field(name, value) for name, value in fields.items() if value]
+        head.append(self.part_header('file', audio_head.filename, audio_head.content_type))
+        head.extend(bytes(part) for part in audio_head.parts)
+
+        return StreamingUpload(
+            self.session,
+            self.url,
+            head,
+            self.epilogue,
+            {'Content-Type': self.content_type},
+            self.timeout,
+            on_done
+        )
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,193 @@
+import numpy as np
+
+DETECTORS = ['rms', 'zcr', 'band']
+
+
+def split_frames(samples, frame_length):
+    """View int16 samples as (frames, frame_length), the last short frame zero-padded.
+
+    Returns the frames and the number of real samples in the last frame.
+    Only a partial last frame is copied, whole frames are a reshape.
+    """
+    samples = np.asarray(samples, dtype=np.int16)
+    full = len(samples) // frame_length * frame_length
+    frames = samples[:full].reshape(-1, frame_length)
+    if full == len(samples):
+        return frames, frame_length
+
+    tail = np.zeros((1, frame_length), dtype=np.int16)
+    tail[0, :len(samples) - full] = samples[full:]
+    return np.concatenate([frames, tail]), len(samples) - full
+
+
+class VoiceDetector:
+    """Scores frames of 16-bit PCM, higher means more likely speech.
+
+    Scores are on the RMS scale, so VAD_THRESHOLD and the noise-floor
+    ratios apply to every detector. score() takes a whole
+    (frames, frame_length) array at once, score_samples() frames a
+    signal first and is what the capture loop calls per block.
+    """
+
+    name = 'base'
+
+    def score(self, frames):
+        raise NotImplementedError
+
+    def score_samples(self, samples, frame_length):
+        frames, last_length = split_frames(samples, frame_length)
+        scores = self.score(frames)
+        if len(scores) and last_length < frame_length:
+            # Zero padding diluted the energy of the short last frame
+            scores[-1] *= np.sqrt(frame_length / last_length)
+        return scores
+
+
+class RMSDetector(VoiceDetector):
+    """Frame RMS, squares summed in an int64 accumulator without a float copy of the samples."""
+
+    name = 'rms'
+
+    def score(self, frames):
+        energy = np.einsum('ij,ij->i', frames, frames, dtype=np.int64)
+        return np.sqrt(energy / frames.shape[1])
+
+
+class ZeroCrossingDetector(RMSDetector):
+    """RMS, discounted for frames that cross zero as often as hiss or fan noise.
+
+    Voiced speech crosses zero far less often than broadband noise, so a
+    noisy frame needs 1 / noisy_weight times the level to count as speech.
+    Fricatives are loud enough to still pass.
+    """
+
+    name = 'zcr'
+
+    def __init__(self, max_crossing_rate=0.3, noisy_weight=0.5):
+        self.max_crossing_rate = max_crossing_rate
+        self.noisy_weight = noisy_weight
+
+    def score(self, frames):
+        signs = np.signbit(frames)
+        crossing_rate = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+        rms = super().score(frames)
+        return np.where(crossing_rate > self.max_crossing_rate, rms * self.noisy_weight, rms)
+
+
+class BandEnergyDetector(VoiceDetector):
+    """RMS of the speech band only, from one rFFT over all frames.
+
+    Rumble below low_hz (HVAC, desk bumps) and hiss above high_hz do not
+    count. Frames are windowed, and the score is scaled back to time-domain
+    RMS so it compares to the same thresholds as the other detectors.
+    """
+
+    name = 'band'
+
+    def __init__(self, rate=16000, low_hz=300, high_hz=3400):
+        self.rate = rate
+        self.low_hz = low_hz
+        self.high_hz = high_hz
+        self.frame_length = None
+
+    def prepare(self, frame_length):
+        self.frame_length = frame_length
+        self.window = np.hanning(frame_length).astype(np.float32)
+        frequencies = np.fft.rfftfreq(frame_length, 1 / self.rate)
+        self.band = (frequencies >= self.low_hz) & (frequencies <= self.high_hz)
+        # Parseval with the window's energy, one-sided spectrum counts twice
+        self.scale = 2 / (frame_length * np.sum(self.window.astype(np.float64) ** 2))
+
+    def score(self, frames):
+        if frames.shape[1] != self.frame_length:
+            self.prepare(frames.shape[1])
+        spectrum = np.fft.rfft(frames * self.window, axis=1)[:, self.band]
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        return np.sqrt(power.sum(axis=1) * self.scale)
+
+
+def create_detector(name, rate=16000):
+    if name == 'rms':
+        return RMSDetector()
+    if name == 'zcr':
+        return ZeroCrossingDetector()
+    if name == 'band':
+        return BandEnergyDetector(rate)
+    raise ValueError(f"Unknown VAD detector '{name}', expected one of: {', '.join(DETECTORS)}")
+
+
+class NoiseFloorTracker:
+    """Online noise-floor estimate with speech onset/offset thresholds relative to it.
+
+    The floor is the lowest frame score over a sliding window (minimum
+    statistics). Nobody talks without a pause for the whole window, so the
+    minimum follows the background noise whether or not there is speech,
+    and a fan switching on or off moves it within one window. Memory is
+    one fixed array, however long the session runs.
+
+    Speech starts above `onset` and continues while above the lower
+    `offset`, so a level hovering near one threshold does not flap.
+    """
+
+    # Relative change of the floor worth reporting in the debug log
+    REPORT_CHANGE = 0.25
+
+    def __init__(self, window, onset_ratio=3.0, offset_ratio=2.0, min_threshold=200):
+        # window counts RMS values, i.e. frames when update() is fed frame RMS
+        self.history = np.full(max(1, int(window)), np.inf)
+        self.position = 0
+        self.onset_ratio = onset_ratio
+        self.offset_ratio = min(offset_ratio, onset_ratio)
+        self.min_threshold = min_threshold
+        self.floor = 0.0
+        self.onset = float(min_threshold)
+        self.offset = self.onset * self.offset_ratio / self.onset_ratio
+        self.reported_floor = None
+
+    def update(self, rms):
+        """Add one or more frame RMS values, returns True when the floor moved enough to report."""
+        capacity = len(self.history)
+        values = np.atleast_1d(rms)[-capacity:]
+        end = self.position + len(values)
+        if end <= capacity:
+            self.history[self.position:end] = values
+        else:
+            first = capacity - self.position
+            self.history[self.position:] = values[:first]
+            self.history[:end - capacity] = values[first:]
+        self.position = end % capacity
+
+        self.floor = float(self.history.min())
+        self.onset = max(self.min_threshold, self.floor * self.onset_ratio)
+        self.offset = self.onset * self.offset_ratio / self.onset_ratio
+
+        if self.reported_floor is None or abs(self.floor - self.reported_floor) > self.REPORT_CHANGE * max(self.reported_floor, 1):
+            self.reported_floor = self.floor
+            return True
+        return False
+
+    def threshold(self, in_speech):
+        return self.offset if in_speech else self.onset
+
+
+def find_split_point(samples, window, frame_length, smoothing=3):
+    """Sample index of the quietest point in the last `window` samples.
+
+    Frame energies come from one int64 einsum over the window only, so the
+    cost does not grow with the length of the buffer. They are smoothed
+    over a few frames, so a short dip inside a word does not win over a
+    real pause, and the latest of equally quiet frames is chosen to keep
+    the carried-over remainder short.
+    """
+    tail = samples[max(0, len(samples) - window):]
+    count = len(tail) // frame_length
+    if count == 0:
+        return len(samples)
+
+    # Frames aligned to the end of the buffer
+    frames = tail[len(tail) - count * frame_length:].reshape(count, frame_length)
+    energy = np.einsum('ij,ij->i', frames, frames, dtype=np.int64).astype(np.float64)
+    energy = np.convolve(energy, np.ones(smoothing), mode='same')
+
+    quietest = count - 1 - int(np.argmin(energy[::-1]))
+    return len(samples) - (count - quietest) * frame_length + frame_length // 2
@@ -0,0 +1,53 @@
+import sys
+import time
+import numpy as np
+from vad import create_detector, split_frames, DETECTORS
+
+CHUNK = 1024
+RATE = 16000
+FRAME = 256
+
+def make_signal(seconds):
+    rng = np.random.default_rng(0)
+    return rng.integers(-3000, 3000, int(seconds * RATE) // CHUNK * CHUNK, dtype=np.int16)
+
+def float_rms(frames):
+    """Old detector: float64 copy of every sample just to square it."""
+    return np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+
+def measure(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    samples = make_signal(seconds)
+    frames, _ = split_frames(samples, FRAME)
+    blocks = samples.reshape(-1, CHUNK)
+    count = len(frames)
+
+    def per_block(score_samples):
+        for block in blocks:
+            score_samples(block, FRAME)
+
+    print(f"VAD detectors on {seconds:.0f}s of audio ({count} frames of {FRAME} samples)")
+    print(f"   {'detector':<10} {'batch ns/frame':>15} {'per block ns/frame':>19}")
+
+    batch = measure(lambda: float_rms(frames), repeats)
+    streaming = measure(lambda: per_block(lambda block, frame: float_rms(block.reshape(-1, frame))), repeats)
+    print(f"   {'float rms':<10} {batch / count * 1e9:>15.1f} {streaming / count * 1e9:>19.1f}")
+
+    for name in DETECTORS:
+        detector = create_detector(name, RATE)
+        batch = measure(lambda: detector.score(frames), repeats)
+        streaming = measure(lambda: per_block(detector.score_samples), repeats)
+        print(f"   {name:<10} {batch / count * 1e9:>15.1f} {streaming / count * 1e9:>19.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -2,29 +2,25 @@ import sys
 import time
 import pyaudio
 import numpy as np
-from env import VAD_THRESHOLD
+from vad import create_detector, DETECTORS
+from env import VAD_THRESHOLD, VAD_FRAME_MS, VAD_DETECTOR
 
-def detect_voice_activity(audio_data, threshold):
+def detect_voice_activity(audio_data, threshold, detector, frame_length):
     try:
-        audio_np = np.frombuffer(audio_data, dtype=np.int16)
+        levels = detector.score_samples(np.frombuffer(audio_data, dtype=np.int16), frame_length)
 
-        if len(audio_np) == 0:
-            return False, 0
+        if len(levels) == 0:
+            return False, 0, ""
 
-        squared = audio_np.astype(np.float64) ** 2
-        mean_squared = np.mean(squared)
-
-        if np.isnan(mean_squared) or mean_squared < 0:
-            return False, 0
-
-        rms = np.sqrt(mean_squared)
-        return rms > threshold, rms
+        frames = "".join("█" if level > threshold else "░" for level in levels)
+        return bool((levels > threshold).any()), levels.max(), frames
 
     except Exception:
-        return False, 0
+        return False, 0, ""
 
 def main():
     threshold = VAD_THRESHOLD
+    detector_name = VAD_DETECTOR
 
     if len(sys.argv) > 1:
         try:
@@ -33,11 +29,20 @@ def main():
             print(f"Invalid threshold value. Using default: {VAD_THRESHOLD}")
             threshold = VAD_THRESHOLD
 
+    if len(sys.argv) > 2:
+        detector_name = sys.argv[2]
+        if detector_name not in DETECTORS:
+            print(f"Invalid detector. Expected one of: {', '.join(DETECTORS)}")
+            return
+
     CHUNK = 1024
     FORMAT = pyaudio.paInt16
     CHANNELS = 1
     RATE = 16000
 
+    detector = create_detector(detector_name, RATE)
+    frame_length = max(1, int(VAD_FRAME_MS * RATE / 1000))
+
     try:
         audio = pyaudio.PyAudio()
         stream = audio.open(
@@ -48,7 +53,7 @@ def main():
             frames_per_buffer=CHUNK
         )
 
-        print(f"VAD Test (threshold: {threshold})")
+        print(f"VAD Test (threshold: {threshold}, detector: {detector_name}, {VAD_FRAME_MS} ms frames)")
         print("Speak to see voice activity detection...")
         print("Press Ctrl+C to exit")
         print()
@@ -56,7 +61,7 @@ def main():
         while True:
             try:
                 data = stream.read(CHUNK, exception_on_overflow=False)
-                has_voice, rms_value = detect_voice_activity(data, threshold)
+                has_voice, level, frames = detect_voice_activity(data, threshold, detector, frame_length)
 
                 if has_voice:
                     indicator = "🟢"
@@ -65,7 +70,7 @@ def main():
                     indicator = "❌"
                     status = "QUIET"
 
-                print(f"\r{indicator} {status} (RMS: {rms_value:.1f}, threshold: {threshold})", end="", flush=True)
+                print(f"\r{indicator} {status} {frames} (level: {level:.1f}, threshold: {threshold})", end="", flush=True)
                 time.sleep(0.05)
 
             except KeyboardInterrupt:
@@ -0,0 +1,86 @@
+import sys
+import json
+import time
+import base64
+import numpy as np
+from capture import BlockQueue
+from realtime_session import AppendEventEncoder
+
+RATE = 24000
+CHUNK = 1024
+CHUNK_SIZE_MS = 100
+
+def make_blocks(seconds):
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-3000, 3000, int(seconds * RATE) // CHUNK * CHUNK, dtype=np.int16)
+    return [block.tobytes() for block in samples.reshape(-1, CHUNK)]
+
+def list_producer(blocks, chunk_samples, send):
+    """Old capture loop: samples appended to a Python list, the list re-sliced on every chunk."""
+    buffer = []
+    for data in blocks:
+        buffer.extend(np.frombuffer(data, dtype=np.int16))
+        if len(buffer) >= chunk_samples:
+            chunk = np.array(buffer[:chunk_samples], dtype=np.int16)
+            buffer = buffer[chunk_samples:]
+            send(chunk.tobytes())
+
+def array_producer(blocks, chunk_samples, queue):
+    """New capture loop: one preallocated chunk, full chunks copied into the queue."""
+    chunk = np.zeros(chunk_samples, dtype=np.int16)
+    fill = 0
+    for data in blocks:
+        samples = np.frombuffer(data, dtype=np.int16)
+        while len(samples):
+            count = min(len(samples), chunk_samples - fill)
+            chunk[fill:fill + count] = samples[:count]
+            fill += count
+            samples = samples[count:]
+            if fill == chunk_samples:
+                queue.put(chunk, 0)
+                fill = 0
+
+def json_frame(audio_data):
+    """Old framing: base64, str, dict, json.dumps, and the encode back to bytes in the socket."""
+    event = {"type": "input_audio_buffer.append", "audio": base64.b64encode(audio_data).decode('utf-8')}
+    return json.dumps(event).encode()
+
+def measure(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    chunk_samples = int(RATE * CHUNK_SIZE_MS / 1000)
+    blocks = make_blocks(seconds)
+    samples = np.frombuffer(b"".join(blocks), dtype=np.int16)
+    chunks = samples[:len(samples) // chunk_samples * chunk_samples].reshape(-1, chunk_samples)
+    count = len(chunks)
+    encoder = AppendEventEncoder()
+    assert json.loads(encoder.encode(chunks[0])) == json.loads(json_frame(chunks[0].tobytes()))
+
+    def new_capture():
+        queue = BlockQueue(count + 1, chunk_samples)
+        array_producer(blocks, chunk_samples, queue)
+
+    def frame_all(frame):
+        for chunk in chunks:
+            frame(chunk)
+
+    print(f"Realtime audio path on {seconds:.0f}s of 24 kHz audio ({count} chunks of {CHUNK_SIZE_MS} ms)")
+    print(f"   {'stage':<32} {'old µs/chunk':>13} {'new µs/chunk':>13}")
+    old = measure(lambda: list_producer(blocks, chunk_samples, lambda data: None), repeats)
+    new = measure(new_capture, repeats)
+    print(f"   {'capture thread (per chunk)':<32} {old / count * 1e6:>13.1f} {new / count * 1e6:>13.1f}")
+    old = measure(lambda: frame_all(lambda chunk: json_frame(chunk.tobytes())), repeats)
+    new = measure(lambda: frame_all(encoder.encode), repeats)
+    print(f"   {'append event framing':<32} {old / count * 1e6:>13.1f} {new / count * 1e6:>13.1f}")
+
+if __name__ == "__main__":
+    main()